@@ -1,11 +1,20 @@
 # extraccion_componentes_optimizado.py
 
+import argparse
 import json
 import re
 import os
+import sys
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from collections import defaultdict, Counter
+from itertools import islice
+from multiprocessing import Pool
+from buscadorUnificado import fijar_presupuesto, patrones_agotados, presupuesto_vigente, sumar_agotados
+from cacheExtraccion import NOMBRE_CACHE, CacheExtraccion, hash_texto
+from flujoJson import EscritorJsonl, EscritorJsonStream, es_jsonl, leer_registros, registros_completos_jsonl
+from registroPatrones import claves_corte, compilar, compilar_buscador, compilar_buscadores, compilar_cortador, compilar_lista, compilar_patrones, compilar_prefiltro, firma_patrones
 
 # ==========================
 # CONFIGURACIÓN DE PATRONES
@@ -36,35 +45,96 @@ PATRONES = {
 
 }
 
+PATRONES_COMPILADOS = compilar_patrones(PATRONES, re.IGNORECASE)
+BUSCADORES = compilar_buscadores(PATRONES, re.IGNORECASE)
+
+PATRONES_GABINETE = {
+    "Mid Tower": compilar_lista([
+        r'\b(mid\s*tower|midtower|medium\s*tower|mediumtower)\b'
+    ], re.IGNORECASE),
+    "Formato reducido": compilar_lista([
+        r'\b(formato\s+reducido|small\s+form\s*factor|sff|mini\s*-?\s*itx|micro\s*-?\s*atx|mini\s*-?\s*torre|minitorre|mini\s*torre)\b'
+    ], re.IGNORECASE),
+    "Full Tower": compilar_lista([
+        r'\b(full\s*tower|fulltower|full\s*torre|torre\s*(grande)?|tipo\s*torre|gabinete\s+torre|forma\s+torre|torre\s+pr)\b'
+    ], re.IGNORECASE)
+}
+
+# Palabras clave que indican presencia de fuente
+CLAVES_FUENTE = compilar_lista([
+    r'fuente\s+de\s+poder',
+    r'\bfuente\b',
+    r'wattaje',
+    r'watt\b',
+    r'certificación',
+    r'certificado',
+    r'\bw\b'
+])
+
+# Patrones válidos de chipset
+PATRONES_CHIPSET = compilar_lista([
+    r'chipset\s*:\s*(intel|amd)?\s*[a-z]*\d{3,4}',
+    r'(intel|amd)\s*[a-z]{1,4}\d{3,4}',
+    r'\b[a-z]{1,2}\d{3,4}\b(?=\s+armada|\s+serie)?',
+    r'chipset\s+integrado',
+    r'chipset\s+serie\s+[a-z0-9]+',
+    r'mainboard\s+chipset\s+serie\s+[a-z0-9]+',
+    r'intel\s+serie\s+[a-z0-9]+',
+    r'amd\s+serie\s+[a-z0-9]+',
+    r'chipset\s*(trx50|z79\s*0|z790)',
+    r'(intel|amd)\s*(trx50|z79\s*0|z790)'
+], re.IGNORECASE)
+
+# Patrones que NO deben considerarse chipset (negativos)
+EXCLUIR_CHIPSET = compilar_lista([
+    r'\ba5000\b',
+    r'\ba6000\b',
+    r'\bpf2402\b',
+    r'\bpf2702\b',
+    r'\brs232\b',
+    r'\brx7600\b'  # Evita confundir con GPU Radeon RX
+])
+
+BUSCADOR_FUENTE = compilar_buscador(CLAVES_FUENTE)
+BUSCADOR_CHIPSET = compilar_buscador(PATRONES_CHIPSET, re.IGNORECASE)
+
+# Un solo autómata con los literales requeridos de video, fuente y chipset; se ejecuta una vez
+# por registro y deja fuera las regex cuyos literales no aparecen en el texto
+PREFILTRO = compilar_prefiltro([BUSCADORES["tarjeta_video"], BUSCADORES["grafica_integrada"], BUSCADOR_FUENTE, BUSCADOR_CHIPSET])
+
+REGEX_WATT = compilar(r'(\d{3,4})\s*(w|watts)')
+REGEX_CERT = compilar(r'(80\s*plus\s*(gold|silver|bronze|platinum|titanium))|plus\s*(gold|silver|bronze|platinum|titanium)')
+REGEX_ESPACIOS_GUIONES = compilar(r'[\s\-]+')
+
 # ==========================
 # FUNCIONES DE UTILIDAD
 # ==========================
 
 def buscar_patron(texto, patrones):
-    for patron in patrones:
-        match = re.search(patron, texto, re.IGNORECASE)
+    for regex in patrones:
+        match = regex.search(texto)
         if match:
             return match.group(0).strip()
     return None
 
 def cortar_por_claves(texto, claves, offset=0):
+    # Todas las claves en una sola búsqueda: la primera coincidencia es el corte más temprano
     texto = texto.lower()[offset:] if offset else texto.lower()
-    posiciones = [re.search(clave, texto).start() for clave in claves if re.search(clave, texto)]
-    return texto[:min(posiciones)] if posiciones else texto
+    return compilar_cortador(claves).cortar(texto)
 
 def normalizar_espacios_guiones(texto):
     texto = texto.lower()
-    texto = re.sub(r'[\s\-]+', ' ', texto)
+    texto = REGEX_ESPACIOS_GUIONES.sub(' ', texto)
     return texto.strip()
 
 # ==========================
 # FUNCIONES DE EXTRACCIÓN
 # ==========================
 
-def extraer_video(texto):
+def extraer_video(texto, presentes=None):
     texto = texto.lower()
-    patron_dedicado = buscar_patron(texto, PATRONES["tarjeta_video"])
-    patron_integrado = buscar_patron(texto, PATRONES["grafica_integrada"])
+    patron_dedicado = BUSCADORES["tarjeta_video"].buscar_valor(texto, presentes=presentes)
+    patron_integrado = BUSCADORES["grafica_integrada"].buscar_valor(texto, presentes=presentes)
     
     if patron_dedicado:
         return True, patron_dedicado, False
@@ -75,21 +145,9 @@ def extraer_video(texto):
 def extraer_gabinete(texto: str):
     texto = normalizar_espacios_guiones(texto)
 
-    patrones_tipo = {
-        "Mid Tower": [
-            r'\b(mid\s*tower|midtower|medium\s*tower|mediumtower)\b'
-        ],
-        "Formato reducido": [
-            r'\b(formato\s+reducido|small\s+form\s*factor|sff|mini\s*-?\s*itx|micro\s*-?\s*atx|mini\s*-?\s*torre|minitorre|mini\s*torre)\b'
-        ],
-        "Full Tower": [
-            r'\b(full\s*tower|fulltower|full\s*torre|torre\s*(grande)?|tipo\s*torre|gabinete\s+torre|forma\s+torre|torre\s+pr)\b'
-        ]
-    }
-
     for tipo in ["Mid Tower", "Formato reducido", "Full Tower"]:
-        for patron in patrones_tipo[tipo]:
-            if re.search(patron, texto, re.IGNORECASE):
+        for regex in PATRONES_GABINETE[tipo]:
+            if regex.search(texto):
                 return True, tipo
 
     if "gabinete" in texto or "torre" in texto:
@@ -97,28 +155,17 @@ def extraer_gabinete(texto: str):
 
     return False, None
 
-def extraer_fuente(texto):
+def extraer_fuente(texto, presentes=None):
     texto = texto.lower()
 
-    # Palabras clave que indican presencia de fuente
-    claves_fuente = [
-        r'fuente\s+de\s+poder',
-        r'\bfuente\b',
-        r'wattaje',
-        r'watt\b',
-        r'certificación',
-        r'certificado',
-        r'\bw\b'
-    ]
-
-    mencionada = any(re.search(p, texto) for p in claves_fuente)
+    mencionada = bool(BUSCADOR_FUENTE.buscar(texto, presentes=presentes))
 
     # Wattaje (ej. "500W", "750 watts")
-    match_watt = re.search(r'(\d{3,4})\s*(w|watts)', texto)
+    match_watt = REGEX_WATT.search(texto)
     watt_val = f"{match_watt.group(1)}W" if match_watt else None
 
     # Certificación 80 Plus
-    match_cert = re.search(r'(80\s*plus\s*(gold|silver|bronze|platinum|titanium))|plus\s*(gold|silver|bronze|platinum|titanium)', texto)
+    match_cert = REGEX_CERT.search(texto)
     cert_val = None
     if match_cert:
         for g in reversed(match_cert.groups()):
@@ -129,44 +176,13 @@ def extraer_fuente(texto):
     return mencionada or bool(watt_val or cert_val), watt_val, cert_val
 
 
-def extraer_chipset(texto):
+def extraer_chipset(texto, presentes=None):
     texto = texto.lower()
 
-    # Patrones válidos
-    patrones_validos = [
-        r'chipset\s*:\s*(intel|amd)?\s*[a-z]*\d{3,4}',
-        r'(intel|amd)\s*[a-z]{1,4}\d{3,4}',
-        r'\b[a-z]{1,2}\d{3,4}\b(?=\s+armada|\s+serie)?',
-        r'chipset\s+integrado',
-        r'chipset\s+serie\s+[a-z0-9]+',
-        r'mainboard\s+chipset\s+serie\s+[a-z0-9]+',
-        r'intel\s+serie\s+[a-z0-9]+',
-        r'amd\s+serie\s+[a-z0-9]+',
-        r'chipset\s*(trx50|z79\s*0|z790)',
-        r'(intel|amd)\s*(trx50|z79\s*0|z790)'
-    ]
-
-    # Patrones que NO deben considerarse chipset (negativos)
-    patrones_excluir = [
-        r'\ba5000\b',
-        r'\ba6000\b',
-        r'\bpf2402\b',
-        r'\bpf2702\b',
-        r'\brs232\b',
-        r'\brx7600\b'  # Evita confundir con GPU Radeon RX
-    ]
-
-    # Buscar patrones válidos
-    for patron in patrones_validos:
-        match = re.search(patron, texto, re.IGNORECASE)
-        if match:
-            valor = match.group(0).strip()
-
-            # Validar contra patrones excluidos
-            if any(re.search(p, valor) for p in patrones_excluir):
-                continue
-
-            return valor[0].upper() + valor[1:]
+    # Buscar patrones válidos, descartando los que cumplen un patrón excluido
+    valor = BUSCADOR_CHIPSET.buscar_valor(texto, EXCLUIR_CHIPSET, presentes)
+    if valor:
+        return valor[0].upper() + valor[1:]
 
     return None
 
@@ -181,11 +197,12 @@ def extraer_chipset(texto):
 def procesar_registro(contenido):
     texto = contenido.get("texto extraído y normalizado", "").lower()
     id_extraccion = contenido.get("id_extraccion", "")
+    presentes = PREFILTRO.detectar(texto)
     
-    tarjeta_mencionada, descripcion_tarjeta, integrada = extraer_video(texto)
+    tarjeta_mencionada, descripcion_tarjeta, integrada = extraer_video(texto, presentes)
     gabinete_mencionado, tipo_gabinete = extraer_gabinete(texto)
-    fuente_mencionada, watts, certificacion = extraer_fuente(texto)
-    chipset = extraer_chipset(texto)
+    fuente_mencionada, watts, certificacion = extraer_fuente(texto, presentes)
+    chipset = extraer_chipset(texto, presentes)
 
     return {
         "id_extraccion": id_extraccion,
@@ -200,13 +217,105 @@ def procesar_registro(contenido):
         "chipset": chipset
     }
 
-def revisar_y_limpiar_video(data, resultados):
-    for archivo, contenido in data.items():
-        texto = contenido.get("texto extraído y normalizado", "").lower()
-        tarjeta_mencionada, descripcion, integrada = extraer_video(texto)
-        resultados[archivo]["tarjeta_video_mencionada"] = tarjeta_mencionada
-        resultados[archivo]["descripcion_tarjeta_video"] = descripcion
-        resultados[archivo]["grafica_integrada"] = integrada
+# ==========================
+# EXTRACCIÓN INCREMENTAL CON CACHÉ
+# ==========================
+
+# Subir este número cuando cambie la lógica de un extractor (no solo sus patrones)
+VERSION_EXTRACTORES = 1
+
+# componente -> (extractor(texto, presentes), campos del resultado que produce)
+COMPONENTES = {
+    "video": (extraer_video, ("tarjeta_video_mencionada", "descripcion_tarjeta_video", "grafica_integrada")),
+    "gabinete": (lambda texto, presentes: extraer_gabinete(texto), ("gabinete_mencionado", "tipo_gabinete")),
+    "fuente": (extraer_fuente, ("fuente_poder_mencionada", "wattaje_fuente", "certificacion_fuente")),
+    "chipset": (lambda texto, presentes: (extraer_chipset(texto, presentes),), ("chipset",))
+}
+
+# Firma del conjunto de patrones compilados de cada componente
+FIRMAS_COMPONENTES = {
+    "video": firma_patrones(PATRONES_COMPILADOS["tarjeta_video"] + PATRONES_COMPILADOS["grafica_integrada"], VERSION_EXTRACTORES),
+    "gabinete": firma_patrones(sum(PATRONES_GABINETE.values(), ()) + (REGEX_ESPACIOS_GUIONES,), VERSION_EXTRACTORES),
+    "fuente": firma_patrones(CLAVES_FUENTE + (REGEX_WATT, REGEX_CERT), VERSION_EXTRACTORES),
+    "chipset": firma_patrones(PATRONES_CHIPSET + EXCLUIR_CHIPSET, VERSION_EXTRACTORES)
+}
+
+def _total_agotados():
+    return sum(patrones_agotados().values())
+
+def _agotados_desde(antes):
+    # patrón -> veces que agotó el presupuesto desde `antes` (un patrones_agotados() previo)
+    return {patron: veces - antes.get(patron, 0) for patron, veces in patrones_agotados().items()
+            if veces != antes.get(patron, 0)}
+
+def procesar_registro_en_pool(contenido):
+    """
+    procesar_registro para el pool: devuelve (resultado, agotados), con los patrones que
+    agotaron el presupuesto en el proceso, para sumarlos en el principal (sumar_agotados).
+    """
+    antes = patrones_agotados()
+    return procesar_registro(contenido), _agotados_desde(antes)
+
+def extraer_componentes(texto, componentes):
+    """
+    componente -> (valores, agotado) para los `componentes` indicados del texto ya en
+    minúsculas; `agotado` indica que algún patrón superó el presupuesto en ese componente.
+    """
+    presentes = PREFILTRO.detectar(texto)
+    extraidos = {}
+    for componente in componentes:
+        antes = _total_agotados()
+        valores = list(COMPONENTES[componente][0](texto, presentes))
+        extraidos[componente] = valores, _total_agotados() != antes
+    return extraidos
+
+def extraer_componentes_de_registro(tarea):
+    """
+    extraer_componentes para el pool: recibe (contenido, componentes faltantes) y devuelve
+    (extraidos, agotados) como procesar_registro_en_pool.
+    """
+    contenido, componentes = tarea
+    antes = patrones_agotados()
+    extraidos = extraer_componentes(contenido.get("texto extraído y normalizado", "").lower(), componentes)
+    return extraidos, _agotados_desde(antes)
+
+def procesar_registro_con_cache(contenido, cache, extraidos=None):
+    """
+    Igual que procesar_registro, pero cada componente se toma de la caché si ya se extrajo
+    para el mismo texto con el mismo conjunto de patrones; solo se calculan los faltantes.
+    `extraidos` son componentes ya calculados (ej. desde el pool de procesos), con el
+    formato de extraer_componentes; el resto se busca en la caché.
+    Lo calculado con un patrón que agotó el presupuesto no se guarda: depende de la máquina.
+    """
+    texto = contenido.get("texto extraído y normalizado", "").lower()
+    clave = hash_texto(texto)
+    resultado = {"id_extraccion": contenido.get("id_extraccion", "")}
+    extraidos = dict(extraidos or {})
+
+    guardados = {}
+    for componente, firma in FIRMAS_COMPONENTES.items():
+        if componente not in extraidos:
+            guardados[componente] = cache.obtener(clave, componente, firma)
+    faltantes = [componente for componente, valores in guardados.items() if valores is None]
+    if faltantes:
+        extraidos.update(extraer_componentes(texto, faltantes))
+
+    for componente, (_, campos) in COMPONENTES.items():
+        if componente in extraidos:
+            valores, agotado = extraidos[componente]
+            if not agotado:
+                cache.guardar(clave, componente, FIRMAS_COMPONENTES[componente], valores)
+        else:
+            valores = guardados[componente]
+        resultado.update(zip(campos, valores))
+    return resultado
+
+def componentes_faltantes(contenido, cache):
+    """Componentes del registro que no están en la caché para su texto y patrones actuales."""
+    texto = contenido.get("texto extraído y normalizado", "").lower()
+    clave = hash_texto(texto)
+    return [componente for componente, firma in FIRMAS_COMPONENTES.items()
+            if not cache.contiene(clave, componente, firma)]
 
 # ==========================
 # INTERFAZ Y ARCHIVOS
@@ -216,79 +325,325 @@ def seleccionar_archivo():
     tk.Tk().withdraw()
     return filedialog.askopenfilename(
         title="Selecciona un archivo JSON",
-        filetypes=[("Archivos JSON", "*.json")]
+        filetypes=[("Archivos JSON", "*.json"), ("Archivos JSON Lines", "*.jsonl")]
     )
 
-def procesar_archivo_json(filepath):
+# ==========================
+# PROCESAMIENTO EN PARALELO
+# ==========================
+
+# Por debajo de esta cantidad de registros no compensa levantar procesos
+MINIMO_REGISTROS_PARALELO = 2000
+
+def calcular_tam_bloque(cantidad, procesos):
+    # Unos 4 bloques por proceso: reparte bien la carga sin pagar un envío por registro
+    bloque, resto = divmod(cantidad, procesos * 4)
+    return max(1, bloque + (1 if resto else 0))
+
+def crear_pool(procesos):
+    """Pool de extracción; cada proceso aplica el mismo presupuesto por patrón que este."""
+    return Pool(procesos, initializer=fijar_presupuesto, initargs=(presupuesto_vigente(),))
+
+def procesar_registros(contenidos, procesos=1, tam_bloque=None):
+    """
+    Aplica procesar_registro a una lista de contenidos y devuelve los resultados en el mismo
+    orden. Con procesos > 1 reparte bloques entre un pool de procesos; cada proceso compila
+    los patrones una sola vez al importar este módulo.
+    """
+    if procesos <= 1 or len(contenidos) < MINIMO_REGISTROS_PARALELO:
+        return [procesar_registro(contenido) for contenido in contenidos]
+
+    tam_bloque = tam_bloque or calcular_tam_bloque(len(contenidos), procesos)
+    with crear_pool(procesos) as pool:
+        # imap conserva el orden de entrada, por lo que el det_ sale idéntico al secuencial
+        resultados = []
+        for resultado, agotados in pool.imap(procesar_registro_en_pool, contenidos, chunksize=tam_bloque):
+            sumar_agotados(agotados)
+            resultados.append(resultado)
+        return resultados
+
+def procesar_archivo_json(filepath, procesos=1, tam_bloque=None):
+    """Extrae y aplica las ETAPAS a todos los registros; devuelve (resultados, data)."""
     with open(filepath, 'r', encoding='utf-8') as f:
         data = json.load(f)
-    return {nombre: procesar_registro(contenido) for nombre, contenido in data.items()}, data
+    extraidos = procesar_registros(list(data.values()), procesos, tam_bloque)
+    tuberia = TuberiaRegistros(ETAPAS)
+    resultados = {}
+    for (nombre, contenido), resultado in zip(data.items(), extraidos):
+        tuberia.aplicar(nombre, contenido, resultado)
+        resultados[nombre] = resultado
+    return resultados, data
+
+# Registros por bloque en modo flujo, donde no se conoce el total de antemano
+TAM_BLOQUE_FLUJO = 256
+
+def procesar_archivo_json_en_flujo(filepath, procesos=1, tam_bloque=None, omitir=None, cache=None):
+    """
+    Genera (nombre_archivo, contenido, resultado) leyendo el JSON (o JSON Lines) de forma
+    incremental. En modo paralelo se despachan ventanas de registros al pool, así que la
+    memoria queda acotada por la ventana y no por el tamaño del archivo.
+    Los nombres incluidos en `omitir` (ya procesados) se saltan. Con una `cache` abierta
+    solo se extraen los componentes que no estén guardados para ese texto y patrones.
+    """
+    registros = leer_registros(filepath)
+    if omitir:
+        registros = ((nombre, contenido) for nombre, contenido in registros if nombre not in omitir)
+    if procesos <= 1:
+        for nombre, contenido in registros:
+            if cache is not None:
+                yield nombre, contenido, procesar_registro_con_cache(contenido, cache)
+            else:
+                yield nombre, contenido, procesar_registro(contenido)
+        return
 
-def guardar_resultado(original_path, resultados):
+    tam_bloque = tam_bloque or TAM_BLOQUE_FLUJO
+    with crear_pool(procesos) as pool:
+        while True:
+            ventana = list(islice(registros, tam_bloque * procesos * 4))
+            if not ventana:
+                return
+            if cache is None:
+                resultados = pool.imap(procesar_registro_en_pool, [contenido for _, contenido in ventana], chunksize=tam_bloque)
+                for (nombre, contenido), (resultado, agotados) in zip(ventana, resultados):
+                    sumar_agotados(agotados)
+                    yield nombre, contenido, resultado
+                continue
+
+            # Solo viajan al pool los registros con algún componente fuera de la caché, y de
+            # cada uno solo se extraen esos componentes
+            tareas = {}
+            for i, (_, contenido) in enumerate(ventana):
+                faltantes = componentes_faltantes(contenido, cache)
+                if faltantes:
+                    tareas[i] = (contenido, faltantes)
+            calculados = {}
+            for i, (extraidos, agotados) in zip(tareas, pool.imap(
+                extraer_componentes_de_registro, tareas.values(), chunksize=tam_bloque
+            )):
+                sumar_agotados(agotados)
+                calculados[i] = extraidos
+            for i, (nombre, contenido) in enumerate(ventana):
+                yield nombre, contenido, procesar_registro_con_cache(contenido, cache, calculados.get(i))
+
+# Claves de corte de la descripción de video (sección "_claves_corte" de patrones_config.json)
+CLAVES_CORTE = claves_corte("descripcion_tarjeta_video", [
+    "memoria ram", "interfaces", "memoria:", "4xdisplayport", "w6d",
+    "wotw", "w6t", "pantalla lcd", "chipset", "microsoft office", "p rometheus"
+])
+CORTADOR_VIDEO = compilar_cortador(CLAVES_CORTE)
+
+def recortar_descripcion_video(info):
+    desc = info.get("descripcion_tarjeta_video")
+    if desc and isinstance(desc, str):
+        info["descripcion_tarjeta_video"] = CORTADOR_VIDEO.cortar(desc.lower()).strip()
+
+def ruta_resultado(original_path, jsonl=False):
     carpeta = os.path.dirname(original_path)
     nombre_original = os.path.basename(original_path)
-    ruta_salida = os.path.join(carpeta, "det_" + nombre_original)
-
-    claves_corte = [
-        "memoria ram", "interfaces", "memoria:", "4xdisplayport", "w6d",
-        "wotw", "w6t", "pantalla lcd", "chipset", "microsoft office", "p rometheus"
-    ]
-
-    for info in resultados.values():
-        desc = info.get("descripcion_tarjeta_video")
-        if desc and isinstance(desc, str):
-            info["descripcion_tarjeta_video"] = cortar_por_claves(desc, claves_corte).strip()
+    if jsonl:
+        nombre_original = os.path.splitext(nombre_original)[0] + ".jsonl"
+    return os.path.join(carpeta, "det_" + nombre_original)
 
+def ruta_log_de(ruta_original):
+    carpeta = os.path.dirname(ruta_original)
+    nombre_log = "log_" + os.path.splitext(os.path.basename(ruta_original))[0] + ".txt"
+    return os.path.join(carpeta, nombre_log)
+
+def guardar_resultado(original_path, resultados, jsonl=False):
+    ruta_salida = ruta_resultado(original_path, jsonl)
+    if jsonl:
+        with EscritorJsonl(ruta_salida) as escritor:
+            for nombre, resultado in resultados.items():
+                escritor.escribir(nombre, resultado)
+        return ruta_salida
     with open(ruta_salida, 'w', encoding='utf-8') as f:
         json.dump(resultados, f, indent=4, ensure_ascii=False)
     return ruta_salida
 
-def generar_log(resultados, ruta_original):
-    carpeta = os.path.dirname(ruta_original)
-    nombre_log = "log_" + os.path.splitext(os.path.basename(ruta_original))[0] + ".txt"
-    ruta_log = os.path.join(carpeta, nombre_log)
+class ResumenExtraccion:
+    """Acumula el contenido del log registro por registro, sin guardar los resultados."""
 
-    booleanas = ["tarjeta_video_mencionada", "grafica_integrada", "gabinete_mencionado", "fuente_poder_mencionada"]
-    textuales = ["descripcion_tarjeta_video", "tipo_gabinete", "wattaje_fuente", "certificacion_fuente", "chipset"]
+    BOOLEANAS = ["tarjeta_video_mencionada", "grafica_integrada", "gabinete_mencionado", "fuente_poder_mencionada"]
+    TEXTUALES = ["descripcion_tarjeta_video", "tipo_gabinete", "wattaje_fuente", "certificacion_fuente", "chipset"]
 
-    resumen = defaultdict(Counter)
-    con_falsos = [n for n, d in resultados.items() if sum(1 for k in booleanas if not d.get(k)) > 1]
+    def __init__(self):
+        self.resumen = defaultdict(Counter)
+        self.con_falsos = []
 
-    for n, info in resultados.items():
-        for k in textuales:
+    def agregar(self, nombre, info):
+        if sum(1 for k in self.BOOLEANAS if not info.get(k)) > 1:
+            self.con_falsos.append(nombre)
+        for k in self.TEXTUALES:
             val = info.get(k)
             if isinstance(val, str) and val.strip():
-                resumen[k][val.strip()] += 1
-
-    with open(ruta_log, 'w', encoding='utf-8') as f:
-        f.write("ARCHIVOS CON MÁS DE UNA CARACTERÍSTICA FALSE:\n")
-        for n in con_falsos:
-            f.write(f"- {n}\n")
-        f.write("\nRESUMEN DE VALORES EXTRAÍDOS AGRUPADOS POR CATEGORÍA:\n")
-        for cat, conteo in sorted(resumen.items()):
-            total = sum(conteo.values())
-            f.write(f"\n[{cat.upper()}] (Total: {total})\n")
-            for val, cant in sorted(conteo.items()):
-                f.write(f'"{val}" - ({cant} veces)\n')
-    return ruta_log
+                self.resumen[k][val.strip()] += 1
+
+    def escribir(self, ruta_log):
+        with open(ruta_log, 'w', encoding='utf-8') as f:
+            f.write("ARCHIVOS CON MÁS DE UNA CARACTERÍSTICA FALSE:\n")
+            for n in self.con_falsos:
+                f.write(f"- {n}\n")
+            f.write("\nRESUMEN DE VALORES EXTRAÍDOS AGRUPADOS POR CATEGORÍA:\n")
+            for cat, conteo in sorted(self.resumen.items()):
+                total = sum(conteo.values())
+                f.write(f"\n[{cat.upper()}] (Total: {total})\n")
+                for val, cant in sorted(conteo.items()):
+                    f.write(f'"{val}" - ({cant} veces)\n')
+        return ruta_log
+
+def generar_log(resultados, ruta_original):
+    resumen = ResumenExtraccion()
+    for n, info in resultados.items():
+        resumen.agregar(n, info)
+    return resumen.escribir(ruta_log_de(ruta_original))
+
+# ==========================
+# ETAPAS POR REGISTRO
+# ==========================
+
+# (orden, nombre, funcion(nombre_archivo, contenido, resultado)); ver `etapa`
+ETAPAS = []
+
+def etapa(nombre, orden):
+    """
+    Registra una etapa de post-proceso por registro. Las etapas se aplican en orden
+    creciente de `orden`, todas en la misma pasada en que se extrae el registro, y
+    modifican el resultado en el lugar.
+    """
+    def registrar(funcion):
+        ETAPAS.append((orden, nombre, funcion))
+        ETAPAS.sort(key=lambda e: e[0])
+        return funcion
+    return registrar
+
+@etapa("recorte_video", orden=10)
+def etapa_recorte_video(nombre_archivo, contenido, resultado):
+    recortar_descripcion_video(resultado)
+
+# Las etapas de salida (escritura y resumen) se agregan en cada corrida detrás de estas
+ORDEN_SALIDA = 100
+
+class TuberiaRegistros:
+    """Aplica una lista de etapas a cada registro y acumula el tiempo de cada una."""
+
+    def __init__(self, etapas):
+        self.etapas = sorted(etapas, key=lambda e: e[0])
+        self.tiempos = {nombre: 0.0 for _, nombre, _ in self.etapas}
+        self.registros = 0
+
+    def medir(self, nombre_etapa, registros):
+        """Envuelve el generador de registros midiendo lo que se espera por cada uno."""
+        self.tiempos = {nombre_etapa: 0.0, **self.tiempos}
+        iterador = iter(registros)
+        while True:
+            inicio = time.perf_counter()
+            try:
+                registro = next(iterador)
+            except StopIteration:
+                self.tiempos[nombre_etapa] += time.perf_counter() - inicio
+                return
+            self.tiempos[nombre_etapa] += time.perf_counter() - inicio
+            yield registro
+
+    def aplicar(self, nombre_archivo, contenido, resultado):
+        for _, nombre, funcion in self.etapas:
+            inicio = time.perf_counter()
+            funcion(nombre_archivo, contenido, resultado)
+            self.tiempos[nombre] += time.perf_counter() - inicio
+        self.registros += 1
+
+    def reporte(self):
+        total = sum(self.tiempos.values()) or 1.0
+        lineas = [f"TIEMPO POR ETAPA ({self.registros} registros):"]
+        for nombre, segundos in self.tiempos.items():
+            lineas.append(f"- {nombre:<15}{segundos:>10.3f} s ({100 * segundos / total:5.1f}%)")
+        return "\n".join(lineas)
+
+def procesar_en_flujo(archivo, procesos=1, tam_bloque=None, jsonl=None, reanudar=False, ruta_cache=None):
+    """
+    Lee cada registro, lo extrae y le aplica en una sola pasada las ETAPAS registradas
+    más la escritura del det_ y el resumen del log, sin cargar el JSON completo.
+    Devuelve (ruta det_, ruta log, tuberia); tuberia.reporte() da el tiempo por etapa.
+
+    Con jsonl=True (por defecto si la entrada es .jsonl) el det_ se escribe en JSON Lines,
+    un registro por línea a medida que termina. Con reanudar=True se conservan los registros
+    que ya estaban en ese det_.jsonl y solo se procesan los faltantes.
+
+    Con ruta_cache se reutilizan los componentes ya extraídos en corridas anteriores
+    (ver CacheExtraccion): al cambiar los patrones de un componente solo ese se recalcula.
+    """
+    if jsonl is None:
+        jsonl = es_jsonl(archivo)
+    if reanudar and not jsonl:
+        raise ValueError("Solo se puede reanudar una salida en formato JSON Lines.")
+
+    resumen = ResumenExtraccion()
+    salida = ruta_resultado(archivo, jsonl)
+    ya_procesados = set()
+    if reanudar:
+        for nombre, resultado in registros_completos_jsonl(salida):
+            ya_procesados.add(nombre)
+            resumen.agregar(nombre, resultado)
+
+    cache = None
+    if ruta_cache:
+        cache = CacheExtraccion(ruta_cache)
+        cache.purgar_obsoletos(FIRMAS_COMPONENTES)
+
+    escritor_salida = EscritorJsonl(salida, anexar=reanudar) if jsonl else EscritorJsonStream(salida)
+    try:
+        with escritor_salida as escritor:
+            tuberia = TuberiaRegistros(ETAPAS + [
+                (ORDEN_SALIDA, "escritura", lambda nombre, contenido, resultado: escritor.escribir(nombre, resultado)),
+                (ORDEN_SALIDA + 1, "resumen", lambda nombre, contenido, resultado: resumen.agregar(nombre, resultado))
+            ])
+            registros = procesar_archivo_json_en_flujo(archivo, procesos, tam_bloque, ya_procesados, cache)
+            for nombre, contenido, resultado in tuberia.medir("extraccion", registros):
+                tuberia.aplicar(nombre, contenido, resultado)
+    finally:
+        if cache is not None:
+            cache.cerrar()
+    return salida, resumen.escribir(ruta_log_de(archivo)), tuberia
 
 # ==========================
 # FUNCIÓN PRINCIPAL
 # ==========================
 
-def main():
+def main(procesos=1, tam_bloque=None, jsonl=None, reanudar=False, cache=None, presupuesto_ms=None):
     archivo = seleccionar_archivo()
     if not archivo:
         messagebox.showwarning("Aviso", "No se seleccionó ningún archivo.")
         return
+    # cache=True usa la caché por defecto junto al archivo de entrada
+    ruta_cache = os.path.join(os.path.dirname(archivo), NOMBRE_CACHE) if cache is True else cache
+    # Con presupuesto, un patrón que se cuelga en un registro no detiene toda la corrida
+    fijar_presupuesto(presupuesto_ms / 1000 if presupuesto_ms else None)
+    if presupuesto_ms and presupuesto_vigente() is None:
+        print("Aviso: --presupuesto-ms no tiene efecto en este sistema (requiere POSIX y el hilo "
+              "principal); los patrones se ejecutan sin límite de tiempo", file=sys.stderr)
     try:
-        resultados, data = procesar_archivo_json(archivo)
-        revisar_y_limpiar_video(data, resultados)
-        salida = guardar_resultado(archivo, resultados)
-        ruta_log = generar_log(resultados, archivo)
+        salida, ruta_log, tuberia = procesar_en_flujo(archivo, procesos, tam_bloque, jsonl, reanudar, ruta_cache)
+        print(tuberia.reporte())
+        for patron, veces in patrones_agotados().items():
+            print(f"- presupuesto agotado {veces} veces: {patron}")
         messagebox.showinfo("Éxito", f"Archivo procesado exitosamente:\n{salida}\n\nResumen generado en:\n{ruta_log}")
     except Exception as e:
         messagebox.showerror("Error", f"Ocurrió un error:\n{str(e)}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Extracción de componentes desde un JSON de fichas técnicas")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="cantidad de procesos para la extracción (0 = todos los núcleos)")
+    parser.add_argument("--tam-bloque", type=int, default=None,
+                        help="registros por bloque enviado a cada proceso (por defecto se calcula)")
+    parser.add_argument("--jsonl", action="store_true", default=None,
+                        help="escribir el det_ en JSON Lines (automático si la entrada es .jsonl)")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="continuar un det_.jsonl existente procesando solo los registros faltantes")
+    parser.add_argument("--cache", nargs="?", const=True, default=None, metavar="RUTA",
+                        help=f"reutilizar extracciones previas (por defecto {NOMBRE_CACHE} junto a la entrada)")
+    parser.add_argument("--presupuesto-ms", type=float, default=None,
+                        help="tiempo máximo por patrón y registro; al superarlo el patrón cuenta como sin "
+                             "coincidencia (solo en POSIX y desde el hilo principal)")
+    args = parser.parse_args()
+    main(args.procesos or os.cpu_count() or 1, args.tam_bloque, args.jsonl, args.reanudar, args.cache, args.presupuesto_ms)
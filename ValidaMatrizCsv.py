@@ -1,14 +1,15 @@
 import sys
+import json
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFileDialog, QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView,
-    QMessageBox, QStyleFactory, QCheckBox, QDialog
+    QFileDialog, QTabWidget, QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
+    QMessageBox, QStyleFactory, QCheckBox, QDialog, QMenu
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
-from itertools import product
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
 
 
 # ──────────────────────────────
@@ -31,11 +32,25 @@ def wrap_text(text: str, max_len: int = 15) -> str:
     return "\n".join(lines)
 
 
+def category_codes(values: pd.Series, categories) -> np.ndarray:
+    """
+    Posición en `categories` del texto recortado de cada celda (como en los encabezados de
+    las tablas), o -1 si la celda está vacía o su valor no es una de las categorías.
+    """
+    # Se convierte cada valor distinto una sola vez y luego se reparte por código;
+    # factorize da -1 a los NaN, que toman el -1 agregado al final
+    codes, uniques = pd.factorize(values)
+    positions = {value: i for i, value in enumerate(categories)}
+    texts = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    mapping = np.array([positions.get(text, -1) for text in texts] + [-1], dtype=np.int64)
+    return mapping[codes]
+
+
 def enable_dark_mode(widget):
     widget.setStyleSheet("""
         QWidget { background-color: #2b2b2b; color: #ffffff; }
         QHeaderView::section { background-color: #3c3c3c; color: #ffffff; }
-        QTableWidget { gridline-color: #555; alternate-background-color: #444; }
+        QTableWidget, QTableView { gridline-color: #555; alternate-background-color: #444; }
     """)
 
 
@@ -221,6 +236,316 @@ class GroupSelectionDialog(QDialog):
 
 
 
+# ──────────────────────────────
+# ESTADO DE VALIDACIÓN EMPAQUETADO
+# ──────────────────────────────
+
+# Cantidad de bits en 1 de cada valor posible de un byte
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+class BitMatrix:
+    """
+    Estado válido/inválido de una matriz filas × columnas a 1 bit por celda.
+    La celda (r, c) es el bit r * columnas + c (orden little-endian dentro de cada byte);
+    los bits sobrantes del último byte quedan siempre en 0 para que count() sea exacto.
+    `valid` lleva la cuenta de celdas válidas: set() la ajusta con las celdas que cambian,
+    así que leerla no recorre el arreglo.
+    """
+
+    def __init__(self, rows, columns, value=True):
+        self.rows = rows
+        self.columns = columns
+        self.bits = np.zeros((rows * columns + 7) // 8, dtype=np.uint8)
+        self.valid = 0
+        if value:
+            self.fill(True)
+
+    @property
+    def size(self):
+        return self.rows * self.columns
+
+    def _clear_padding(self):
+        rest = self.size % 8
+        if rest:
+            self.bits[-1] &= (1 << rest) - 1
+
+    def get(self, row, column):
+        i = row * self.columns + column
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def lookup(self, flat) -> np.ndarray:
+        """Estado de cada celda de un arreglo de índices planos."""
+        flat = np.asarray(flat, dtype=np.int64)
+        return (self.bits[flat >> 3] >> (flat & 7) & 1).astype(bool)
+
+    def set(self, flat, value):
+        """
+        Marca como `value` todas las celdas de un arreglo de índices planos y devuelve
+        cuántas cambiaron de estado.
+        """
+        flat = np.unique(np.asarray(flat, dtype=np.int64))
+        flat = flat[self.lookup(flat) != value]
+        masks = (1 << (flat & 7)).astype(np.uint8)
+        if value:
+            np.bitwise_or.at(self.bits, flat >> 3, masks)
+        else:
+            np.bitwise_and.at(self.bits, flat >> 3, ~masks)
+        self.valid += len(flat) if value else -len(flat)
+        return len(flat)
+
+    def fill(self, value):
+        """Marca todas las celdas como `value`."""
+        self.bits[:] = 0xFF if value else 0
+        self._clear_padding()
+        self.valid = self.size if value else 0
+
+    def invert(self, flat=None):
+        """Invierte las celdas de un arreglo de índices planos (o todas si es None)."""
+        if flat is None:
+            self.bits ^= 0xFF
+            self._clear_padding()
+            self.valid = self.size - self.valid
+            return
+        flat = np.unique(np.asarray(flat, dtype=np.int64))
+        before = int(self.lookup(flat).sum())
+        np.bitwise_xor.at(self.bits, flat >> 3, (1 << (flat & 7)).astype(np.uint8))
+        self.valid += len(flat) - 2 * before
+
+    def count(self):
+        """Recuenta las celdas válidas recorriendo los bits (ver `valid`)."""
+        return int(POPCOUNT[self.bits].sum())
+
+    def to_bool(self) -> np.ndarray:
+        return np.unpackbits(self.bits, count=self.size, bitorder="little").astype(bool).reshape(self.rows, self.columns)
+
+    @classmethod
+    def from_bool(cls, states: np.ndarray):
+        matrix = cls(*states.shape, value=False)
+        matrix.bits = np.packbits(states.ravel(), bitorder="little")
+        matrix.valid = matrix.count()
+        return matrix
+
+    @classmethod
+    def from_bytes(cls, rows, columns, bits: np.ndarray):
+        matrix = cls(rows, columns, value=False)
+        if bits.shape != matrix.bits.shape:
+            raise ValueError("El estado guardado no corresponde al tamaño de la matriz.")
+        matrix.bits = bits.astype(np.uint8, copy=True)
+        matrix._clear_padding()
+        matrix.valid = matrix.count()
+        return matrix
+
+
+# ──────────────────────────────
+# MODELO DE LA MATRIZ DE VALIDACIÓN
+# ──────────────────────────────
+
+class ValidationMatrixModel(QAbstractTableModel):
+    """
+    Matriz de un grupo: una fila por valor del eje Y y una columna por combinación de
+    valores X, en el orden de itertools.product (la última columna X varía más rápido).
+    Las combinaciones se guardan como códigos enteros (combo_codes), así que una celda
+    (fila, columna) se traduce a su clave por índice, sin leer el texto de los encabezados.
+    El estado de cada celda vive en un BitMatrix y los encabezados se generan solo
+    cuando la vista los pide.
+    """
+
+    def __init__(self, group_index, values_y, cols_x, unique_values_x, parent=None):
+        super().__init__(parent)
+        self.group_index = group_index
+        self.values_y = values_y
+        self.cols_x = cols_x
+        self.unique_values_x = unique_values_x
+        self.shape_x = tuple(len(values) for values in unique_values_x)
+        columns = int(np.prod(self.shape_x))
+        # Fila c = posición de cada valor X de la columna c dentro de unique_values_x
+        self.combo_codes = np.stack(np.unravel_index(np.arange(columns), self.shape_x), axis=1).astype(np.int32)
+        self.bits = BitMatrix(len(values_y), columns)
+
+    @property
+    def valid_count(self):
+        return self.bits.valid
+
+    @property
+    def total_count(self):
+        return self.bits.size
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.bits.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.bits.columns
+
+    def combo(self, column):
+        """Valores X de la columna `column`."""
+        return tuple(values[code] for values, code in zip(self.unique_values_x, self.combo_codes[column]))
+
+    def key(self, row, column):
+        """Clave (grupo, y, x1, x2, ...) de la celda."""
+        return (self.group_index, self.values_y[row]) + self.combo(column)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.bits.get(index.row(), index.column()) else Qt.Unchecked
+        if role == Qt.ToolTipRole:
+            _, y, *combo = self.key(index.row(), index.column())
+            estado = "válida" if self.bits.get(index.row(), index.column()) else "inválida"
+            return f"{y} / " + " / ".join(f"{c}: {v}" for c, v in zip(self.cols_x, combo)) + f" → {estado}"
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        self.bits.set([index.row() * self.bits.columns + index.column()], value == Qt.Checked)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def flags(self, index):
+        return Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Vertical:
+            return wrap_text(self.values_y[section])
+        return wrap_text(" / ".join(f"{c}: {v}" for c, v in zip(self.cols_x, self.combo(section))))
+
+    # Edición masiva: cada operación recibe rangos (filas, columnas), actualiza los bits de
+    # una vez y emite un único dataChanged que cubre todo lo editado
+
+    def _flat(self, ranges):
+        flat = [
+            (np.asarray(rows, dtype=np.int64)[:, None] * self.bits.columns
+             + np.asarray(columns, dtype=np.int64)[None, :]).ravel()
+            for rows, columns in ranges
+        ]
+        return np.concatenate(flat) if flat else np.zeros(0, dtype=np.int64)
+
+    def _refresh(self, ranges):
+        ranges = [(rows, columns) for rows, columns in ranges if len(rows) and len(columns)]
+        if not ranges:
+            return
+        top = min(min(rows) for rows, _ in ranges)
+        bottom = max(max(rows) for rows, _ in ranges)
+        left = min(min(columns) for _, columns in ranges)
+        right = max(max(columns) for _, columns in ranges)
+        self.dataChanged.emit(self.index(top, left), self.index(bottom, right), [Qt.CheckStateRole])
+
+    def _everything(self):
+        return [(range(self.bits.rows), range(self.bits.columns))]
+
+    def set_cells(self, ranges, checked):
+        self.bits.set(self._flat(ranges), checked)
+        self._refresh(ranges)
+
+    def set_row(self, row, checked):
+        self.set_cells([([row], range(self.bits.columns))], checked)
+
+    def set_column(self, column, checked):
+        self.set_cells([(range(self.bits.rows), [column])], checked)
+
+    def set_all(self, checked):
+        self.bits.fill(checked)
+        self._refresh(self._everything())
+
+    def invert(self, ranges=None):
+        """Invierte los rangos indicados, o toda la matriz."""
+        self.bits.invert(None if ranges is None else self._flat(ranges))
+        self._refresh(self._everything() if ranges is None else ranges)
+
+    def pattern(self, rows, columns) -> np.ndarray:
+        """Estados de un rectángulo como arreglo booleano (filas × columnas)."""
+        return self.bits.lookup(self._flat([(rows, columns)])).reshape(len(rows), len(columns))
+
+    def paste_pattern(self, pattern, ranges):
+        """Repite `pattern` (ver pattern()) en mosaico sobre cada rango, desde su esquina."""
+        if not pattern.size:
+            return
+        valid, invalid = [], []
+        for rows, columns in ranges:
+            reps = (-(-len(rows) // pattern.shape[0]), -(-len(columns) // pattern.shape[1]))
+            tiled = np.tile(pattern, reps)[:len(rows), :len(columns)].ravel()
+            flat = self._flat([(rows, columns)])
+            valid.append(flat[tiled])
+            invalid.append(flat[~tiled])
+        if valid:
+            self.bits.set(np.concatenate(valid), True)
+            self.bits.set(np.concatenate(invalid), False)
+        self._refresh(ranges)
+
+    def lookup_codes(self, code_y, codes_x) -> np.ndarray:
+        """
+        Estado de cada fila dados los códigos (category_codes) de su valor Y y de cada
+        columna X; los códigos -1 (valor vacío o fuera de la matriz) dan False.
+        """
+        codes = [code_y] + list(codes_x)
+        known = np.logical_and.reduce([c >= 0 for c in codes])
+        if not self.bits.size:
+            return np.zeros(len(code_y), dtype=bool)
+        flat = np.ravel_multi_index(
+            tuple(np.where(known, c, 0) for c in codes), (self.bits.rows,) + self.shape_x
+        )
+        return known & self.bits.lookup(flat)
+
+    def restore(self, values_y, unique_values_x, bits):
+        """
+        Carga el estado de una sesión guardada. Si los valores coinciden se usa tal cual;
+        si no, se traslada por valor y las celdas nuevas quedan válidas.
+        """
+        self.beginResetModel()
+        if values_y == self.values_y and unique_values_x == self.unique_values_x:
+            self.bits = bits
+        else:
+            old = bits.to_bool().reshape((len(values_y),) + tuple(len(v) for v in unique_values_x))
+            new = np.ones((len(self.values_y),) + self.shape_x, dtype=bool)
+            new_axes, old_axes = [], []
+            for new_values, old_values in zip([self.values_y] + self.unique_values_x, [values_y] + unique_values_x):
+                positions = {value: i for i, value in enumerate(old_values)}
+                kept = [i for i, value in enumerate(new_values) if value in positions]
+                new_axes.append(np.array(kept, dtype=np.intp))
+                old_axes.append(np.array([positions[new_values[i]] for i in kept], dtype=np.intp))
+            new[np.ix_(*new_axes)] = old[np.ix_(*old_axes)]
+            self.bits = BitMatrix.from_bool(new.reshape(self.bits.rows, self.bits.columns))
+        self.endResetModel()
+
+
+# ──────────────────────────────
+# SESIONES DE VALIDACIÓN
+# ──────────────────────────────
+
+SESSION_FILTER = "Sesión de validación (*.npz)"
+
+
+def write_session(path, grouped_columns, models):
+    """Guarda los grupos y, por grupo, sus valores Y/X y los bits de validación."""
+    arrays = {"groups": np.array(json.dumps(grouped_columns, ensure_ascii=False))}
+    for idx, model in models.items():
+        arrays[f"bits_{idx}"] = model.bits.bits
+        arrays[f"y_{idx}"] = np.array(model.values_y, dtype=str)
+        for k, values in enumerate(model.unique_values_x):
+            arrays[f"x_{idx}_{k}"] = np.array(values, dtype=str)
+    np.savez_compressed(path, **arrays)
+
+
+def read_session(path):
+    """Devuelve (grupos, {índice de grupo: (values_y, unique_values_x, BitMatrix)})."""
+    with np.load(path, allow_pickle=False) as data:
+        groups = json.loads(str(data["groups"]))
+        states = {}
+        for idx, group in enumerate(groups):
+            if f"bits_{idx}" not in data:
+                continue
+            cols_x = [col for col in group["columns"] if col != group["eje_y"]]
+            values_y = data[f"y_{idx}"].tolist()
+            unique_values_x = [data[f"x_{idx}_{k}"].tolist() for k in range(len(cols_x))]
+            columns = int(np.prod([len(values) for values in unique_values_x]))
+            states[idx] = (values_y, unique_values_x, BitMatrix.from_bytes(len(values_y), columns, data[f"bits_{idx}"]))
+    return groups, states
+
+
 # ──────────────────────────────
 # VENTANA PRINCIPAL
 # ──────────────────────────────
@@ -236,7 +561,8 @@ class MainWindow(QWidget):
         # Datos
         self.df = None
         self.config_col = None
-        self.validation = {}
+        self.validation = {}  # índice de grupo -> ValidationMatrixModel
+        self.copied_pattern = None
         self.tabs = QTabWidget()
 
         # Interfaz
@@ -249,6 +575,8 @@ class MainWindow(QWidget):
         self.load_btn = QPushButton("📂 Cargar CSV")
         self.preview_btn = QPushButton("👁️ Previsualizar")
         self.export_btn = QPushButton("💾 Exportar CSV filtrado")
+        self.save_session_btn = QPushButton("🗄️ Guardar sesión")
+        self.load_session_btn = QPushButton("📥 Cargar sesión")
         self.stats_label = QLabel("Estadísticas: -")
         self.theme_toggle = QCheckBox("Modo claro / oscuro")
         self.theme_toggle.setChecked(True)
@@ -256,15 +584,20 @@ class MainWindow(QWidget):
         self.load_btn.clicked.connect(self.load_csv)
         self.preview_btn.clicked.connect(self.preview_data)
         self.export_btn.clicked.connect(self.export_csv)
+        self.save_session_btn.clicked.connect(self.save_session)
+        self.load_session_btn.clicked.connect(self.load_session)
         self.theme_toggle.stateChanged.connect(self.toggle_theme)
 
         self.preview_btn.setEnabled(False)
         self.export_btn.setEnabled(False)
+        self.save_session_btn.setEnabled(False)
 
         button_layout = QHBoxLayout()
         button_layout.addWidget(self.load_btn)
         button_layout.addWidget(self.preview_btn)
         button_layout.addWidget(self.export_btn)
+        button_layout.addWidget(self.save_session_btn)
+        button_layout.addWidget(self.load_session_btn)
         button_layout.addWidget(self.theme_toggle)
         button_layout.addStretch()
         button_layout.addWidget(self.stats_label)
@@ -319,6 +652,7 @@ class MainWindow(QWidget):
         self.build_tabs()
         self.preview_btn.setEnabled(True)
         self.export_btn.setEnabled(True)
+        self.save_session_btn.setEnabled(True)
 
 
 
@@ -341,37 +675,32 @@ class MainWindow(QWidget):
             for col in cols_x:
                 unique_values_x.append(sorted(self.df[col].dropna().astype(str).str.strip().unique()))
 
-            combinaciones_x = list(product(*unique_values_x))
+            model = ValidationMatrixModel(idx, values_y, cols_x, unique_values_x)
+            self.validation[idx] = model
 
-            table = QTableWidget(len(values_y), len(combinaciones_x))
-            table.setVerticalHeaderLabels([wrap_text(y) for y in values_y])
-            headers = [
-                wrap_text(" / ".join([f"{c}: {v}" for c, v in zip(cols_x, combo)]))
-                for combo in combinaciones_x
-            ]
-            table.setHorizontalHeaderLabels(headers)
-
-            for r, y in enumerate(values_y):
-                for c, x_combo in enumerate(combinaciones_x):
-                    item = QTableWidgetItem()
-                    item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-                    item.setCheckState(Qt.Checked)
-                    table.setItem(r, c, item)
-                    self.validation[(idx, y) + x_combo] = "valid"
-
-            table.itemChanged.connect(self.on_checkbox_change)
+            table = QTableView()
+            table.setModel(model)
+            model.setParent(table)
+            model.dataChanged.connect(self.update_stats)
             table.horizontalHeader().sectionDoubleClicked.connect(
                 lambda col, t=table: self.toggle_column_check_state(t, col)
             )
             table.verticalHeader().sectionDoubleClicked.connect(
                 lambda row, t=table: self.toggle_row_check_state(t, row)
             )
+            table.setContextMenuPolicy(Qt.CustomContextMenu)
+            table.customContextMenuRequested.connect(
+                lambda pos, t=table: self.show_matrix_menu(t, pos)
+            )
 
             table.setAlternatingRowColors(True)
             table.setFont(QFont("Arial", 10))
             table.horizontalHeader().setFont(QFont("Arial", 10, QFont.Bold))
             table.verticalHeader().setFont(QFont("Arial", 10, QFont.Bold))
-            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+            # ResizeToContents pediría el encabezado de todas las combinaciones al construir;
+            # con ancho fijo la vista solo genera los de las columnas visibles
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+            table.horizontalHeader().setDefaultSectionSize(140)
             table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
             eje_x_texto = "+".join(cols_x) if len(cols_x) > 1 else cols_x[0]
@@ -395,53 +724,66 @@ class MainWindow(QWidget):
     
 
     def toggle_column_check_state(self, table, column):
-        state = None
-        for row in range(table.rowCount()):
-            item = table.item(row, column)
-            if state is None:
-                state = item.checkState()
-            item.setCheckState(Qt.Unchecked if state == Qt.Checked else Qt.Checked)
+        model = table.model()
+        # Sin filas (o sin columnas) los encabezados siguen visibles pero no hay celdas
+        if model.bits.size == 0:
+            return
+        model.set_column(column, not model.bits.get(0, column))
 
     def toggle_row_check_state(self, table, row):
-        state = None
-        for col in range(table.columnCount()):
-            item = table.item(row, col)
-            if state is None:
-                state = item.checkState()
-            item.setCheckState(Qt.Unchecked if state == Qt.Checked else Qt.Checked)
-
-
-
-
-    def on_checkbox_change(self, item: QTableWidgetItem):
-        table = item.tableWidget()
-        group_index = self.tabs.indexOf(table)
-
-        val_y = table.verticalHeaderItem(item.row()).text().replace("\n", " ")
-        header_x = table.horizontalHeaderItem(item.column()).text().replace("\n", " ")
-
-        # Extraer valores del encabezado
-        combo_parts = header_x.split(" / ")
-        combo_x = tuple(seg.split(": ", 1)[1] for seg in combo_parts)
-        key = (group_index, val_y) + combo_x
-
-        self.validation[key] = "valid" if item.checkState() == Qt.Checked else "invalid"
-        self.update_stats()
-
-
-
+        model = table.model()
+        if model.bits.size == 0:
+            return
+        model.set_row(row, not model.bits.get(row, 0))
+
+    def selected_ranges(self, table):
+        """Rangos (filas, columnas) de cada rectángulo seleccionado en la tabla."""
+        return [
+            (range(r.top(), r.bottom() + 1), range(r.left(), r.right() + 1))
+            for r in table.selectionModel().selection()
+        ]
+
+    def show_matrix_menu(self, table, pos):
+        model = table.model()
+        cell = table.indexAt(pos)
+        ranges = self.selected_ranges(table)
+        if not ranges and cell.isValid():
+            ranges = [([cell.row()], [cell.column()])]
+
+        menu = QMenu(table)
+        selection_actions = [
+            menu.addAction("✅ Marcar selección como válida", lambda: model.set_cells(ranges, True)),
+            menu.addAction("❌ Marcar selección como inválida", lambda: model.set_cells(ranges, False)),
+            menu.addAction("🔁 Invertir selección", lambda: model.invert(ranges)),
+        ]
+        menu.addSeparator()
+        valid_for_y = menu.addAction("Todas válidas para este valor Y", lambda: model.set_row(cell.row(), True))
+        menu.addSeparator()
+        copy_action = menu.addAction("📋 Copiar patrón", lambda: self.copy_pattern(model, ranges))
+        paste_action = menu.addAction("📌 Pegar patrón", lambda: model.paste_pattern(self.copied_pattern, ranges))
+        menu.addSeparator()
+        menu.addAction("Marcar toda la pestaña como válida", lambda: model.set_all(True))
+        menu.addAction("Marcar toda la pestaña como inválida", lambda: model.set_all(False))
+        menu.addAction("Invertir toda la pestaña", lambda: model.invert())
+
+        for action in selection_actions + [copy_action]:
+            action.setEnabled(bool(ranges))
+        valid_for_y.setEnabled(cell.isValid())
+        paste_action.setEnabled(bool(ranges) and self.copied_pattern is not None)
+        menu.exec_(table.viewport().mapToGlobal(pos))
+
+    def copy_pattern(self, model, ranges):
+        rows, columns = ranges[0]
+        self.copied_pattern = model.pattern(rows, columns)
 
     def update_stats(self):
         index = self.tabs.currentIndex()
         if index < 0:
             self.stats_label.setText("Estadísticas: -")
             return
-        table = self.tabs.widget(index)
-        total = table.rowCount() * table.columnCount()
-        valid = sum(
-            1 for r in range(table.rowCount()) for c in range(table.columnCount())
-            if table.item(r, c).checkState() == Qt.Checked
-        )
+        model = self.tabs.widget(index).model()
+        total = model.total_count
+        valid = model.valid_count
         categoria = self.tabs.tabText(index).replace("\n", " ")
         self.stats_label.setText(f"🗂 {categoria}: {valid}/{total} válidos")
 
@@ -449,26 +791,18 @@ class MainWindow(QWidget):
         if self.df is None:
             return pd.DataFrame()
 
-        valid_rows = []
-
-        for _, row in self.df.iterrows():
-            row_is_valid = True
-            for group_index, group_columns in enumerate(self.grouped_columns):
-                if len(group_columns) < 2:
-                    continue
-                val_y = str(row[group_columns[0]]).strip()
-                combo_x = tuple(str(row[col]).strip() for col in group_columns[1:])
-                key = (group_index, val_y) + combo_x
-                if self.validation.get(key, "invalid") != "valid":
-                    row_is_valid = False
-                    break
-            if row_is_valid:
-                valid_rows.append(row)
-
-        return pd.DataFrame(valid_rows)
-
-
+        mask = np.ones(len(self.df), dtype=bool)
+        for idx, model in self.validation.items():
+            group = self.grouped_columns[idx]
+            # Códigos de cada fila en los ejes de la matriz (mismos valores que build_tabs)
+            code_y = category_codes(self.df[group["eje_y"]], model.values_y)
+            codes_x = [
+                category_codes(self.df[col], values)
+                for col, values in zip(model.cols_x, model.unique_values_x)
+            ]
+            mask &= model.lookup_codes(code_y, codes_x)
 
+        return self.df[mask]
 
     def preview_data(self):
         df = self.filter_rows()
@@ -488,6 +822,45 @@ class MainWindow(QWidget):
             df.to_csv(path, index=False)
             QMessageBox.information(self, "Exportado", f"Archivo guardado:\n{Path(path).name}")
 
+    def save_session(self):
+        if not self.validation:
+            QMessageBox.information(self, "Sin matrices", "No hay combinaciones para guardar.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Guardar sesión de validación", "", SESSION_FILTER)
+        if path:
+            write_session(path, self.grouped_columns, self.validation)
+            QMessageBox.information(self, "Sesión guardada", f"Sesión guardada:\n{Path(path).name}")
+
+    def load_session(self):
+        if self.df is None:
+            QMessageBox.warning(self, "Sin datos", "Primero debe cargar un archivo CSV.")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Cargar sesión de validación", "", SESSION_FILTER)
+        if not path:
+            return
+        try:
+            groups, states = read_session(path)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.critical(self, "Error", f"No se pudo leer la sesión:\n{e}")
+            return
+
+        missing = sorted({col for group in groups for col in group["columns"]} - set(self.df.columns))
+        if missing:
+            QMessageBox.warning(self, "Sesión incompatible",
+                                "La sesión usa columnas que no están en el CSV:\n" + "\n".join(missing))
+            return
+
+        self.grouped_columns = groups
+        self.validation.clear()
+        self.build_tabs()
+        for idx, (values_y, unique_values_x, bits) in states.items():
+            if idx in self.validation:
+                self.validation[idx].restore(values_y, unique_values_x, bits)
+        self.update_stats()
+        self.preview_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        self.save_session_btn.setEnabled(True)
+
     def manage_groups(self):
         if self.df is None:
             QMessageBox.warning(self, "Sin datos", "Primero debe cargar un archivo CSV.")
@@ -0,0 +1,269 @@
+# analisis_patrones.py
+
+import argparse
+import json
+import re
+
+import registroPatrones
+from buscadorUnificado import ATOMIC_GROUP, BRANCH, LITERAL, SUBPATTERN, sre_constants, sre_parse
+
+NOT_LITERAL = sre_constants.NOT_LITERAL
+ANY = sre_constants.ANY
+IN = sre_constants.IN
+NEGATE = sre_constants.NEGATE
+RANGE = sre_constants.RANGE
+CATEGORY = sre_constants.CATEGORY
+MAX_REPEAT = sre_constants.MAX_REPEAT
+MIN_REPEAT = sre_constants.MIN_REPEAT
+MAXREPEAT = sre_constants.MAXREPEAT
+POSSESSIVE_REPEAT = getattr(sre_constants, "POSSESSIVE_REPEAT", None)
+# Sin ancho: no consumen caracteres, así que no separan dos cuantificadores
+SIN_ANCHO = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+
+# Caracteres de prueba con los que se aproxima qué acepta cada clase de caracteres
+SONDA = frozenset(
+    [chr(c) for c in range(32, 127)] + list("\t\n\r") + list("áéíóúñüÁÉÍÓÚÑÜ°²³")
+)
+
+CATEGORIAS = {
+    sre_constants.CATEGORY_DIGIT: (r"\d", re.compile(r"\d")),
+    sre_constants.CATEGORY_NOT_DIGIT: (r"\D", re.compile(r"\D")),
+    sre_constants.CATEGORY_SPACE: (r"\s", re.compile(r"\s")),
+    sre_constants.CATEGORY_NOT_SPACE: (r"\S", re.compile(r"\S")),
+    sre_constants.CATEGORY_WORD: (r"\w", re.compile(r"\w")),
+    sre_constants.CATEGORY_NOT_WORD: (r"\W", re.compile(r"\W")),
+}
+
+ESCAPES = {"\n": r"\n", "\t": r"\t", "\r": r"\r"}
+
+# ==========================
+# CONJUNTOS DE CARACTERES
+# ==========================
+
+def _variantes(codigo, flags):
+    letra = chr(codigo)
+    return {letra, letra.lower(), letra.upper()} if flags & re.IGNORECASE else {letra}
+
+
+def _clase(items, flags):
+    aceptados, negada = set(), False
+    for op, valor in items:
+        if op is NEGATE:
+            negada = True
+        elif op is LITERAL:
+            aceptados |= _variantes(valor, flags)
+        elif op is RANGE:
+            minimo, maximo = valor
+            aceptados |= {c for c in SONDA if minimo <= ord(c) <= maximo
+                          or (flags & re.IGNORECASE and minimo <= ord(c.lower()) <= maximo)}
+        elif op is CATEGORY and valor in CATEGORIAS:
+            aceptados |= {c for c in SONDA if CATEGORIAS[valor][1].match(c)}
+        else:
+            aceptados |= SONDA
+    return SONDA - aceptados if negada else aceptados
+
+
+def _caracteres(items, flags):
+    """Unión aproximada (sobre SONDA) de los caracteres que puede consumir una secuencia."""
+    aceptados = set()
+    for op, valor in items:
+        if op is LITERAL:
+            aceptados |= _variantes(valor, flags)
+        elif op is NOT_LITERAL:
+            aceptados |= SONDA - _variantes(valor, flags)
+        elif op is ANY:
+            aceptados |= SONDA if flags & re.DOTALL else SONDA - {"\n"}
+        elif op is IN:
+            aceptados |= _clase(valor, flags)
+        elif op is CATEGORY and valor in CATEGORIAS:
+            aceptados |= {c for c in SONDA if CATEGORIAS[valor][1].match(c)}
+        elif op is BRANCH:
+            for rama in valor[1]:
+                aceptados |= _caracteres(rama, flags)
+        elif op is SUBPATTERN:
+            aceptados |= _caracteres(valor[-1], flags)
+        elif op is ATOMIC_GROUP:
+            aceptados |= _caracteres(valor, flags)
+        elif op in (MAX_REPEAT, MIN_REPEAT) or op is POSSESSIVE_REPEAT:
+            aceptados |= _caracteres(valor[2], flags)
+        elif op in SIN_ANCHO:
+            continue
+        else:
+            # Referencias a grupos y demás: se asume que pueden consumir cualquier cosa
+            aceptados |= SONDA
+    return aceptados
+
+
+# ==========================
+# DESCRIPCIÓN LEGIBLE
+# ==========================
+
+def _texto_literal(codigo):
+    letra = chr(codigo)
+    return ESCAPES.get(letra, re.escape(letra))
+
+
+def _texto_item(op, valor):
+    if op is LITERAL:
+        return _texto_literal(valor)
+    if op is ANY:
+        return "."
+    if op is CATEGORY and valor in CATEGORIAS:
+        return CATEGORIAS[valor][0]
+    if op is IN:
+        partes = []
+        for op_clase, valor_clase in valor:
+            if op_clase is NEGATE:
+                partes.append("^")
+            elif op_clase is LITERAL:
+                partes.append(_texto_literal(valor_clase))
+            elif op_clase is RANGE:
+                partes.append(f"{_texto_literal(valor_clase[0])}-{_texto_literal(valor_clase[1])}")
+            elif op_clase is CATEGORY and valor_clase in CATEGORIAS:
+                partes.append(CATEGORIAS[valor_clase][0])
+        if len(partes) == 1 and partes[0].startswith("\\"):
+            return partes[0]
+        return "[" + "".join(partes) + "]"
+    return "(...)"
+
+
+def describir_repeticion(op, valor):
+    """Texto aproximado de una repetición, ej. '.*?' o '[^,;\\n]*'."""
+    minimo, maximo, contenido = valor
+    cuerpo = _texto_item(*contenido[0]) if len(contenido) == 1 else "(...)"
+    if maximo == MAXREPEAT:
+        cuantificador = {0: "*", 1: "+"}.get(minimo, f"{{{minimo},}}")
+    else:
+        cuantificador = f"{{{minimo},{maximo}}}"
+    return cuerpo + cuantificador + ("?" if op is MIN_REPEAT else "")
+
+
+# ==========================
+# DETECCIÓN DE RETROCESO
+# ==========================
+
+def _ilimitada(op, valor):
+    # Las repeticiones posesivas no retroceden, así que no cuentan
+    return op in (MAX_REPEAT, MIN_REPEAT) and valor[1] == MAXREPEAT
+
+
+def _ancho_minimo(item, estado):
+    return sre_parse.SubPattern(estado, [item]).getwidth()[0]
+
+
+def _aplanar(items):
+    # Un grupo que no se repite equivale a poner sus elementos en la secuencia que lo contiene
+    for op, valor in items:
+        if op is SUBPATTERN:
+            yield from _aplanar(valor[-1])
+        else:
+            yield op, valor
+
+
+def _anidadas(op, valor, estado, flags):
+    # Una repetición ilimitada dentro del cuerpo de otra es exponencial cuando el resto del
+    # cuerpo puede no consumir nada o ser consumido por ella (ej. (\\w+\\s?)+, (a+)+): las
+    # iteraciones externas pueden repartirse el texto de muchas maneras
+    cuerpo = list(_aplanar(valor[2]))
+    for i, (op_interna, valor_interna) in enumerate(cuerpo):
+        if not _ilimitada(op_interna, valor_interna):
+            continue
+        propios = _caracteres([(op_interna, valor_interna)], flags)
+        resto = cuerpo[:i] + cuerpo[i + 1:]
+        if all(_ancho_minimo(item, estado) == 0 or _caracteres([item], flags) <= propios for item in resto):
+            yield (f"Cuantificador ilimitado anidado: {describir_repeticion(op_interna, valor_interna)} "
+                   f"dentro de {describir_repeticion(op, valor)}; el retroceso puede crecer de forma exponencial.")
+
+
+def _revisar(items, estado, flags, riesgos):
+    """
+    Recorre una secuencia del árbol de sre_parse buscando repeticiones ilimitadas:
+    - anidadas: ver _anidadas
+    - consecutivas: dos repeticiones entre las que todo lo intermedio puede ser consumido
+      por la primera (ej. .*?\\d{1,2}\\s*), así que el motor prueba todos los repartos
+      posibles del texto entre ambas antes de fallar
+    """
+    abiertas = []
+    for op, valor in _aplanar(items):
+        if op in SIN_ANCHO:
+            continue
+
+        if op is BRANCH:
+            for rama in valor[1]:
+                _revisar(rama, estado, flags, riesgos)
+        elif op is ATOMIC_GROUP or op is POSSESSIVE_REPEAT:
+            # No retroceden hacia adentro: solo se revisa su interior por separado
+            _revisar(valor if op is ATOMIC_GROUP else valor[2], estado, flags, riesgos)
+            abiertas.clear()
+            continue
+        elif op in (MAX_REPEAT, MIN_REPEAT):
+            if _ilimitada(op, valor):
+                riesgos.extend(_anidadas(op, valor, estado, flags))
+            _revisar(valor[2], estado, flags, riesgos)
+
+        caracteres = _caracteres([(op, valor)], flags)
+        ilimitada = _ilimitada(op, valor)
+        if ilimitada:
+            for descripcion, propios in abiertas:
+                if propios & caracteres:
+                    riesgos.append(
+                        f"Cuantificadores ilimitados consecutivos: {descripcion} ... "
+                        f"{describir_repeticion(op, valor)} compiten por los mismos caracteres; "
+                        f"el retroceso puede crecer de forma polinómica en textos largos."
+                    )
+
+        # Siguen abiertas las repeticiones que también pueden consumir este elemento
+        # (todas, si el elemento puede no consumir nada)
+        if _ancho_minimo((op, valor), estado) > 0:
+            abiertas = [(d, propios) for d, propios in abiertas if caracteres <= propios]
+        if ilimitada:
+            abiertas.append((describir_repeticion(op, valor), caracteres))
+
+
+def riesgos_retroceso(patron, flags=0):
+    """
+    Análisis estático de un patrón: devuelve la lista de advertencias (en orden y sin
+    repetir) sobre cuantificadores ilimitados anidados o consecutivos que pueden causar
+    retroceso catastrófico. Lista vacía si no hay riesgos; re.error si el patrón es inválido.
+    """
+    parseado = sre_parse.parse(patron, flags)
+    riesgos = []
+    _revisar(parseado, parseado.state, flags | parseado.state.flags, riesgos)
+    return list(dict.fromkeys(riesgos))
+
+
+def auditar_configuracion(configuraciones, flags=re.IGNORECASE):
+    """patrón -> advertencias, para todos los patrones de marca -> componente -> listas."""
+    auditoria = {}
+    for componentes in configuraciones.values():
+        for datos in componentes.values():
+            for patron in datos.get("validos", []) + datos.get("excluir", []):
+                if patron in auditoria:
+                    continue
+                try:
+                    riesgos = riesgos_retroceso(patron, flags)
+                except re.error as e:
+                    riesgos = [f"Patrón inválido: {e}"]
+                if riesgos:
+                    auditoria[patron] = riesgos
+    return auditoria
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detecta patrones con riesgo de retroceso catastrófico")
+    parser.add_argument("patrones", nargs="*", help="patrones a analizar (por defecto, los de la configuración)")
+    args = parser.parse_args()
+
+    if args.patrones:
+        auditoria = {p: riesgos_retroceso(p, re.IGNORECASE) for p in args.patrones}
+    else:
+        with open(registroPatrones.CONFIG_FILE, 'r', encoding='utf-8') as f:
+            auditoria = auditar_configuracion({
+                marca: componentes for marca, componentes in json.load(f).items()
+                if not registroPatrones.es_clave_reservada(marca)
+            })
+
+    for patron, riesgos in auditoria.items():
+        print(patron)
+        for riesgo in riesgos or ["sin riesgos detectados"]:
+            print(f"  - {riesgo}")
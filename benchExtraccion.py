@@ -0,0 +1,258 @@
+# bench_extraccion.py
+
+import argparse
+import functools
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from cargaScripts import CARPETA, cargar_modulo
+from generaCorpus import generar_corpus
+from registroPatrones import cargar_configuracion_compilada, compilar_buscador, compilar_lista, es_clave_reservada
+
+# ==========================
+# UTILIDADES
+# ==========================
+
+def medir(funcion, repeticiones=3):
+    """Mejor tiempo (segundos) de varias ejecuciones y el resultado de la última."""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor, resultado
+
+
+def buscar_en_bucle(texto, regexes):
+    """Recorrido original: un re.search completo por patrón hasta la primera coincidencia."""
+    for regex in regexes:
+        match = regex.search(texto)
+        if match:
+            return match.group(0).strip()
+    return None
+
+
+# ==========================
+# BUCLE VS BUSCADOR UNIFICADO
+# ==========================
+
+def conjuntos_de_patrones():
+    """Listas ordenadas de patrones (con IGNORECASE) de --newProcJson.py y de cada marca configurada."""
+    nuevo_proc = cargar_modulo("--newProcJson.py", "newProcJson")
+
+    conjuntos = {}
+    for componente, patrones in nuevo_proc.PATRONES.items():
+        conjuntos[f"newProcJson.{componente}"] = (patrones, re.IGNORECASE)
+    conjuntos["newProcJson.chipset"] = ([r.pattern for r in nuevo_proc.PATRONES_CHIPSET], re.IGNORECASE)
+
+    for marca, componentes in cargar_configuracion_compilada(os.path.join(CARPETA, "patrones_config.json")).items():
+        for componente, datos in componentes.items():
+            if datos["validos"]:
+                conjuntos[f"{marca}.{componente}"] = ([r.pattern for r in datos["validos"]], re.IGNORECASE)
+    return conjuntos
+
+
+def comparar_buscadores(textos, repeticiones=3):
+    print(f"{'Conjunto':<40}{'Patrones':>9}{'Bucle (s)':>12}{'Unificado (s)':>15}{'Aceleración':>13}")
+    print("-" * 89)
+    total_bucle = total_unificado = 0.0
+
+    for nombre, (patrones, flags) in conjuntos_de_patrones().items():
+        regexes = compilar_lista(patrones, flags)
+        buscador = compilar_buscador(patrones, flags)
+
+        t_bucle, esperado = medir(lambda: [buscar_en_bucle(t, regexes) for t in textos], repeticiones)
+        t_unificado, obtenido = medir(lambda: [buscador.buscar_valor(t) for t in textos], repeticiones)
+        if esperado != obtenido:
+            raise AssertionError(f"El buscador unificado difiere del bucle en '{nombre}'")
+
+        total_bucle += t_bucle
+        total_unificado += t_unificado
+        print(f"{nombre:<40}{len(patrones):>9}{t_bucle:>12.4f}{t_unificado:>15.4f}{t_bucle / t_unificado:>12.2f}x")
+
+    print("-" * 89)
+    print(f"{'TOTAL':<49}{total_bucle:>12.4f}{total_unificado:>15.4f}{total_bucle / total_unificado:>12.2f}x")
+
+
+# ==========================
+# RENDIMIENTO POR PROCESADOR
+# ==========================
+
+ARCHIVO_BASE = os.path.join(CARPETA, "bench_base.json")
+
+# Un tiempo que supera la base en este factor se informa como regresión
+UMBRAL_REGRESION = 1.5
+
+
+def procesadores():
+    """
+    nombre -> (procesar(contenido), prefiltro o None, componente -> extractor(texto, presentes)).
+    gestPatExtrac no tiene un procesar_registro: su "registro" aplica extraer_patron_dinamico
+    a cada componente de cada marca de la configuración.
+    """
+    import busqJson
+    import gestPatExtrac
+    nuevo_proc = cargar_modulo("--newProcJson.py", "newProcJson")
+
+    with open(os.path.join(CARPETA, "patrones_config.json"), 'r', encoding='utf-8') as f:
+        configuracion = json.load(f)
+    dinamicos = {
+        f"{marca}.{componente}": functools.partial(
+            lambda texto, presentes, validos, excluir: gestPatExtrac.extraer_patron_dinamico(texto, validos, excluir, presentes),
+            validos=datos["validos"], excluir=datos["excluir"]
+        )
+        for marca, componentes in configuracion.items() if not es_clave_reservada(marca)
+        for componente, datos in componentes.items() if datos.get("validos")
+    }
+
+    def procesar_dinamico(contenido):
+        texto = contenido.get("texto extraído y normalizado", "").lower()
+        return {componente: extraer(texto, None) for componente, extraer in dinamicos.items()}
+
+    return {
+        "busqJson": (busqJson.procesar_registro, busqJson.PREFILTRO, {
+            "video": busqJson.extraer_video,
+            "gabinete": busqJson.extraer_gabinete,
+            "fuente": busqJson.extraer_fuente
+        }),
+        "newProcJson": (nuevo_proc.procesar_registro, nuevo_proc.PREFILTRO,
+                        {componente: extraer for componente, (extraer, _) in nuevo_proc.COMPONENTES.items()}),
+        "gestPatExtrac": (procesar_dinamico, None, dinamicos)
+    }
+
+
+def medir_memoria(funcion):
+    """Pico de memoria (MB) reservada por Python durante una ejecución de `funcion`."""
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / (1024 * 1024)
+
+
+def medir_procesador(procesar, prefiltro, componentes, contenidos, repeticiones=3):
+    """
+    Tiempo total y registros/s de `procesar` sobre todos los registros, tiempo de cada
+    componente por separado (con los literales del prefiltro ya detectados, como en
+    procesar_registro) y pico de memoria de una pasada completa.
+    """
+    textos = [c.get("texto extraído y normalizado", "").lower() for c in contenidos]
+    t_total, _ = medir(lambda: [procesar(c) for c in contenidos], repeticiones)
+
+    tiempos = {}
+    presentes = [None] * len(textos)
+    if prefiltro is not None:
+        tiempos["prefiltro"], presentes = medir(lambda: [prefiltro.detectar(t) for t in textos], repeticiones)
+    for componente, extraer in componentes.items():
+        tiempos[componente], _ = medir(lambda: [extraer(t, p) for t, p in zip(textos, presentes)], repeticiones)
+
+    return {
+        "tiempo": t_total,
+        "registros_s": len(contenidos) / t_total,
+        "memoria_mb": medir_memoria(lambda: [procesar(c) for c in contenidos]),
+        "componentes": tiempos
+    }
+
+
+def medir_todos(contenidos, repeticiones=3):
+    resultados = {}
+    for nombre, (procesar, prefiltro, componentes) in procesadores().items():
+        resultados[nombre] = medir_procesador(procesar, prefiltro, componentes, contenidos, repeticiones)
+    return resultados
+
+
+def imprimir_resultados(resultados, cantidad):
+    print(f"{'Procesador':<16}{'Registros':>11}{'Tiempo (s)':>12}{'Registros/s':>13}{'Memoria (MB)':>14}")
+    print("-" * 66)
+    for nombre, r in resultados.items():
+        print(f"{nombre:<16}{cantidad:>11}{r['tiempo']:>12.3f}{r['registros_s']:>13.0f}{r['memoria_mb']:>14.1f}")
+
+    print(f"\n{'Componente':<36}{'Tiempo (s)':>12}{'µs/registro':>13}")
+    print("-" * 61)
+    for nombre, r in resultados.items():
+        for componente, tiempo in r["componentes"].items():
+            print(f"{nombre + '.' + componente:<36}{tiempo:>12.4f}{1e6 * tiempo / cantidad:>13.1f}")
+
+
+# ==========================
+# LÍNEA BASE
+# ==========================
+
+def guardar_base(ruta, resultados, metadatos):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({"metadatos": metadatos, "resultados": resultados}, f, indent=4, ensure_ascii=False)
+
+
+def comparar_con_base(resultados, ruta, metadatos, umbral=UMBRAL_REGRESION):
+    """
+    Compara cada tiempo (total y por componente) con la línea base guardada y devuelve
+    la lista de mediciones que empeoraron más de `umbral` veces.
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    distintos = {k: (v, metadatos.get(k)) for k, v in base["metadatos"].items() if metadatos.get(k) != v}
+    if distintos:
+        print("Aviso: la base se midió con otros parámetros: "
+              + ", ".join(f"{k}={v} (ahora {a})" for k, (v, a) in distintos.items()))
+
+    print(f"\n{'Medición':<40}{'Base (s)':>11}{'Actual (s)':>12}{'Relación':>10}")
+    print("-" * 73)
+    regresiones = []
+    for nombre, r in resultados.items():
+        anterior = base["resultados"].get(nombre)
+        if anterior is None:
+            continue
+        pares = [(nombre, anterior["tiempo"], r["tiempo"])]
+        pares += [
+            (f"{nombre}.{componente}", anterior["componentes"][componente], tiempo)
+            for componente, tiempo in r["componentes"].items() if componente in anterior["componentes"]
+        ]
+        for medicion, t_base, t_actual in pares:
+            relacion = t_actual / t_base if t_base else float("inf")
+            marca = "  REGRESIÓN" if relacion > umbral else ""
+            print(f"{medicion:<40}{t_base:>11.4f}{t_actual:>12.4f}{relacion:>9.2f}x{marca}")
+            if marca:
+                regresiones.append(medicion)
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de extracción sobre un corpus sintético")
+    parser.add_argument("cantidad", nargs="?", type=int, default=20000, help="registros del corpus sintético")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--fijo", action="store_true", help="usar solo FRAGMENTOS fijos (sin plantillas variadas)")
+    parser.add_argument("--repeticiones", type=int, default=3, help="se toma el mejor tiempo")
+    parser.add_argument("--base", default=ARCHIVO_BASE, help="archivo JSON con la línea base")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar esta medición como línea base")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION, help="factor de tiempo que cuenta como regresión")
+    parser.add_argument("--buscadores", action="store_true", help="comparar además el bucle de patrones con BuscadorUnificado")
+    args = parser.parse_args()
+
+    variado = not args.fijo
+    corpus = generar_corpus(args.cantidad, args.semilla, variado)
+    contenidos = list(corpus.values())
+    print(f"Corpus sintético: {args.cantidad} registros ({'variado' if variado else 'fijo'}, semilla {args.semilla})\n")
+
+    resultados = medir_todos(contenidos, args.repeticiones)
+    imprimir_resultados(resultados, args.cantidad)
+    metadatos = {"cantidad": args.cantidad, "semilla": args.semilla, "variado": variado}
+
+    if args.buscadores:
+        print()
+        comparar_buscadores([c["texto extraído y normalizado"].lower() for c in contenidos], args.repeticiones)
+
+    if args.guardar_base:
+        guardar_base(args.base, resultados, metadatos)
+        print(f"\nLínea base guardada en {args.base}")
+    elif os.path.exists(args.base):
+        regresiones = comparar_con_base(resultados, args.base, metadatos, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} mediciones superan {args.umbral}x el tiempo de la base")
+            sys.exit(1)
@@ -0,0 +1,195 @@
+# bench_semantico.py
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from cargadorModelo import NOMBRE_MODELO, obtener_modelo
+from flujoJson import leer_registros
+from generaCorpus import FRAGMENTOS, generar_corpus, generar_texto
+from indiceSemantico import CARPETA_INDICE, METRICAS, SOLAPAMIENTO, IndiceSemantico, ajustar_busqueda, construir_indice, preparar_vectores
+
+# ==========================
+# CONFIGURACIONES A COMPARAR
+# ==========================
+
+# (tipo, parámetros de construcción, barrido de parámetros de búsqueda)
+CONFIGURACIONES = [
+    ("ivf", {}, [{"nprobe": n} for n in (1, 4, 16, 64)]),
+    ("hnsw", {}, [{"ef_search": e} for e in (16, 64, 256)]),
+    ("ivfpq", {}, [{"nprobe": n} for n in (1, 4, 16, 64)])
+]
+
+
+def medir_busqueda(indice, consultas, top_k):
+    inicio = time.perf_counter()
+    _, ids = indice.search(consultas, top_k)
+    return time.perf_counter() - inicio, ids
+
+
+def recall(aproximados, exactos, top_k):
+    """Fracción de los top_k vecinos exactos que también devuelve el índice aproximado."""
+    aciertos = 0
+    for fila_aprox, fila_exacta in zip(aproximados, exactos):
+        aciertos += len(set(fila_aprox[fila_aprox >= 0]) & set(fila_exacta[fila_exacta >= 0]))
+    return aciertos / (len(exactos) * top_k)
+
+
+# ==========================
+# BENCHMARK
+# ==========================
+
+def cargar_textos(ruta, cantidad, partes=1):
+    if ruta:
+        registros = leer_registros(ruta)
+    elif partes > 1:
+        registros = generar_corpus_largo(cantidad, partes).items()
+    else:
+        registros = generar_corpus(cantidad).items()
+    return zip(*((n, c.get("texto extraído y normalizado", "")) for n, c in registros))
+
+
+def generar_corpus_largo(cantidad, partes, semilla=0):
+    """Fichas sintéticas largas (`partes` textos unidos), con componentes lejos del inicio."""
+    rng = random.Random(semilla)
+    return {
+        f"ficha_larga_{i:07d}.pdf": {
+            "id_extraccion": f"sint-largo-{i}",
+            "texto extraído y normalizado": ". ".join(generar_texto(rng) for _ in range(partes))
+        }
+        for i in range(cantidad)
+    }
+
+
+def comparar_indices(vectores, cantidad_consultas=500, top_k=10, metrica="l2", semilla=0):
+    """
+    Compara cada configuración aproximada contra la búsqueda exacta (flat) sobre los
+    mismos vectores: tiempo de construcción (incluye entrenamiento), latencia media por
+    consulta en lote y recall@top_k.
+    """
+    ids = np.arange(len(vectores), dtype=np.int64)
+    rng = np.random.default_rng(semilla)
+    consultas = vectores[rng.choice(len(vectores), min(cantidad_consultas, len(vectores)), replace=False)]
+
+    inicio = time.perf_counter()
+    exacto, _, _ = construir_indice(vectores, ids, "flat", metrica)
+    t_construccion = time.perf_counter() - inicio
+    t_flat, vecinos_exactos = medir_busqueda(exacto, consultas, top_k)
+
+    print(f"{'Índice':<10}{'Parámetros':<22}{'Construir (s)':>15}{'ms/consulta':>14}{'Recall@' + str(top_k):>12}{'Aceleración':>13}")
+    print("-" * 86)
+    print(f"{'flat':<10}{'-':<22}{t_construccion:>15.3f}{1000 * t_flat / len(consultas):>14.4f}{1.0:>12.3f}{1.0:>12.2f}x")
+
+    for tipo, construccion, barrido in CONFIGURACIONES:
+        inicio = time.perf_counter()
+        indice, tipo_efectivo, parametros = construir_indice(vectores, ids, tipo, metrica, **construccion)
+        t_construccion = time.perf_counter() - inicio
+        if tipo_efectivo != tipo:
+            print(f"{tipo:<10}{'(pocos datos: usa flat)':<22}")
+            continue
+
+        for busqueda in barrido:
+            ajustar_busqueda(indice, tipo, **busqueda)
+            t_busqueda, vecinos = medir_busqueda(indice, consultas, top_k)
+            etiqueta = ", ".join(f"{k}={v}" for k, v in busqueda.items())
+            print(f"{tipo:<10}{etiqueta:<22}{t_construccion:>15.3f}{1000 * t_busqueda / len(consultas):>14.4f}"
+                  f"{recall(vecinos, vecinos_exactos, top_k):>12.3f}{t_flat / t_busqueda:>12.2f}x")
+        print(f"{'':<10}(construcción: {', '.join(f'{k}={v}' for k, v in parametros.items() if v is not None)})")
+
+
+# ==========================
+# TAMAÑO DE PASAJE
+# ==========================
+
+# Consulta por componente del corpus sintético; un documento es relevante si contiene
+# alguno de los fragmentos de ese componente (ver generaCorpus.FRAGMENTOS)
+CONSULTAS_COMPONENTES = {
+    "video": "tarjeta de video o tarjeta gráfica",
+    "gabinete": "gabinete o case",
+    "fuente": "fuente de poder con watts y certificación",
+    "chipset": "chipset de la tarjeta madre"
+}
+
+
+def relevantes_por_componente(nombres, textos):
+    relevantes = {}
+    for componente in CONSULTAS_COMPONENTES:
+        fragmentos = [f.lower() for f in FRAGMENTOS[componente]]
+        relevantes[componente] = {
+            nombre for nombre, texto in zip(nombres, textos)
+            if any(f in texto.lower() for f in fragmentos)
+        }
+    return relevantes
+
+
+def comparar_fragmentacion(nombres, textos, modelo, tamanos=(None, 256, 128, 64), top_k=10, metrica="ip"):
+    """
+    Para cada tamaño de pasaje (None = documento completo) codifica el corpus en un
+    almacén vacío y reporta el rendimiento de codificación y la precisión@top_k de las
+    CONSULTAS_COMPONENTES con max-pooling de pasajes.
+    """
+    relevantes = relevantes_por_componente(nombres, textos)
+    print(f"{'Pasaje':<10}{'Pasajes':>9}{'Codificar (s)':>15}{'Pasajes/s':>11}{'Docs/s':>9}"
+          f"{'ms/consulta':>13}{'Precisión@' + str(top_k):>15}")
+    print("-" * 82)
+
+    for tam in tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            indice = IndiceSemantico(carpeta, modelo, NOMBRE_MODELO, "flat", metrica,
+                                     tam_fragmento=tam, solapamiento=min(SOLAPAMIENTO, (tam or 0) // 4))
+            inicio = time.perf_counter()
+            pasajes = indice.sincronizar(nombres, textos)
+            t_codificacion = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            resultados = indice.buscar_varias({c: (q, top_k) for c, q in CONSULTAS_COMPONENTES.items()})
+            t_busqueda = time.perf_counter() - inicio
+
+        aciertos = [
+            len({d["nombre"] for d in r["documentos"]} & relevantes[componente]) / top_k
+            for componente, r in resultados.items()
+        ]
+        etiqueta = str(tam) if tam else "completo"
+        print(f"{etiqueta:<10}{pasajes:>9}{t_codificacion:>15.2f}{pasajes / t_codificacion:>11.0f}"
+              f"{len(textos) / t_codificacion:>9.0f}{1000 * t_busqueda / len(resultados):>13.2f}"
+              f"{sum(aciertos) / len(aciertos):>15.3f}")
+
+
+def comparar_con_exacto(nombres, textos, corpus=None, cantidad_consultas=500, top_k=10, metrica="ip"):
+    # Los embeddings salen del mismo almacén persistente que usa busqSemant
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(corpus)), CARPETA_INDICE) if corpus \
+        else os.path.join(tempfile.gettempdir(), CARPETA_INDICE)
+    indice = IndiceSemantico(carpeta, obtener_modelo(NOMBRE_MODELO), NOMBRE_MODELO)
+    nuevos = indice.sincronizar(nombres, textos)
+    filas = np.asarray(sorted(indice.documentos_por_fila), dtype=np.int64)
+    vectores = preparar_vectores(indice.almacen.vectores[filas], metrica)
+
+    print(f"Corpus: {len(textos)} documentos ({len(filas)} textos distintos, {nuevos} codificados ahora), "
+          f"métrica {metrica}\n")
+    comparar_indices(vectores, cantidad_consultas, top_k, metrica)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall vs. latencia de los índices FAISS frente a la búsqueda exacta")
+    parser.add_argument("corpus", nargs="?", help="JSON / JSON Lines de fichas (por defecto, corpus sintético)")
+    parser.add_argument("--cantidad", type=int, default=20000, help="registros del corpus sintético")
+    parser.add_argument("--consultas", type=int, default=500, help="vectores del corpus usados como consultas")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--metrica", choices=METRICAS, default="ip")
+    parser.add_argument("--pasajes", default=None, metavar="TAMAÑOS",
+                        help="comparar tamaños de pasaje en palabras, ej. 0,256,128,64 (0 = documento completo)")
+    parser.add_argument("--partes", type=int, default=1,
+                        help="textos sintéticos unidos por ficha, para simular fichas largas")
+    args = parser.parse_args()
+
+    nombres, textos = cargar_textos(args.corpus, args.cantidad, args.partes)
+    if args.pasajes:
+        tamanos = [int(t) or None for t in args.pasajes.split(",")]
+        print(f"Corpus: {len(textos)} documentos, métrica {args.metrica}\n")
+        comparar_fragmentacion(nombres, textos, obtener_modelo(NOMBRE_MODELO), tamanos, args.top_k, args.metrica)
+    else:
+        comparar_con_exacto(nombres, textos, args.corpus, args.consultas, args.top_k, args.metrica)
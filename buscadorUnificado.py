@@ -0,0 +1,316 @@
+# buscador_unificado.py
+
+import re
+import signal
+import sys
+import threading
+from time import perf_counter
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+LITERAL = sre_constants.LITERAL
+BRANCH = sre_constants.BRANCH
+SUBPATTERN = sre_constants.SUBPATTERN
+REPETICIONES = tuple(
+    getattr(sre_constants, nombre)
+    for nombre in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, nombre)
+)
+ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)
+
+# Literales más cortos que esto aparecen en casi cualquier texto y no sirven para filtrar
+LONGITUD_MINIMA_LITERAL = 2
+
+# Perfilador activo (ver perfilPatrones.PerfilPatrones); None = sin instrumentación
+_perfil = None
+
+
+def activar_perfil(perfil):
+    """Instala `perfil` (o None para quitarlo) en todos los buscadores y devuelve el anterior."""
+    global _perfil
+    anterior, _perfil = _perfil, perfil
+    return anterior
+
+# ==========================
+# PRESUPUESTO POR PATRÓN
+# ==========================
+
+# Segundos que puede tardar cada búsqueda de un patrón; None = sin límite
+_presupuesto = None
+# Hilo que instaló la alarma: las señales solo se atienden en el hilo principal
+_hilo_presupuesto = None
+_manejador_anterior = None
+_midiendo = False
+# patrón -> veces que agotó el presupuesto en este proceso
+_agotados = {}
+
+
+class PresupuestoAgotado(Exception):
+    """Una búsqueda superó el presupuesto fijado con fijar_presupuesto."""
+
+
+def _alarma(signum, frame):
+    # Una alarma que llega justo después de terminar la búsqueda se ignora
+    if _midiendo:
+        raise PresupuestoAgotado()
+
+
+def fijar_presupuesto(segundos):
+    """
+    Limita a `segundos` cada ejecución de un patrón en BuscadorUnificado.buscar (None o 0 lo
+    quita) y devuelve el límite anterior. Un patrón que se pasa del límite en un texto se
+    toma como sin coincidencia en ese texto y se cuenta en patrones_agotados().
+
+    El módulo re no admite un tiempo máximo, así que se usa una alarma (SIGALRM) que el motor
+    de re atiende mientras recorre el texto: solo funciona en POSIX y en el hilo principal.
+    En otro caso la llamada no tiene efecto y devuelve None.
+    """
+    global _presupuesto, _hilo_presupuesto, _manejador_anterior
+    anterior = _presupuesto
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return None
+
+    if segundos and _presupuesto is None:
+        _manejador_anterior = signal.signal(signal.SIGALRM, _alarma)
+    elif not segundos and _presupuesto is not None:
+        signal.signal(signal.SIGALRM, _manejador_anterior or signal.SIG_DFL)
+        _manejador_anterior = None
+    _presupuesto = segundos or None
+    _hilo_presupuesto = threading.get_ident() if _presupuesto else None
+    return anterior
+
+
+def presupuesto_vigente():
+    return _presupuesto
+
+
+def patrones_agotados():
+    """patrón -> veces que agotó el presupuesto (en este proceso)."""
+    return dict(_agotados)
+
+
+def sumar_agotados(conteos):
+    """Suma a patrones_agotados() los conteos de otro proceso (ej. uno del pool)."""
+    for patron, veces in conteos.items():
+        _agotados[patron] = _agotados.get(patron, 0) + veces
+
+
+def _buscar_con_presupuesto(regex, texto, inicio):
+    global _midiendo
+    try:
+        _midiendo = True
+        signal.setitimer(signal.ITIMER_REAL, _presupuesto)
+        try:
+            match = regex.search(texto, inicio)
+            # Desde aquí la búsqueda ya terminó a tiempo: una alarma tardía no la descarta
+            _midiendo = False
+        finally:
+            _midiendo = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        return match
+    except PresupuestoAgotado:
+        _midiendo = False
+        if regex.pattern not in _agotados:
+            print(f"Aviso: el patrón {regex.pattern!r} superó el presupuesto de "
+                  f"{1000 * _presupuesto:.0f} ms y se toma como sin coincidencia", file=sys.stderr)
+        _agotados[regex.pattern] = _agotados.get(regex.pattern, 0) + 1
+        return None
+
+# ==========================
+# ANCLAS LITERALES
+# ==========================
+
+def prefijo_literal(patron, flags=0):
+    """
+    Devuelve el literal con el que obligatoriamente empieza toda coincidencia del patrón
+    (ej. 'rtx' para r'rtx\\s\\d{3,4}'), o "" si el patrón no empieza con un literal fijo.
+    """
+    try:
+        parseado = sre_parse.parse(patron, flags)
+    except (re.error, TypeError):
+        return ""
+
+    letras = []
+    for op, valor in parseado:
+        if op is not LITERAL:
+            break
+        letras.append(chr(valor))
+
+    prefijo = "".join(letras)
+    if parseado.state.flags & re.IGNORECASE:
+        prefijo = prefijo.lower()
+    return prefijo
+
+
+def _prefijo_secuencia(items):
+    letras = []
+    for op, valor in items:
+        if op is not LITERAL:
+            break
+        letras.append(chr(valor))
+    return "".join(letras)
+
+
+def _minimizar(literales):
+    # Si un literal contiene a otro del mismo conjunto, basta con exigir el más corto
+    return frozenset(l for l in literales if not any(o != l and o in l for o in literales))
+
+
+def _calidad(conjunto):
+    return min(len(l) for l in conjunto), -len(conjunto)
+
+
+def _requeridos_secuencia(items):
+    candidatos = []
+    actual = []
+
+    def cerrar_literal():
+        if actual:
+            candidatos.append(frozenset(["".join(actual)]))
+            actual.clear()
+
+    for op, valor in items:
+        if op is LITERAL:
+            actual.append(chr(valor))
+            continue
+
+        if op is BRANCH:
+            ramas = valor[1]
+            prefijos = [_prefijo_secuencia(rama) for rama in ramas]
+            if actual and all(prefijos):
+                candidatos.append(frozenset("".join(actual) + p for p in prefijos))
+            conjuntos = [_requeridos_secuencia(rama) for rama in ramas]
+            if all(conjuntos):
+                candidatos.append(frozenset().union(*conjuntos))
+        elif op is SUBPATTERN:
+            conjunto = _requeridos_secuencia(valor[-1])
+            if conjunto:
+                candidatos.append(conjunto)
+        elif op in REPETICIONES:
+            minimo, _, contenido = valor
+            conjunto = _requeridos_secuencia(contenido) if minimo >= 1 else None
+            if conjunto:
+                candidatos.append(conjunto)
+        elif op is ATOMIC_GROUP:
+            conjunto = _requeridos_secuencia(valor)
+            if conjunto:
+                candidatos.append(conjunto)
+        cerrar_literal()
+    cerrar_literal()
+
+    candidatos = [
+        _minimizar(frozenset(l.lower() for l in c)) for c in candidatos
+        if all(len(l) >= LONGITUD_MINIMA_LITERAL for l in c)
+    ]
+    return max(candidatos, key=_calidad, default=None)
+
+
+def literales_requeridos(patron, flags=0):
+    """
+    Conjunto de literales (en minúsculas) de los que al menos uno aparece en toda
+    coincidencia del patrón, ej. {'rtx'} para r'nvidia\s.*?rtx\s?\d{3,4}' o
+    {'case', 'gabinete'} para r'(case|gabinete)[^\n,;]*'. Devuelve None si no se puede
+    extraer ningún literal útil; ese patrón debe evaluarse siempre.
+    """
+    try:
+        return _requeridos_secuencia(sre_parse.parse(patron, flags))
+    except (re.error, TypeError):
+        return None
+
+
+# ==========================
+# BUSCADOR POR COMPONENTE
+# ==========================
+
+class BuscadorUnificado:
+    """
+    Evalúa la lista ordenada de patrones de un componente con la misma prioridad que
+    `buscar_patron`: gana el primer patrón de la lista que coincide en cualquier parte
+    del texto, y se devuelve su coincidencia más a la izquierda.
+
+    Cada ancla literal distinta se localiza una sola vez por texto con str.find: los
+    patrones cuya ancla no aparece no se ejecutan, y los demás buscan a partir de la
+    primera aparición de su ancla. Los patrones sin ancla se evalúan con .search como antes.
+    """
+
+    def __init__(self, patrones, flags=0):
+        self.regexes = tuple(re.compile(p, flags) if isinstance(p, str) else p for p in patrones)
+        # Sin IGNORECASE el propio motor de re ya salta directo al prefijo literal, así que
+        # las anclas solo se usan en patrones que ignoran mayúsculas (donde re no lo hace)
+        self.anclas = tuple(
+            prefijo_literal(r.pattern, r.flags) if r.flags & re.IGNORECASE else ""
+            for r in self.regexes
+        )
+        self.ignorar_mayusculas = any(self.anclas)
+        self.requeridos = tuple(literales_requeridos(r.pattern, r.flags) for r in self.regexes)
+
+    def __len__(self):
+        return len(self.regexes)
+
+    def _texto_busqueda(self, texto):
+        if not self.ignorar_mayusculas:
+            return texto
+        minusculas = texto.lower()
+        # Si lower() cambia la longitud las posiciones dejan de coincidir
+        return minusculas if len(minusculas) == len(texto) else None
+
+    def buscar(self, texto, excluir=(), presentes=None):
+        """
+        Devuelve el objeto Match del patrón ganador o None.
+        Si se indican patrones `excluir`, una coincidencia cuyo valor los cumpla se descarta
+        y se continúa con el siguiente patrón, igual que en extraer_chipset.
+        `presentes` es el conjunto de literales detectados por el prefiltro: los patrones
+        cuyos literales requeridos no aparecen en el texto se saltan sin ejecutarse.
+        Con un presupuesto activo (fijar_presupuesto) cada patrón tiene un tiempo máximo.
+        """
+        busqueda = None
+        primeras = {}
+        perfil = _perfil
+        acotar = _presupuesto is not None and threading.get_ident() == _hilo_presupuesto
+
+        for regex, ancla, requeridos in zip(self.regexes, self.anclas, self.requeridos):
+            if presentes is not None and requeridos and requeridos.isdisjoint(presentes):
+                if perfil is not None:
+                    perfil.omitido(regex)
+                continue
+
+            if perfil is not None:
+                inicio_perfil = perf_counter()
+            inicio = 0
+            if ancla:
+                if busqueda is None:
+                    busqueda = self._texto_busqueda(texto) or False
+                if busqueda is not False:
+                    if ancla not in primeras:
+                        primeras[ancla] = busqueda.find(ancla)
+                    # Ninguna coincidencia puede empezar antes de la primera aparición del ancla
+                    inicio = primeras[ancla]
+                    if inicio < 0:
+                        if perfil is not None:
+                            perfil.omitido(regex)
+                        continue
+            match = _buscar_con_presupuesto(regex, texto, inicio) if acotar else regex.search(texto, inicio)
+            if perfil is not None:
+                perfil.evaluado(regex, perf_counter() - inicio_perfil, match is not None)
+
+            if match:
+                if excluir:
+                    valor = match.group(0).strip()
+                    if perfil is None:
+                        rechazado = any(excl.search(valor) for excl in excluir)
+                    else:
+                        rechazado = perfil.evaluar_exclusiones(regex, excluir, valor)
+                    if rechazado:
+                        continue
+                return match
+        return None
+
+    def buscar_valor(self, texto, excluir=(), presentes=None):
+        """Atajo que devuelve el texto coincidente ya recortado, como buscar_patron."""
+        match = self.buscar(texto, excluir, presentes)
+        return match.group(0).strip() if match else None
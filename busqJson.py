@@ -1,8 +1,9 @@
 import json
-import re
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from flujoJson import EscritorJsonl, EscritorJsonStream, es_jsonl, leer_registros
+from registroPatrones import claves_corte, compilar, compilar_buscadores, compilar_cortador, compilar_patrones, compilar_prefiltro
 
 # ================================
 # PATRONES CONFIGURABLES
@@ -47,27 +48,38 @@ PATRONES = {
     ]
 }
 
+# Patrones compilados una sola vez desde el registro compartido
+PATRONES_COMPILADOS = compilar_patrones(PATRONES)
+BUSCADORES = compilar_buscadores(PATRONES)
+
+# Un solo autómata con los literales requeridos de todos los componentes; se ejecuta una vez
+# por registro y deja fuera las regex cuyos literales no aparecen en el texto
+PREFILTRO = compilar_prefiltro(BUSCADORES.values())
+
+# Claves tras las cuales se descarta el texto (sección "_claves_corte" de patrones_config.json)
+CORTADOR_MEMORIA_RAM = compilar_cortador(claves_corte("memoria_ram", [r'memoria ram']))
+REGEX_WATT = compilar(r'(\d{3,4})\s*(w|watts)')
+REGEX_CERT = compilar(r'(80\s*plus\s*(gold|silver|bronze|platinum|titanium)?)|plus\s*(gold|silver|bronze|platinum|titanium)')
+
 # Función para eliminar todo lo posterior a "memoria ram", para evitar confusión con otras características
 def cortar_en_memoria_ram(texto):
-    match = re.search(r'memoria ram', texto)
-    if match:
-        return texto[:match.start()]
-    return texto
+    return CORTADOR_MEMORIA_RAM.cortar(texto)
 
-# Función general para buscar coincidencias con una lista de patrones
+# Función general para buscar coincidencias con una lista de patrones compilados
+# (recorrido patrón por patrón; los extractores usan BUSCADORES, con la misma prioridad)
 def buscar_patron(texto, patrones):
-    for patron in patrones:
-        match = re.search(patron, texto)
+    for regex in patrones:
+        match = regex.search(texto)
         if match:
             return match.group(0).strip()
     return None
 
 # Extrae información de tarjeta de video (incluyendo gráficos integrados)
-def extraer_video(texto):
+def extraer_video(texto, presentes=None):
     texto_preprocesado = cortar_en_memoria_ram(texto)
 
-    video_info = buscar_patron(texto_preprocesado, PATRONES["tarjeta_video"])
-    grafica_integrada = bool(buscar_patron(texto_preprocesado, PATRONES["grafica_integrada"]))
+    video_info = BUSCADORES["tarjeta_video"].buscar_valor(texto_preprocesado, presentes=presentes)
+    grafica_integrada = bool(BUSCADORES["grafica_integrada"].buscar_valor(texto_preprocesado, presentes=presentes))
 
     tarjeta_mencionada = bool(video_info or grafica_integrada)
 
@@ -77,8 +89,8 @@ def extraer_video(texto):
     return tarjeta_mencionada, video_info, grafica_integrada
 
 # Extrae tipo de gabinete
-def extraer_gabinete(texto):
-    frase = buscar_patron(texto, PATRONES["gabinete"])
+def extraer_gabinete(texto, presentes=None):
+    frase = BUSCADORES["gabinete"].buscar_valor(texto, presentes=presentes)
     if frase:
         if "mid tower" in frase:
             return True, "Mid Tower"
@@ -90,7 +102,7 @@ def extraer_gabinete(texto):
 
 # Extrae información de fuente de poder: wattaje y certificación
 # Extrae información de fuente de poder: wattaje y certificación
-def extraer_fuente(texto):
+def extraer_fuente(texto, presentes=None):
     fuente_mencionada = False
     watt = None
     cert = None
@@ -99,16 +111,16 @@ def extraer_fuente(texto):
     texto = texto.lower()
 
     # Detectar presencia de fuente de poder
-    if any(re.search(p, texto) for p in PATRONES["fuente_poder"]):
+    if BUSCADORES["fuente_poder"].buscar(texto, presentes=presentes):
         fuente_mencionada = True
 
     # Wattaje - buscar expresiones como "750w", "750 watts", etc.
-    watt_match = re.search(r'(\d{3,4})\s*(w|watts)', texto)
+    watt_match = REGEX_WATT.search(texto)
     if watt_match:
         watt = watt_match.group(1) + "W"
 
     # Certificación - capturar variantes de 80 plus
-    cert_match = re.search(r'(80\s*plus\s*(gold|silver|bronze|platinum|titanium)?)|plus\s*(gold|silver|bronze|platinum|titanium)', texto)
+    cert_match = REGEX_CERT.search(texto)
     if cert_match:
         grupos = cert_match.groups()
         # Selección cuidadosa del nombre detectado
@@ -127,11 +139,12 @@ def extraer_fuente(texto):
 def procesar_registro(contenido):
     texto = contenido.get("texto extraído y normalizado", "").lower()
     id_extraccion = contenido.get("id_extraccion", "")
+    presentes = PREFILTRO.detectar(texto)
 
     # Extracción por categoría
-    tarjeta_mencionada, descripcion_tarjeta, integrada = extraer_video(texto)
-    gabinete_mencionado, tipo_gabinete = extraer_gabinete(texto)
-    fuente_mencionada, watts, certificacion = extraer_fuente(texto)
+    tarjeta_mencionada, descripcion_tarjeta, integrada = extraer_video(texto, presentes)
+    gabinete_mencionado, tipo_gabinete = extraer_gabinete(texto, presentes)
+    fuente_mencionada, watts, certificacion = extraer_fuente(texto, presentes)
 
     return {
         "id_extraccion": id_extraccion,
@@ -151,7 +164,7 @@ def seleccionar_archivo():
     root.withdraw()
     return filedialog.askopenfilename(
         title="Selecciona un archivo JSON",
-        filetypes=[("Archivos JSON", "*.json")]
+        filetypes=[("Archivos JSON", "*.json"), ("Archivos JSON Lines", "*.jsonl")]
     )
 
 # Procesamiento general del archivo
@@ -165,15 +178,25 @@ def procesar_archivo_json(filepath):
 
     return resultados
 
-# Guardar archivo JSON en la misma carpeta con prefijo "det_"
+# Procesamiento incremental: genera (nombre, resultado) sin cargar el JSON completo en memoria
+# Acepta tanto JSON como JSON Lines (.jsonl, un registro por línea)
+def procesar_archivo_json_en_flujo(filepath):
+    for nombre_archivo, contenido in leer_registros(filepath):
+        yield nombre_archivo, procesar_registro(contenido)
+
+# Guardar archivo JSON en la misma carpeta con prefijo "det_" (JSON Lines si la entrada lo era)
+# `resultados` puede ser un diccionario o un iterable de pares (nombre, resultado)
 def guardar_resultado(original_path, resultados):
     carpeta = os.path.dirname(original_path)
     nombre_original = os.path.basename(original_path)
     nuevo_nombre = "det_" + nombre_original
     ruta_salida = os.path.join(carpeta, nuevo_nombre)
 
-    with open(ruta_salida, 'w', encoding='utf-8') as f:
-        json.dump(resultados, f, indent=4, ensure_ascii=False)
+    pares = resultados.items() if isinstance(resultados, dict) else resultados
+    escritor_salida = EscritorJsonl(ruta_salida) if es_jsonl(ruta_salida) else EscritorJsonStream(ruta_salida)
+    with escritor_salida as escritor:
+        for nombre_archivo, resultado in pares:
+            escritor.escribir(nombre_archivo, resultado)
 
     return ruta_salida
 
@@ -185,8 +208,7 @@ def main():
         return
 
     try:
-        resultados = procesar_archivo_json(archivo)
-        salida = guardar_resultado(archivo, resultados)
+        salida = guardar_resultado(archivo, procesar_archivo_json_en_flujo(archivo))
         messagebox.showinfo("Éxito", f"Archivo procesado exitosamente:\n{salida}")
     except Exception as e:
         messagebox.showerror("Error", f"Ocurrió un error:\n{str(e)}")
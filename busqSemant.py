@@ -1,15 +1,11 @@
+import argparse
 import json
-from sentence_transformers import SentenceTransformer
-import numpy as np
-import faiss
+import os
 import re
 from tkinter import filedialog
 import tkinter as tk
-
-# =====================
-# CONFIGURACIÓN INICIAL
-# =====================
-modelo = SentenceTransformer('all-MiniLM-L6-v2')
+from cargadorModelo import NOMBRE_MODELO, obtener_modelo
+from indiceSemantico import CARPETA_INDICE, METRICAS, TIPOS_INDICE, IndiceSemantico
 
 
 def extraer_fuente(texto):
@@ -22,14 +18,31 @@ def extraer_fuente(texto):
     }
 
 
-def realizar_busqueda(textos, nombres, consulta, top_k=5):
-    vectores = modelo.encode(textos)
-    index = faiss.IndexFlatL2(vectores[0].shape[0])
-    index.add(np.array(vectores))
+def preparar_indice(archivo_json, nombres, textos, tipo="flat", metrica="l2", servidor=False, tam_fragmento=None):
+    """
+    Abre (o crea) el índice persistente junto al JSON y codifica solo los textos que no
+    estaban en corridas anteriores; todas las consultas usan ese mismo índice.
+    El modelo se carga recién aquí (o se pide al servidor si servidor=True).
+    """
+    carpeta = os.path.join(os.path.dirname(archivo_json), CARPETA_INDICE)
+    modelo = obtener_modelo(NOMBRE_MODELO, servidor)
+    indice = IndiceSemantico(carpeta, modelo, NOMBRE_MODELO, tipo, metrica, tam_fragmento=tam_fragmento)
+    nuevos = indice.sincronizar(nombres, textos)
+    print(f"🗂️ Índice semántico ({indice.tipo_efectivo}, {metrica}): "
+          f"{len(textos)} documentos, {nuevos} {'pasajes' if tam_fragmento else 'textos'} codificados en esta corrida")
+    return indice
+
 
-    vector_q = modelo.encode([consulta])
-    _, indices = index.search(np.array(vector_q), top_k)
-    return [(nombres[i], textos[i]) for i in indices[0]]
+def realizar_busqueda(indice, consulta, top_k=5):
+    return indice.buscar(consulta, top_k)
+
+
+def realizar_busquedas(indice, consultas, top_k=5):
+    """
+    Todas las consultas en lote (un encode y una búsqueda en total).
+    Devuelve categoria -> {"consulta", "top_k", "documentos"}; ver IndiceSemantico.buscar_varias.
+    """
+    return indice.buscar_varias(consultas, top_k)
 
 
 def cargar_json_desde_dialogo():
@@ -44,7 +57,7 @@ def cargar_json_desde_dialogo():
 # PROCESO PRINCIPAL
 # =====================
 
-def main():
+def main(tipo="flat", metrica="l2", servidor=False, tam_fragmento=None):
     archivo_json = cargar_json_desde_dialogo()
 
     if not archivo_json:
@@ -66,18 +79,20 @@ def main():
         textos.append(texto)
         nombres.append(nombre_archivo)
 
+    indice = preparar_indice(archivo_json, nombres, textos, tipo, metrica, servidor, tam_fragmento)
+
     consultas = {
         "Tarjeta de video / Gráfica": "tarjeta de video o tarjeta gráfica",
         "Gabinete / Case": "gabinete o case",
         "Fuente de poder": "fuente de poder con watts y certificación"
     }
 
-    for categoria, consulta in consultas.items():
-        print(f"\n🧠 {categoria} — Consulta: \"{consulta}\"")
+    for categoria, resultado in realizar_busquedas(indice, consultas).items():
+        print(f"\n🧠 {categoria} — Consulta: \"{resultado['consulta']}\"")
         print("-" * 100)
-        resultados = realizar_busqueda(textos, nombres, consulta)
 
-        for nombre, texto in resultados:
+        for documento in resultado["documentos"]:
+            nombre, texto = documento["nombre"], documento["texto"]
             print(f"📄 Documento: {nombre}")
 
             if categoria == "Fuente de poder":
@@ -85,9 +100,21 @@ def main():
                 print(f"   🔌 Watts detectados: {', '.join(extra['watts']) or 'No detectado'}")
                 print(f"   🏅 Certificaciones: {', '.join(extra['certificaciones']) or 'No detectado'}")
 
+            # Con pasajes se muestra el que coincidió, que puede estar lejos del inicio
             print("   📜 Extracto:")
-            print(f"   {texto[:500].replace('\n', ' ')}...\n")
+            extracto = documento["pasaje"][:500].replace('\n', ' ')
+            print(f"   {extracto}...\n")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Búsqueda semántica sobre un JSON de fichas técnicas")
+    parser.add_argument("--indice", choices=TIPOS_INDICE, default="flat",
+                        help="tipo de índice FAISS (flat = exacto; ivf, hnsw, ivfpq = aproximados)")
+    parser.add_argument("--metrica", choices=METRICAS, default="l2",
+                        help="l2 = distancia euclídea; ip = producto interno sobre vectores normalizados")
+    parser.add_argument("--servidor", action="store_true",
+                        help="usar (o lanzar) el proceso que mantiene el modelo cargado entre invocaciones")
+    parser.add_argument("--pasaje", type=int, default=None, metavar="PALABRAS",
+                        help="indexar pasajes solapados de este tamaño en lugar del documento completo")
+    args = parser.parse_args()
+    main(args.indice, args.metrica, args.servidor, args.pasaje)
@@ -0,0 +1,95 @@
+# cache_extraccion.py
+
+import hashlib
+import json
+import sqlite3
+
+# ==========================
+# CACHÉ PERSISTENTE DE RESULTADOS
+# ==========================
+
+NOMBRE_CACHE = "cache_extraccion.sqlite"
+
+# Cada cuántas escrituras se confirma la transacción
+ESCRITURAS_POR_COMMIT = 5000
+
+
+def hash_texto(texto):
+    """Huella del "texto extraído y normalizado" que identifica al registro en la caché."""
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+class CacheExtraccion:
+    """
+    Guarda en SQLite el resultado de cada componente por (hash del texto, componente,
+    firma del conjunto de patrones del componente). Al cambiar un patrón cambia la firma
+    de ese componente, así que solo ese componente se vuelve a extraer; los demás
+    siguen saliendo de la caché.
+
+        with CacheExtraccion(ruta) as cache:
+            valores = cache.obtener(clave, "video", firma)
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS resultados ("
+            " texto TEXT NOT NULL,"
+            " componente TEXT NOT NULL,"
+            " firma TEXT NOT NULL,"
+            " valores TEXT NOT NULL,"
+            " PRIMARY KEY (texto, componente, firma))"
+        )
+        self.aciertos = 0
+        self.fallos = 0
+        self._pendientes = 0
+
+    def obtener(self, clave_texto, componente, firma):
+        fila = self.conexion.execute(
+            "SELECT valores FROM resultados WHERE texto = ? AND componente = ? AND firma = ?",
+            (clave_texto, componente, firma)
+        ).fetchone()
+        if fila is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return json.loads(fila[0])
+
+    def contiene(self, clave_texto, componente, firma):
+        """Consulta sin contar aciertos/fallos (para decidir qué registros enviar a calcular)."""
+        return self.conexion.execute(
+            "SELECT 1 FROM resultados WHERE texto = ? AND componente = ? AND firma = ?",
+            (clave_texto, componente, firma)
+        ).fetchone() is not None
+
+    def guardar(self, clave_texto, componente, firma, valores):
+        self.conexion.execute(
+            "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)",
+            (clave_texto, componente, firma, json.dumps(valores, ensure_ascii=False))
+        )
+        self._pendientes += 1
+        if self._pendientes >= ESCRITURAS_POR_COMMIT:
+            self.confirmar()
+
+    def purgar_obsoletos(self, firmas_vigentes):
+        """Elimina los resultados calculados con versiones anteriores de los patrones."""
+        for componente, firma in firmas_vigentes.items():
+            self.conexion.execute(
+                "DELETE FROM resultados WHERE componente = ? AND firma != ?", (componente, firma)
+            )
+        self.confirmar()
+
+    def confirmar(self):
+        self.conexion.commit()
+        self._pendientes = 0
+
+    def cerrar(self):
+        self.confirmar()
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
@@ -0,0 +1,31 @@
+# carga_scripts.py
+
+import importlib.util
+import os
+import sys
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+
+
+def cargar_modulo(nombre_archivo, alias):
+    """
+    Importa un script de esta carpeta por ruta (necesario para '--newProcJson.py' o
+    'import json.py', cuyos nombres no son importables con import). Queda registrado en
+    sys.modules como `alias`: se carga una sola vez y sus funciones se pueden enviar a un Pool.
+    """
+    if alias in sys.modules:
+        return sys.modules[alias]
+    spec = importlib.util.spec_from_file_location(alias, os.path.join(CARPETA, nombre_archivo))
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[alias] = modulo
+    try:
+        spec.loader.exec_module(modulo)
+    except BaseException:
+        del sys.modules[alias]
+        raise
+    return modulo
+
+
+def cargar_extractores():
+    """Importa '--newProcJson.py', el módulo con los extractores regex."""
+    return cargar_modulo("--newProcJson.py", "newProcJson")
@@ -0,0 +1,265 @@
+# cargador_modelo.py
+
+import argparse
+import importlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+NOMBRE_MODELO = 'all-MiniLM-L6-v2'
+
+# ==========================
+# IMPORTACIÓN PEREZOSA
+# ==========================
+
+class ModuloPerezoso:
+    """
+    Sustituto de un módulo que solo se importa al usar el primer atributo, ej.
+    faiss = ModuloPerezoso("faiss"). Así abrir el diálogo (o cancelarlo) no paga la
+    importación de faiss / torch.
+    """
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
+
+
+np = ModuloPerezoso("numpy")
+
+# nombre -> SentenceTransformer ya cargado en este proceso
+_modelos = {}
+
+
+def cargar_modelo_local(nombre=NOMBRE_MODELO):
+    """Carga el modelo en este proceso (una sola vez por nombre)."""
+    modelo = _modelos.get(nombre)
+    if modelo is None:
+        from sentence_transformers import SentenceTransformer
+        modelo = _modelos[nombre] = SentenceTransformer(nombre)
+    return modelo
+
+
+# ==========================
+# SERVIDOR CON EL MODELO CARGADO
+# ==========================
+
+# Cada mensaje: 8 bytes (largo de la cabecera JSON, largo de los datos) + cabecera + datos.
+# Los vectores viajan como float32 crudos, sin pasar por JSON.
+
+def carpeta_privada():
+    """
+    Carpeta del socket y su registro, accesible solo por el usuario actual: XDG_RUNTIME_DIR
+    si está definida, si no una subcarpeta 0700 del temporal. En un temporal compartido otro
+    usuario podría crear antes el socket y servir embeddings falsos.
+    """
+    if not hasattr(os, "getuid"):
+        return tempfile.gettempdir()
+    carpeta = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(), f"busq_semant_{os.getuid()}")
+    os.makedirs(carpeta, mode=0o700, exist_ok=True)
+    estado = os.lstat(carpeta)
+    if not stat.S_ISDIR(estado.st_mode) or estado.st_uid != os.getuid() or estado.st_mode & 0o077:
+        raise PermissionError(f"La carpeta {carpeta} no es privada del usuario actual")
+    return carpeta
+
+
+def ruta_socket_por_defecto(nombre=NOMBRE_MODELO):
+    return os.path.join(carpeta_privada(), f"busq_semant_{nombre.replace('/', '_')}.sock")
+
+
+def es_propio(ruta):
+    """True si el archivo pertenece al usuario actual (siempre True donde no hay uid)."""
+    return not hasattr(os, "getuid") or os.stat(ruta).st_uid == os.getuid()
+
+
+def _enviar(salida, cabecera, datos=b""):
+    cuerpo = json.dumps(cabecera).encode('utf-8')
+    salida.write(struct.pack("!II", len(cuerpo), len(datos)) + cuerpo + datos)
+    salida.flush()
+
+
+def _leer_exacto(entrada, cantidad):
+    datos = entrada.read(cantidad)
+    if len(datos) < cantidad:
+        raise EOFError("Conexión cerrada")
+    return datos
+
+
+def _recibir(entrada):
+    largo_cabecera, largo_datos = struct.unpack("!II", _leer_exacto(entrada, 8))
+    cabecera = json.loads(_leer_exacto(entrada, largo_cabecera))
+    return cabecera, _leer_exacto(entrada, largo_datos) if largo_datos else b""
+
+
+class _ManejadorModelo(socketserver.StreamRequestHandler):
+    # Una conexión puede hacer varias peticiones seguidas (ver ModeloRemoto)
+    def handle(self):
+        while True:
+            try:
+                cabecera, _ = _recibir(self.rfile)
+            except EOFError:
+                return
+            accion = cabecera.get("accion")
+            if accion == "codificar":
+                vectores = np.ascontiguousarray(
+                    self.server.modelo.encode(cabecera["textos"], batch_size=cabecera.get("batch_size", 32)),
+                    dtype=np.float32
+                )
+                _enviar(self.wfile, {"filas": vectores.shape[0], "dimension": vectores.shape[1]}, vectores.tobytes())
+            elif accion == "dimension":
+                _enviar(self.wfile, {"dimension": self.server.modelo.get_sentence_embedding_dimension()})
+            elif accion == "detener":
+                _enviar(self.wfile, {"ok": True})
+                threading.Thread(target=self.server.shutdown).start()
+                return
+            else:
+                _enviar(self.wfile, {"error": f"Acción desconocida: {accion}"})
+
+
+def servir(ruta_socket=None, nombre=NOMBRE_MODELO):
+    """Carga el modelo una vez y atiende peticiones de codificación en un socket Unix."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Este sistema no admite sockets Unix; use el modelo local.")
+    ruta_socket = ruta_socket or ruta_socket_por_defecto(nombre)
+    if os.path.exists(ruta_socket):
+        os.remove(ruta_socket)
+
+    with socketserver.UnixStreamServer(ruta_socket, _ManejadorModelo) as servidor:
+        servidor.modelo = cargar_modelo_local(nombre)
+        print(f"Modelo {nombre} listo en {ruta_socket}")
+        try:
+            servidor.serve_forever()
+        finally:
+            if os.path.exists(ruta_socket):
+                os.remove(ruta_socket)
+
+
+class ModeloRemoto:
+    """
+    Cliente del servidor con la misma interfaz que usa IndiceSemantico de un
+    SentenceTransformer (encode y get_sentence_embedding_dimension).
+    """
+
+    def __init__(self, ruta_socket):
+        self.conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.conexion.connect(ruta_socket)
+        self.entrada = self.conexion.makefile('rb')
+        self.salida = self.conexion.makefile('wb')
+        self._dimension = None
+
+    def _pedir(self, cabecera):
+        _enviar(self.salida, cabecera)
+        respuesta, datos = _recibir(self.entrada)
+        if "error" in respuesta:
+            raise RuntimeError(respuesta["error"])
+        return respuesta, datos
+
+    def encode(self, textos, batch_size=32, **_):
+        respuesta, datos = self._pedir({"accion": "codificar", "textos": list(textos), "batch_size": batch_size})
+        return np.frombuffer(datos, dtype=np.float32).reshape(respuesta["filas"], respuesta["dimension"])
+
+    def get_sentence_embedding_dimension(self):
+        if self._dimension is None:
+            self._dimension = self._pedir({"accion": "dimension"})[0]["dimension"]
+        return self._dimension
+
+    def detener_servidor(self):
+        self._pedir({"accion": "detener"})
+        self.cerrar()
+
+    def cerrar(self):
+        self.entrada.close()
+        self.salida.close()
+        self.conexion.close()
+
+
+def conectar(ruta_socket=None, nombre=NOMBRE_MODELO):
+    """
+    ModeloRemoto si hay un servidor escuchando en el socket; None si no. Un socket de otro
+    usuario se ignora: no se confía en los vectores que pudiera devolver.
+    """
+    ruta_socket = ruta_socket or ruta_socket_por_defecto(nombre)
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(ruta_socket) or not es_propio(ruta_socket):
+        return None
+    try:
+        return ModeloRemoto(ruta_socket)
+    except OSError:
+        return None
+
+
+def _cola_registro(ruta, lineas=20):
+    try:
+        with open(ruta, 'r', encoding='utf-8', errors='replace') as f:
+            return "".join(f.readlines()[-lineas:]).strip()
+    except OSError:
+        return ""
+
+
+def iniciar_servidor(ruta_socket=None, nombre=NOMBRE_MODELO, espera=120.0):
+    """
+    Lanza el servidor en segundo plano (sobrevive a este proceso) y espera a que responda.
+    Los errores del servidor van a <socket>.log; si termina antes de responder se lanza
+    RuntimeError con su código de salida y el final de ese registro.
+    """
+    ruta_socket = ruta_socket or ruta_socket_por_defecto(nombre)
+    ruta_registro = ruta_socket + ".log"
+    with open(ruta_registro, 'wb') as registro:
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--servir", "--socket", ruta_socket, "--modelo", nombre],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=registro,
+            start_new_session=True
+        )
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        modelo = conectar(ruta_socket, nombre)
+        if modelo is not None:
+            return modelo
+        codigo = proc.poll()
+        if codigo is not None:
+            raise RuntimeError(f"El servidor del modelo terminó con código {codigo} sin responder "
+                               f"(registro: {ruta_registro})\n{_cola_registro(ruta_registro)}")
+        time.sleep(0.2)
+    raise TimeoutError(f"El servidor del modelo no respondió en {espera:.0f} s (registro: {ruta_registro})\n"
+                       f"{_cola_registro(ruta_registro)}")
+
+
+def obtener_modelo(nombre=NOMBRE_MODELO, servidor=False, ruta_socket=None):
+    """
+    Devuelve el modelo listo para codificar, cargándolo recién en el primer uso.
+    Con servidor=True se usa (o se lanza) el proceso que mantiene el modelo cargado entre
+    invocaciones; si los sockets Unix no están disponibles se carga en este proceso.
+    """
+    if servidor and hasattr(socket, "AF_UNIX"):
+        return conectar(ruta_socket, nombre) or iniciar_servidor(ruta_socket, nombre)
+    return cargar_modelo_local(nombre)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor que mantiene cargado el modelo de embeddings")
+    parser.add_argument("--servir", action="store_true", help="cargar el modelo y atender peticiones")
+    parser.add_argument("--detener", action="store_true", help="detener un servidor en ejecución")
+    parser.add_argument("--socket", default=None, help="ruta del socket Unix")
+    parser.add_argument("--modelo", default=NOMBRE_MODELO)
+    args = parser.parse_args()
+
+    if args.detener:
+        remoto = conectar(args.socket, args.modelo)
+        if remoto is None:
+            print("No hay un servidor en ejecución.")
+        else:
+            remoto.detener_servidor()
+            print("Servidor detenido.")
+    else:
+        servir(args.socket, args.modelo)
@@ -0,0 +1,37 @@
+# cortador_claves.py
+
+import re
+
+# ==========================
+# CORTE POR CLAVES
+# ==========================
+
+class CortadorClaves:
+    """
+    Recorta un texto en la primera aparición de cualquiera de sus claves de corte.
+
+    Todas las claves se compilan en una sola alternancia: re.search devuelve la
+    coincidencia más a la izquierda entre todas las ramas, que es justamente el mínimo
+    de las posiciones de cada clave, así que basta un recorrido del texto en lugar de
+    un search (o dos) por clave.
+    """
+
+    def __init__(self, claves, flags=0):
+        self.claves = tuple(c.pattern if isinstance(c, re.Pattern) else c for c in claves)
+        # Cada clave va en su propio grupo sin captura para que un '|' interno no se mezcle
+        self.regex = re.compile("|".join(f"(?:{c})" for c in self.claves), flags) if self.claves else None
+
+    def __len__(self):
+        return len(self.claves)
+
+    def posicion(self, texto, inicio=0):
+        """Posición de la primera clave encontrada desde `inicio`, o None."""
+        if self.regex is None:
+            return None
+        match = self.regex.search(texto, inicio)
+        return match.start() if match else None
+
+    def cortar(self, texto):
+        """Devuelve el texto hasta (sin incluir) la primera clave, o el texto completo."""
+        posicion = self.posicion(texto)
+        return texto if posicion is None else texto[:posicion]
@@ -0,0 +1,146 @@
+# extraccion_hibrida.py
+
+import argparse
+import json
+import os
+import time
+
+from cargaScripts import cargar_extractores
+from cargadorModelo import NOMBRE_MODELO, obtener_modelo
+from flujoJson import es_jsonl, leer_registros
+from indiceSemantico import CARPETA_INDICE, IndiceSemantico
+
+# ==========================
+# CONFIGURACIÓN
+# ==========================
+
+# Consulta semántica por componente (las claves son las de COMPONENTES en --newProcJson.py).
+# El gabinete no se rescata: extraer_gabinete ya normaliza guiones y espacios en el texto
+# completo, así que volver a pasarle un pasaje normalizado no puede encontrar nada nuevo
+CONSULTAS = {
+    "video": "tarjeta de video o tarjeta gráfica",
+    "fuente": "fuente de poder con watts y certificación",
+    "chipset": "chipset de la tarjeta madre"
+}
+
+# Carpeta propia: busqSemant.py guarda en CARPETA_INDICE un índice con otra configuración
+# y compartirla haría que cada herramienta reconstruya el índice de la otra
+CARPETA_INDICE_HIBRIDO = CARPETA_INDICE + "_hibrido"
+
+# Similitud coseno mínima para que un pasaje se vuelva a pasar por el extractor
+UMBRAL_SIMILITUD = 0.35
+
+# Palabras por pasaje del residuo: cortos, para que el extractor vea solo la zona relevante
+TAM_PASAJE = 64
+
+
+# ==========================
+# PIPELINE HÍBRIDO
+# ==========================
+
+def extraer_hibrido(registros, modelo, carpeta_indice, umbral=UMBRAL_SIMILITUD, tam_pasaje=TAM_PASAJE):
+    """
+    1. Corre los extractores regex (procesar_registro) sobre todos los registros.
+    2. Los registros en los que un componente quedó sin detectar forman el residuo; solo
+       esos documentos se fragmentan en pasajes y se codifican en el índice semántico.
+    3. Por componente, el mejor pasaje de cada documento del residuo (si supera el umbral)
+       se normaliza y se vuelve a pasar por el extractor de ese componente. El resultado
+       solo cambia si el extractor lo confirma.
+
+    Devuelve (resultados, revisiones, tiempos), donde revisiones lista cada pasaje
+    candidato con su similitud y si el extractor lo confirmó.
+    """
+    nuevo = cargar_extractores()
+    tiempos = {}
+
+    inicio = time.perf_counter()
+    resultados, textos = {}, {}
+    residuo = {componente: set() for componente in CONSULTAS}
+    for nombre, contenido in registros:
+        resultado = nuevo.procesar_registro(contenido)
+        resultados[nombre] = resultado
+        textos[nombre] = contenido.get("texto extraído y normalizado", "")
+        for componente in CONSULTAS:
+            _, campos = nuevo.COMPONENTES[componente]
+            # El primer campo de cada componente indica si se detectó (mencionada / valor)
+            if not resultado[campos[0]]:
+                residuo[componente].add(nombre)
+    tiempos["regex"] = time.perf_counter() - inicio
+
+    pendientes = [nombre for nombre in resultados if any(nombre in r for r in residuo.values())]
+    revisiones = []
+    if pendientes:
+        inicio = time.perf_counter()
+        indice = IndiceSemantico(carpeta_indice, modelo, NOMBRE_MODELO, "flat", "ip",
+                                 tam_fragmento=tam_pasaje, solapamiento=tam_pasaje // 4)
+        indice.sincronizar(pendientes, [textos[n] for n in pendientes])
+        tiempos["indice"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        # Todas las consultas en un lote; top_k = todo el residuo, filtrado luego por componente
+        consultas = {c: (q, len(pendientes)) for c, q in CONSULTAS.items() if residuo[c]}
+        for componente, resultado_consulta in indice.buscar_varias(consultas).items():
+            extraer, campos = nuevo.COMPONENTES[componente]
+            for documento in resultado_consulta["documentos"]:
+                nombre = documento["nombre"]
+                if nombre not in residuo[componente] or documento["distancia"] < umbral:
+                    continue
+                pasaje = nuevo.normalizar_espacios_guiones(documento["pasaje"])
+                valores = extraer(pasaje, None)
+                confirmado = bool(valores[0])
+                if confirmado:
+                    resultados[nombre].update(zip(campos, valores))
+                revisiones.append({
+                    "nombre": nombre,
+                    "componente": componente,
+                    "similitud": round(documento["distancia"], 4),
+                    "pasaje": documento["pasaje"],
+                    "confirmado": confirmado
+                })
+        tiempos["semantico"] = time.perf_counter() - inicio
+
+    # Post-proceso habitual (recorte de la descripción de video, etc.)
+    tuberia = nuevo.TuberiaRegistros(nuevo.ETAPAS)
+    for nombre, resultado in resultados.items():
+        tuberia.aplicar(nombre, None, resultado)
+
+    tiempos["residuo"] = {c: len(r) for c, r in residuo.items()}
+    tiempos["documentos_codificados"] = len(pendientes)
+    return resultados, revisiones, tiempos
+
+
+def ruta_revisiones(ruta_original):
+    carpeta = os.path.dirname(ruta_original)
+    nombre = "hibrido_" + os.path.splitext(os.path.basename(ruta_original))[0] + ".json"
+    return os.path.join(carpeta, nombre)
+
+
+def main(archivo, umbral=UMBRAL_SIMILITUD, tam_pasaje=TAM_PASAJE, servidor=False):
+    nuevo = cargar_extractores()
+    carpeta_indice = os.path.join(os.path.dirname(os.path.abspath(archivo)), CARPETA_INDICE_HIBRIDO)
+    modelo = obtener_modelo(NOMBRE_MODELO, servidor)
+
+    resultados, revisiones, tiempos = extraer_hibrido(leer_registros(archivo), modelo, carpeta_indice, umbral, tam_pasaje)
+    # Misma forma de salida que procesar_en_flujo: JSON Lines si la entrada lo es
+    salida = nuevo.guardar_resultado(archivo, resultados, es_jsonl(archivo))
+    ruta_log = nuevo.generar_log(resultados, archivo)
+    with open(ruta_revisiones(archivo), 'w', encoding='utf-8') as f:
+        json.dump(revisiones, f, indent=4, ensure_ascii=False)
+
+    confirmados = sum(1 for r in revisiones if r["confirmado"])
+    print(f"Registros: {len(resultados)} | codificados: {tiempos['documentos_codificados']} | "
+          f"candidatos: {len(revisiones)} | confirmados por regex: {confirmados}")
+    print("Residuo por componente: " + ", ".join(f"{c}={n}" for c, n in tiempos["residuo"].items()))
+    print("Tiempos: " + ", ".join(f"{k}={v:.2f}s" for k, v in tiempos.items() if isinstance(v, float)))
+    print(f"det_: {salida}\nlog: {ruta_log}\nrevisiones: {ruta_revisiones(archivo)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extracción regex con rescate semántico del residuo")
+    parser.add_argument("archivo", help="JSON / JSON Lines de fichas técnicas")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_SIMILITUD,
+                        help="similitud coseno mínima de un pasaje candidato")
+    parser.add_argument("--pasaje", type=int, default=TAM_PASAJE, help="palabras por pasaje del residuo")
+    parser.add_argument("--servidor", action="store_true", help="usar el proceso con el modelo ya cargado")
+    args = parser.parse_args()
+    main(args.archivo, args.umbral, args.pasaje, args.servidor)
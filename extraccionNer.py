@@ -0,0 +1,443 @@
+# extraccion_ner.py
+
+import argparse
+import itertools
+import json
+import os
+import re
+import time
+
+from cargaScripts import cargar_extractores
+from cargadorModelo import ModuloPerezoso
+from flujoJson import leer_registros
+from registroPatrones import CONFIG_FILE, es_clave_reservada
+
+spacy = ModuloPerezoso("spacy")
+
+MODELO_SPACY = "es_core_news_md"
+
+# Componentes que la extracción de entidades no usa; no se ejecutan en nlp.pipe
+COMPONENTES_DESACTIVADOS = ["parser", "lemmatizer", "morphologizer", "attribute_ruler", "senter"]
+
+TAM_LOTE = 256
+
+# Componente de patrones_config.json (o semilla de los extractores) -> etiqueta de entidad
+ETIQUETAS = {
+    "Chipset": "CHIPSET",
+    "Fuente": "FUENTE",
+    "FuenteCert": "CERTIFICACION",
+    "Wattaje": "WATTAJE",
+    "Gabinete": "GABINETE",
+    "VideoInt": "VIDEO_INTEGRADO",
+    "VideoDedicado": "VIDEO_DEDICADO",
+    "Video": "VIDEO"
+}
+
+# Separadores opcionales (\s*, \s?) por patrón; cada uno duplica las variantes de tokens
+MAXIMO_OPCIONALES = 4
+
+# Variantes por regex al expandir grupos con espacios, ej. '(mid\s*tower|midtower)'
+MAXIMO_VARIANTES = 64
+
+# Textos por token que se comparan como literales (LOWER / IN) en lugar de con REGEX
+MAXIMO_LITERALES = 32
+
+# ==========================
+# REGEX -> PATRONES DE TOKENS
+# ==========================
+
+# Un lookahead opcional al final no restringe nada: se puede quitar sin cambiar el patrón
+REGEX_LOOKAHEAD_OPCIONAL = re.compile(r'\(\?=[^()]*\)\?$')
+
+
+def _recorrer(patron):
+    """Genera (posición, carácter, profundidad) de lo que está fuera de clases y escapes."""
+    profundidad, clase, i = 0, False, 0
+    while i < len(patron):
+        c = patron[i]
+        if c == "\\":
+            if not clase:
+                yield i, patron[i:i + 2], profundidad
+            i += 2
+            continue
+        if clase:
+            clase = c != "]"
+        elif c == "[":
+            clase = True
+        else:
+            if c == ")":
+                profundidad -= 1
+            yield i, c, profundidad
+            if c == "(":
+                profundidad += 1
+        i += 1
+
+
+def _alternativas(patron):
+    """Separa el patrón por los '|' del nivel superior."""
+    cortes = [i for i, c, profundidad in _recorrer(patron) if c == "|" and profundidad == 0]
+    limites = [-1] + cortes + [len(patron)]
+    return [patron[a + 1:b] for a, b in zip(limites, limites[1:])]
+
+
+def _grupo_con_espacios(patron):
+    r"""
+    Primer grupo del nivel superior que contiene un espacio (\s); devuelve
+    (inicio, fin, interior, cuantificador) o None. fin apunta al ')' de cierre.
+    """
+    inicio = None
+    for i, c, profundidad in _recorrer(patron):
+        if c == "(" and profundidad == 0:
+            inicio = i
+        elif c == ")" and profundidad == 0:
+            interior = patron[inicio + 1:i]
+            if "\\s" in interior:
+                return inicio, i, interior, patron[i + 1:i + 2]
+    return None
+
+
+def _piezas(patron):
+    r"""
+    Separa el patrón por los espacios del nivel superior. Devuelve una lista de
+    (texto, separador), donde separador es '+' (obligatorio), '?' (opcional, \s* o \s?)
+    o None al final.
+    """
+    piezas, anterior, saltar = [], 0, 0
+    for i, c, profundidad in _recorrer(patron):
+        if i < saltar or profundidad:
+            continue
+        if c == "\\s" or c == " ":
+            largo = 1 if c == " " else 2
+            cuantificador = patron[i + largo:i + largo + 1]
+            piezas.append((patron[anterior:i], "?" if cuantificador in ("*", "?") else "+"))
+            saltar = anterior = i + largo + (1 if cuantificador in ("*", "?", "+") else 0)
+    piezas.append((patron[anterior:], None))
+    return piezas
+
+
+def _enumerar(pieza):
+    """
+    Conjunto finito de textos que reconoce la pieza (literales, clases sin rangos, grupos
+    con '|' y '?'), o None si es infinito o más grande que MAXIMO_LITERALES.
+    """
+    alternativas = _alternativas(pieza)
+    if len(alternativas) > 1:
+        textos = set()
+        for alternativa in alternativas:
+            enumerados = _enumerar(alternativa)
+            if enumerados is None:
+                return None
+            textos |= enumerados
+        return textos if len(textos) <= MAXIMO_LITERALES else None
+
+    textos, i = {""}, 0
+    while i < len(pieza):
+        c = pieza[i]
+        if c == "\\":
+            escape = pieza[i + 1:i + 2]
+            if escape == "b":
+                i += 2
+                continue
+            if not escape or escape.isalnum():
+                return None
+            opciones, i = {escape}, i + 2
+        elif c == "[":
+            fin = pieza.find("]", i + 1)
+            clase = pieza[i + 1:fin]
+            if fin < 0 or not clase or any(x in clase for x in "^-\\"):
+                return None
+            opciones, i = set(clase), fin + 1
+        elif c == "(":
+            fin = next((j for j, x, p in _recorrer(pieza[i:]) if x == ")" and p == 0), None)
+            if fin is None:
+                return None
+            interior = pieza[i + 1:i + fin]
+            if interior.startswith("?") and not interior.startswith("?:"):
+                return None
+            opciones = set()
+            for alternativa in _alternativas(interior[2:] if interior.startswith("?:") else interior):
+                enumerados = _enumerar(alternativa)
+                if enumerados is None:
+                    return None
+                opciones |= enumerados
+            i += fin + 1
+        elif c in ".*+{}|^$)":
+            return None
+        else:
+            opciones, i = {c}, i + 1
+
+        cuantificador = pieza[i:i + 1]
+        if cuantificador in ("*", "+", "{"):
+            return None
+        if cuantificador == "?":
+            opciones.add("")
+            i += 1
+        textos = {t + o for t in textos for o in opciones}
+        if len(textos) > MAXIMO_LITERALES:
+            return None
+    return textos
+
+
+def _token(pieza):
+    """Patrón de un token para una pieza sin espacios; None si no se puede expresar así."""
+    if "\\s" in pieza or re.search(r'(?<!\\)\.[*+]', pieza):
+        # Comodines que cruzan tokens
+        return None
+    try:
+        opcional = re.fullmatch(pieza, "") is not None
+    except re.error:
+        return None
+
+    # Los literales se comparan por hash; REGEX evalúa una regex de Python por token
+    literales = _enumerar(pieza)
+    if literales is None:
+        token = {"LOWER": {"REGEX": f"^(?:{pieza})$"}}
+    else:
+        literales = sorted(literales - {""})
+        token = {"LOWER": literales[0] if len(literales) == 1 else {"IN": literales}}
+    if opcional:
+        token["OP"] = "?"
+    return token
+
+
+def _expandir(patron):
+    r"""
+    Variantes del patrón sin alternancias ni grupos con espacios en el nivel superior,
+    ej. '(mid\s*tower|midtower)' -> ['mid\s*tower', 'midtower']. None si no se puede.
+    """
+    pendientes, variantes = [patron], []
+    while pendientes:
+        actual = pendientes.pop()
+        alternativas = _alternativas(actual)
+        if len(alternativas) > 1:
+            pendientes.extend(alternativas)
+            continue
+        grupo = _grupo_con_espacios(actual)
+        if grupo is None:
+            variantes.append(actual)
+        else:
+            inicio, fin, interior, cuantificador = grupo
+            if interior.startswith(("?=", "?!", "?<")) or cuantificador in ("*", "+", "{"):
+                return None
+            interior = interior[2:] if interior.startswith("?:") else interior
+            resto = actual[fin + 2:] if cuantificador == "?" else actual[fin + 1:]
+            pendientes.extend(actual[:inicio] + alternativa + resto for alternativa in _alternativas(interior))
+            if cuantificador == "?":
+                pendientes.append(actual[:inicio] + resto)
+        if len(pendientes) + len(variantes) > MAXIMO_VARIANTES:
+            return None
+    return variantes
+
+
+def regex_a_patrones(patron):
+    r"""
+    Traduce una regex de patrones_config.json a patrones de tokens del EntityRuler.
+    Los separadores obligatorios (\s, \s+) separan tokens; cada separador opcional
+    (\s*, \s?) genera una variante con las piezas separadas y otra unidas en un mismo
+    token ("80 plus" / "80plus"). Devuelve una lista de patrones o None si la regex
+    cruza tokens de una forma que no se puede expresar (ej. '.*?').
+    """
+    patron = REGEX_LOOKAHEAD_OPCIONAL.sub("", patron.strip())
+    variantes = _expandir(patron)
+    if variantes is None:
+        return None
+
+    patrones = []
+    for variante in variantes:
+        piezas = _piezas(variante)
+        opcionales = [i for i, (_, separador) in enumerate(piezas) if separador == "?"]
+        if len(opcionales) > MAXIMO_OPCIONALES:
+            return None
+
+        for unidos in itertools.product((False, True), repeat=len(opcionales)):
+            unir = {i for i, u in zip(opcionales, unidos) if u}
+            grupos, actual = [], ""
+            for i, (pieza, separador) in enumerate(piezas):
+                actual += pieza
+                if separador is not None and i not in unir:
+                    grupos.append(actual)
+                    actual = ""
+            grupos.append(actual)
+
+            tokens = []
+            for grupo in grupos:
+                if not grupo:
+                    continue
+                token = _token(grupo)
+                if token is None:
+                    return None
+                tokens.append(token)
+            if tokens and any("OP" not in t for t in tokens):
+                patrones.append(tokens)
+    return patrones
+
+
+# ==========================
+# PIPELINE
+# ==========================
+
+def patrones_semilla():
+    """
+    Lista de (componente, marca, patrones válidos, patrones excluidos). Parte de los
+    patrones de wattaje y certificación de los extractores regex y suma los de cada marca
+    de patrones_config.json.
+    """
+    nuevo = cargar_extractores()
+    semillas = [
+        ("Wattaje", "extractores", [nuevo.REGEX_WATT.pattern], []),
+        ("FuenteCert", "extractores", [nuevo.REGEX_CERT.pattern], [])
+    ]
+    if os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for marca, componentes in data.items():
+            if es_clave_reservada(marca):
+                continue
+            for componente, datos in componentes.items():
+                semillas.append((componente, marca, datos.get("validos", []), datos.get("excluir", [])))
+    return semillas
+
+
+def construir_ruler(nlp, semillas):
+    """
+    Agrega un EntityRuler antes del NER estadístico (sus entidades tienen prioridad) con los
+    patrones de tokens de cada semilla. Devuelve (etiqueta -> excluidos compilados, regex
+    que no se pudieron traducir).
+    """
+    patrones, excluidos, omitidos = [], {}, []
+    for componente, marca, validos, excluir in semillas:
+        etiqueta = ETIQUETAS.get(componente, componente.upper())
+        for regex in validos:
+            traducidos = regex_a_patrones(regex)
+            if traducidos is None:
+                omitidos.append((marca, componente, regex))
+                continue
+            patrones.extend({"label": etiqueta, "pattern": p, "id": marca} for p in traducidos)
+        if excluir:
+            excluidos.setdefault(etiqueta, []).extend(re.compile(r, re.IGNORECASE) for r in excluir)
+
+    # Las marcas repiten patrones: queda la primera marca que define cada uno
+    unicos = {}
+    for patron in patrones:
+        unicos.setdefault((patron["label"], json.dumps(patron["pattern"], sort_keys=True)), patron)
+
+    ruler = nlp.add_pipe("entity_ruler", before="ner" if "ner" in nlp.pipe_names else None,
+                         config={"phrase_matcher_attr": "LOWER"})
+    ruler.add_patterns([_como_frase(p) for p in unicos.values()])
+    return excluidos, omitidos
+
+
+def _como_frase(patron):
+    """
+    Un patrón de solo literales pasa como frase al PhraseMatcher del ruler, que busca
+    todas las frases de una vez en lugar de avanzar un estado del Matcher por token.
+    """
+    tokens = patron["pattern"]
+    if all(set(t) == {"LOWER"} and isinstance(t["LOWER"], str) for t in tokens):
+        return dict(patron, pattern=" ".join(t["LOWER"] for t in tokens))
+    return patron
+
+
+def cargar_nlp(modelo=MODELO_SPACY):
+    """Modelo de spaCy sin los componentes que no se usan, más el EntityRuler de la configuración."""
+    nlp = spacy.load(modelo, disable=COMPONENTES_DESACTIVADOS)
+    excluidos, omitidos = construir_ruler(nlp, patrones_semilla())
+    return nlp, excluidos, omitidos
+
+
+def entidades_de(doc, excluidos):
+    entidades = []
+    for ent in doc.ents:
+        if any(regex.search(ent.text) for regex in excluidos.get(ent.label_, ())):
+            continue
+        entidades.append({
+            "texto": ent.text,
+            "etiqueta": ent.label_,
+            "marca": ent.ent_id_ or None,
+            "inicio": ent.start_char,
+            "fin": ent.end_char
+        })
+    return entidades
+
+
+def extraer_entidades(registros, nlp, excluidos, tam_lote=TAM_LOTE, procesos=1):
+    """
+    Genera (nombre, entidades) con nlp.pipe en lotes; con procesos > 1 spaCy reparte los
+    lotes entre procesos y devuelve los documentos en el orden de entrada.
+    """
+    textos = ((contenido.get("texto extraído y normalizado", ""), nombre) for nombre, contenido in registros)
+    for doc, nombre in nlp.pipe(textos, as_tuples=True, batch_size=tam_lote, n_process=procesos):
+        yield nombre, entidades_de(doc, excluidos)
+
+
+# ==========================
+# COMPARACIÓN CON LA RUTA REGEX
+# ==========================
+
+# Etiqueta -> campo de procesar_registro con el mismo dato
+CAMPOS_REGEX = {
+    "WATTAJE": "wattaje_fuente",
+    "CERTIFICACION": "certificacion_fuente",
+    "CHIPSET": "chipset"
+}
+
+
+def medir_regex(archivo):
+    nuevo = cargar_extractores()
+    inicio = time.perf_counter()
+    resultados = {nombre: nuevo.procesar_registro(contenido) for nombre, contenido in leer_registros(archivo)}
+    return resultados, time.perf_counter() - inicio
+
+
+def coincidencias(entidades, resultados):
+    """Por etiqueta de CAMPOS_REGEX: registros con dato por NER, por regex y por ambos."""
+    conteo = {}
+    for etiqueta, campo in CAMPOS_REGEX.items():
+        ner = {nombre for nombre, ents in entidades.items() if any(e["etiqueta"] == etiqueta for e in ents)}
+        regex = {nombre for nombre, resultado in resultados.items() if resultado.get(campo)}
+        conteo[etiqueta] = (len(ner), len(regex), len(ner & regex))
+    return conteo
+
+
+def ruta_entidades(ruta_original):
+    carpeta = os.path.dirname(ruta_original)
+    nombre = "ner_" + os.path.splitext(os.path.basename(ruta_original))[0] + ".json"
+    return os.path.join(carpeta, nombre)
+
+
+def main(archivo, modelo=MODELO_SPACY, tam_lote=TAM_LOTE, procesos=1):
+    inicio = time.perf_counter()
+    nlp, excluidos, omitidos = cargar_nlp(modelo)
+    t_carga = time.perf_counter() - inicio
+    for marca, componente, regex in omitidos:
+        print(f"Sin traducir a tokens ({marca}/{componente}): {regex}")
+
+    inicio = time.perf_counter()
+    entidades = dict(extraer_entidades(leer_registros(archivo), nlp, excluidos, tam_lote, procesos))
+    t_ner = time.perf_counter() - inicio
+    resultados, t_regex = medir_regex(archivo)
+
+    with open(ruta_entidades(archivo), 'w', encoding='utf-8') as f:
+        json.dump(entidades, f, indent=4, ensure_ascii=False)
+
+    cantidad = len(entidades)
+    print(f"\nPipeline: {', '.join(nlp.pipe_names)} (carga {t_carga:.2f}s)")
+    print(f"{'Ruta':<8}{'Registros':>11}{'Tiempo (s)':>12}{'Docs/s':>10}")
+    print("-" * 41)
+    print(f"{'ner':<8}{cantidad:>11}{t_ner:>12.2f}{cantidad / t_ner if t_ner else 0:>10.0f}")
+    print(f"{'regex':<8}{len(resultados):>11}{t_regex:>12.2f}{len(resultados) / t_regex if t_regex else 0:>10.0f}")
+
+    print(f"\n{'Entidad':<15}{'NER':>7}{'Regex':>7}{'Ambos':>7}")
+    for etiqueta, (ner, regex, ambos) in coincidencias(entidades, resultados).items():
+        print(f"{etiqueta:<15}{ner:>7}{regex:>7}{ambos:>7}")
+    print(f"\nentidades: {ruta_entidades(archivo)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extracción de entidades con spaCy y rendimiento frente a las regex")
+    parser.add_argument("archivo", help="JSON / JSON Lines de fichas técnicas")
+    parser.add_argument("--modelo", default=MODELO_SPACY, help="modelo de spaCy (nombre o carpeta)")
+    parser.add_argument("--tam-lote", type=int, default=TAM_LOTE, help="documentos por lote de nlp.pipe")
+    parser.add_argument("--procesos", type=int, default=1, help="procesos de nlp.pipe (n_process)")
+    args = parser.parse_args()
+    main(args.archivo, args.modelo, args.tam_lote, args.procesos)
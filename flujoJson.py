@@ -0,0 +1,217 @@
+# flujo_json.py
+
+import json
+import os
+
+# ==========================
+# LECTURA INCREMENTAL
+# ==========================
+
+TAM_LECTURA = 1 << 16
+
+
+class _LectorObjeto:
+    """Recorre el objeto JSON de nivel superior de un archivo sin cargarlo completo."""
+
+    def __init__(self, archivo, tam_lectura=TAM_LECTURA):
+        self.archivo = archivo
+        self.tam_lectura = tam_lectura
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.fin_archivo = False
+
+    def _leer_mas(self):
+        # Se lee al menos lo que ya hay en el buffer: un registro enorme se completa en
+        # pocas lecturas (crecimiento geométrico) en vez de reintentar bloque a bloque
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        bloque = self.archivo.read(max(self.tam_lectura, len(self.buffer)))
+        if not bloque:
+            self.fin_archivo = True
+        self.buffer += bloque
+
+    def _error(self, mensaje):
+        return json.JSONDecodeError(mensaje, self.buffer, self.pos)
+
+    def saltar_espacios(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.fin_archivo:
+                return
+            self._leer_mas()
+
+    def siguiente_caracter(self):
+        self.saltar_espacios()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ""
+
+    def consumir(self, esperado):
+        if self.siguiente_caracter() != esperado:
+            raise self._error(f"Se esperaba '{esperado}'")
+        self.pos += 1
+
+    def decodificar_valor(self):
+        self.saltar_espacios()
+        while True:
+            try:
+                valor, fin = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fin_archivo:
+                    raise
+                self._leer_mas()
+                continue
+            # Un número al final del buffer podría seguir en el próximo bloque
+            if fin == len(self.buffer) and not self.fin_archivo:
+                self._leer_mas()
+                continue
+            self.pos = fin
+            return valor
+
+    def pares(self):
+        self.consumir("{")
+        if self.siguiente_caracter() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.siguiente_caracter() != '"':
+                raise self._error("Se esperaba el nombre de una clave")
+            clave = self.decodificar_valor()
+            self.consumir(":")
+            yield clave, self.decodificar_valor()
+
+            separador = self.siguiente_caracter()
+            self.pos += 1
+            if separador == "}":
+                return
+            if separador != ",":
+                raise self._error("Se esperaba ',' o '}'")
+
+
+def leer_registros_json(ruta, tam_lectura=TAM_LECTURA):
+    """
+    Genera los pares (nombre_archivo, contenido) del objeto de nivel superior de `ruta`
+    a medida que se leen. La memoria queda acotada por el registro más grande, no por
+    el tamaño del archivo.
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        yield from _LectorObjeto(f, tam_lectura).pares()
+
+
+# ==========================
+# ESCRITURA INCREMENTAL
+# ==========================
+
+class EscritorJsonStream:
+    """
+    Escribe un objeto JSON registro por registro con el mismo formato que
+    json.dump(resultados, f, indent=4, ensure_ascii=False), sin acumular el diccionario.
+
+        with EscritorJsonStream(ruta) as escritor:
+            escritor.escribir(nombre, resultado)
+
+    Se escribe en `ruta`.tmp y solo al salir sin error se reemplaza `ruta`: una corrida que
+    falla a mitad no deja un archivo truncado que parezca completo.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.temporal = ruta + ".tmp"
+        self._archivo = None
+        self._vacio = True
+
+    def __enter__(self):
+        self._archivo = open(self.temporal, 'w', encoding='utf-8')
+        self._archivo.write("{")
+        return self
+
+    def escribir(self, clave, valor):
+        cuerpo = json.dumps(valor, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+        separador = "\n" if self._vacio else ",\n"
+        self._archivo.write(f"{separador}    {json.dumps(clave, ensure_ascii=False)}: {cuerpo}")
+        self._vacio = False
+
+    def __exit__(self, tipo_error, *_):
+        if tipo_error is not None:
+            self._archivo.close()
+            os.remove(self.temporal)
+            return
+        self._archivo.write("}" if self._vacio else "\n}")
+        self._archivo.close()
+        os.replace(self.temporal, self.ruta)
+
+
+# ==========================
+# JSON LINES
+# ==========================
+
+# Una línea por registro: {"nombre_archivo": contenido}
+
+def es_jsonl(ruta):
+    return ruta.lower().endswith((".jsonl", ".ndjson"))
+
+
+def leer_registros_jsonl(ruta):
+    """Genera los pares (nombre_archivo, contenido) de un archivo JSON Lines."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for numero, linea in enumerate(f, start=1):
+            if not linea.strip():
+                continue
+            objeto = json.loads(linea)
+            if not isinstance(objeto, dict):
+                raise ValueError(f"{ruta}, línea {numero}: se esperaba un objeto {{nombre: contenido}}")
+            yield from objeto.items()
+
+
+def leer_registros(ruta):
+    """Lee un corpus en formato JSON o JSON Lines según la extensión del archivo."""
+    return leer_registros_jsonl(ruta) if es_jsonl(ruta) else leer_registros_json(ruta)
+
+
+def registros_completos_jsonl(ruta):
+    """
+    Genera los pares (nombre, resultado) ya escritos en una salida JSON Lines, para
+    reanudar una ejecución interrumpida. Si la última línea quedó a medias se recorta
+    del archivo, así el próximo registro se agrega sobre una línea limpia.
+    """
+    if not os.path.exists(ruta):
+        return
+    fin_valido = 0
+    with open(ruta, 'rb') as f:
+        for linea in f:
+            if not linea.endswith(b"\n"):
+                break
+            try:
+                objeto = json.loads(linea)
+            except ValueError:
+                break
+            fin_valido += len(linea)
+            yield from objeto.items()
+    if fin_valido < os.path.getsize(ruta):
+        with open(ruta, 'r+b') as f:
+            f.truncate(fin_valido)
+
+
+class EscritorJsonl:
+    """
+    Escribe un registro por línea y vacía el buffer en cada uno, de modo que otros
+    procesos pueden seguir (tail) o partir la salida mientras se genera.
+    Con anexar=True se continúa un archivo existente en lugar de reemplazarlo.
+    """
+
+    def __init__(self, ruta, anexar=False):
+        self.ruta = ruta
+        self.anexar = anexar
+        self._archivo = None
+
+    def __enter__(self):
+        self._archivo = open(self.ruta, 'a' if self.anexar else 'w', encoding='utf-8')
+        return self
+
+    def escribir(self, clave, valor):
+        self._archivo.write(json.dumps({clave: valor}, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+
+    def __exit__(self, *_):
+        self._archivo.close()
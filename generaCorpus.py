@@ -0,0 +1,209 @@
+# genera_corpus.py
+
+import argparse
+import random
+import re
+
+from flujoJson import EscritorJsonl, EscritorJsonStream, es_jsonl
+
+# ==========================
+# FRAGMENTOS DE FICHAS TÉCNICAS
+# ==========================
+
+# Frases con el mismo estilo que el campo "texto extraído y normalizado"
+FRAGMENTOS = {
+    "video": [
+        "tarjeta de video nvidia geforce rtx 4060 8gb gddr6",
+        "tarjeta de video rtx 3060 12 gb gddr6 con ecc",
+        "nvidia quadro rtx 4000 8gb",
+        "gtx 1650 4gb gddr5",
+        "rx 6600 8gb",
+        "video tarjeta de gráfica dedicada 4gb"
+    ],
+    "integrada": [
+        "gráficos integrados intel uhd graphics 770",
+        "video integrado",
+        "graficos amd vega 7",
+        "tarjeta madre con video integrada"
+    ],
+    "gabinete": [
+        "gabinete mid tower negro con ventilación frontal",
+        "case formato reducido",
+        "gabinete tipo torre",
+        "chasis mini-itx compacto",
+        "small form factor (sff)"
+    ],
+    "fuente": [
+        "fuente de poder 750w 80 plus gold",
+        "fuente 500 watts certificación 80 plus bronze",
+        "fuente de poder de 300 w",
+        "wattaje 650 plus platinum"
+    ],
+    "chipset": [
+        "chipset: intel b760",
+        "chipset serie z790",
+        "amd b650 armada",
+        "mainboard chipset serie q670",
+        "chipset integrado"
+    ],
+    "ruido": [
+        "procesador intel core i7 13700 hasta 5.2 ghz",
+        "memoria ram 16gb ddr5 4800mhz expandible a 64gb",
+        "almacenamiento ssd 1tb nvme pcie 4.0",
+        "interfaces: 4 usb 3.2, hdmi, displayport",
+        "microsoft office incluido",
+        "pantalla lcd 24 pulgadas full hd",
+        "teclado y mouse usb en español",
+        "garantía de 3 años en sitio",
+        "sistema operativo windows 11 pro 64 bits",
+        "tarjeta de red gigabit, puerto rs232",
+        "lector de tarjetas sd",
+        "puertos: 2 x usb-c; 1 x rj45",
+        "estación de trabajo con gpu a5000"
+    ]
+}
+
+
+# ==========================
+# PLANTILLAS CON VALORES VARIABLES
+# ==========================
+
+# Campos que se sustituyen en las plantillas, ej. "{watts}"
+VALORES = {
+    "gpu_nvidia": ["rtx 3050", "rtx 3060", "rtx 4060", "rtx 4070", "rtx a2000", "gtx 1650", "gtx 1660"],
+    "gpu_amd": ["rx 6400", "rx 6600", "rx 7600", "rx 7700"],
+    "vram": ["4", "6", "8", "12", "16"],
+    "memoria_video": ["gddr5", "gddr6", "gddr6x"],
+    "igpu": ["intel uhd graphics 730", "intel uhd graphics 770", "amd radeon vega 8", "intel iris xe"],
+    "gabinete": ["mid tower", "midtower", "mini torre", "full tower", "small form factor", "micro-atx", "tipo torre"],
+    "color": ["negro", "gris", "blanco"],
+    "bahias": ["2", "3", "4"],
+    "watts": ["180", "260", "300", "450", "500", "550", "650", "750", "850", "1000"],
+    "cert": ["80 plus bronze", "80 plus gold", "80 plus platinum", "80plus titanium", "80 plus silver"],
+    "chipset": ["intel b760", "intel h610", "intel q670", "intel z790", "amd b550", "amd b650", "amd a520", "amd x670"],
+    "serie": ["b760", "h610", "q670", "z790", "b650", "x670"],
+    "cpu": ["intel core i5 13400", "intel core i7 13700", "intel core i9 14900k", "amd ryzen 5 7600", "amd ryzen 7 7700x"],
+    "ghz": ["3.2", "4.4", "4.8", "5.2", "5.6"],
+    "ram": ["8", "16", "32", "64"],
+    "mhz": ["3200", "4800", "5600"],
+    "disco": ["256gb", "512gb", "1tb", "2tb"],
+    "usb": ["2", "4", "6", "8"],
+    "pulgadas": ["21.5", "23.8", "27"],
+    "anios": ["1", "3", "5"]
+}
+
+PLANTILLAS = {
+    "video": [
+        "tarjeta de video {gpu_nvidia} de {vram}gb {memoria_video}",
+        "tarjeta de video nvidia geforce {gpu_nvidia} {vram} gb {memoria_video}",
+        "tarjeta gráfica dedicada amd radeon {gpu_amd} {vram}gb",
+        "video dedicado: nvidia {gpu_nvidia} con {vram} gb"
+    ],
+    "integrada": [
+        "gráficos integrados {igpu}",
+        "video integrado {igpu}",
+        "graficos {igpu} integrados en el procesador"
+    ],
+    "gabinete": [
+        "gabinete {gabinete} color {color}",
+        "case {gabinete} con {bahias} bahías",
+        "chasis {gabinete} con ventilación frontal"
+    ],
+    "fuente": [
+        "fuente de poder de {watts}w {cert}",
+        "fuente {watts} watts certificación {cert}",
+        "fuente de alimentación interna de {watts} w",
+        "fuente de poder {watts}w"
+    ],
+    "chipset": [
+        "chipset: {chipset}",
+        "tarjeta madre con chipset {chipset}",
+        "mainboard chipset serie {serie}",
+        "chipset {chipset} armada"
+    ],
+    "ruido": [
+        "procesador {cpu} hasta {ghz} ghz",
+        "memoria ram {ram}gb ddr5 {mhz}mhz expandible",
+        "almacenamiento ssd {disco} nvme pcie 4.0",
+        "interfaces: {usb} usb 3.2, hdmi, displayport",
+        "monitor lcd de {pulgadas} pulgadas full hd",
+        "garantía de {anios} años en sitio",
+        "sistema operativo windows 11 pro 64 bits",
+        "teclado y mouse usb en español",
+        "tarjeta de red gigabit, puerto rs232",
+        "puertos: {usb} x usb-c; 1 x rj45"
+    ]
+}
+
+REGEX_CAMPO = re.compile(r'\{(\w+)\}')
+
+
+def rellenar(rng, plantilla):
+    return REGEX_CAMPO.sub(lambda m: rng.choice(VALORES[m.group(1)]), plantilla)
+
+
+def generar_fragmento(rng, componente):
+    """Frase de un componente a partir de una plantilla, con valores elegidos al azar."""
+    return rellenar(rng, rng.choice(PLANTILLAS[componente]))
+
+
+# ==========================
+# GENERACIÓN
+# ==========================
+
+def generar_texto(rng, min_fragmentos=3, max_fragmentos=12, variado=False):
+    """
+    Arma un texto con ruido y algunos componentes elegidos al azar. Con variado=True las
+    frases salen de PLANTILLAS (valores distintos en cada ficha) en lugar de FRAGMENTOS.
+    """
+    componentes = [c for c in FRAGMENTOS if c != "ruido"]
+    elegidos = rng.sample(componentes, rng.randint(0, 3))
+    if variado:
+        partes = [generar_fragmento(rng, c) for c in elegidos]
+    else:
+        partes = [rng.choice(FRAGMENTOS[c]) for c in elegidos]
+    cantidad_ruido = max(min_fragmentos - len(partes), rng.randint(1, max_fragmentos - len(partes)))
+    if variado:
+        ruido = rng.sample(PLANTILLAS["ruido"], min(cantidad_ruido, len(PLANTILLAS["ruido"])))
+        partes += [rellenar(rng, plantilla) for plantilla in ruido]
+    else:
+        partes += rng.sample(FRAGMENTOS["ruido"], min(cantidad_ruido, len(FRAGMENTOS["ruido"])))
+    rng.shuffle(partes)
+
+    separador = rng.choice([", ", ". ", "\n", "; "])
+    texto = separador.join(partes)
+    return texto.upper() if rng.random() < 0.2 else texto
+
+
+def iterar_corpus(cantidad, semilla=0, variado=False):
+    """Genera los pares (nombre_archivo, registro) uno a uno, sin armar el corpus en memoria."""
+    rng = random.Random(semilla)
+    for i in range(cantidad):
+        yield f"ficha_{i:07d}.pdf", {
+            "id_extraccion": f"sint-{i}",
+            "texto extraído y normalizado": generar_texto(rng, variado=variado)
+        }
+
+
+def generar_corpus(cantidad, semilla=0, variado=False):
+    """Devuelve un diccionario nombre_archivo -> registro con el formato de los JSON de extracción."""
+    return dict(iterar_corpus(cantidad, semilla, variado))
+
+
+def guardar_corpus(ruta, cantidad, semilla=0, variado=False):
+    """Escribe el corpus registro a registro (JSON o JSON Lines según la extensión)."""
+    escritor = EscritorJsonl(ruta) if es_jsonl(ruta) else EscritorJsonStream(ruta)
+    with escritor:
+        for nombre, registro in iterar_corpus(cantidad, semilla, variado):
+            escritor.escribir(nombre, registro)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético de fichas técnicas")
+    parser.add_argument("cantidad", nargs="?", type=int, default=10000)
+    parser.add_argument("salida", nargs="?", default="corpus_sintetico.json", help=".json o .jsonl")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--variado", action="store_true", help="frases de PLANTILLAS con valores al azar")
+    args = parser.parse_args()
+    guardar_corpus(args.salida, args.cantidad, args.semilla, args.variado)
+    print(f"Corpus de {args.cantidad} registros guardado en {args.salida}")
@@ -1,8 +1,12 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import filedialog, messagebox, simpledialog
 import json
 import re
 import os
+import analisisPatrones
+import perfilPatrones
+import registroPatrones
+from flujoJson import leer_registros
 
 CONFIG_FILE = "patrones_config.json"
 
@@ -17,17 +21,14 @@ def guardar_configuracion_por_nombre(nombre, data):
     todas[nombre] = data
     with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
         json.dump(todas, f, indent=4, ensure_ascii=False)
+    # La configuración en disco cambió: descartar la versión compilada
+    registroPatrones.invalidar(CONFIG_FILE)
 
-def extraer_patron_dinamico(texto, patrones_validos, patrones_excluir):
+def extraer_patron_dinamico(texto, patrones_validos, patrones_excluir, presentes=None):
     texto = texto.lower()
-    for patron in patrones_validos:
-        match = re.search(patron, texto, re.IGNORECASE)
-        if match:
-            valor = match.group(0).strip()
-            if any(re.search(p, valor, re.IGNORECASE) for p in patrones_excluir):
-                continue
-            return valor
-    return None
+    buscador = registroPatrones.compilar_buscador(patrones_validos, re.IGNORECASE)
+    excluir = registroPatrones.compilar_lista(patrones_excluir, re.IGNORECASE)
+    return buscador.buscar_valor(texto, excluir, presentes)
 
 def crear_ventana_scrollable(root, titulo="Ventana", ancho=800, alto=500):
     """
@@ -64,7 +65,11 @@ def crear_ventana_scrollable(root, titulo="Ventana", ancho=800, alto=500):
 
 class GestorPatronesApp:
     def __init__(self, root):
-        self.todas_configuraciones = cargar_todas_las_configuraciones()
+        # Las secciones reservadas (ej. "_claves_corte") no son configuraciones de marca
+        self.todas_configuraciones = {
+            nombre: datos for nombre, datos in cargar_todas_las_configuraciones().items()
+            if not registroPatrones.es_clave_reservada(nombre)
+        }
         self.configuracion_actual = tk.StringVar()
 
         if self.todas_configuraciones:
@@ -158,7 +163,10 @@ class GestorPatronesApp:
         scroll_prueba.pack(side="right", fill="y")
 
 
-        tk.Button(frame_prueba, text="Probar Extracción", command=self._probar_extraccion).pack(pady=5)
+        frame_botones_prueba = tk.Frame(frame_prueba)
+        frame_botones_prueba.pack(pady=5)
+        tk.Button(frame_botones_prueba, text="Probar Extracción", command=self._probar_extraccion).pack(side="left", padx=5)
+        tk.Button(frame_botones_prueba, text="Perfil de Patrones...", command=self._perfilar_patrones).pack(side="left", padx=5)
 
         tk.Label(frame_prueba, text="Resultado:", font=("Arial", 10, "bold")).pack(anchor="w")
 
@@ -208,6 +216,18 @@ class GestorPatronesApp:
         def guardar_patron():
             nuevo_patron = entry.get().strip()
             if nuevo_patron:
+                try:
+                    re.compile(nuevo_patron, re.IGNORECASE)
+                except re.error as e:
+                    messagebox.showerror("Patrón inválido", f"El patrón no es una regex válida:\n{e}", parent=ventana)
+                    return
+                riesgos = analisisPatrones.riesgos_retroceso(nuevo_patron, re.IGNORECASE)
+                if riesgos and not messagebox.askyesno(
+                    "Riesgo de retroceso catastrófico",
+                    "\n\n".join(riesgos) + "\n\n¿Guardar el patrón de todos modos?",
+                    parent=ventana
+                ):
+                    return
                 componente = self.componente_actual.get()
                 self.patrones[componente][tipo].append(nuevo_patron)
                 (self.list_val if tipo == "validos" else self.list_exc).insert(tk.END, nuevo_patron)
@@ -257,15 +277,73 @@ class GestorPatronesApp:
 
     def _probar_extraccion(self):
         texto = self.txt_prueba.get("1.0", tk.END).strip().lower()
+        buscadores = [registroPatrones.compilar_buscador(d.get("validos", []), re.IGNORECASE) for d in self.patrones.values()]
+        presentes = registroPatrones.compilar_prefiltro(buscadores).detectar(texto)
         resultados = []
         for comp, datos in self.patrones.items():
-            valor = extraer_patron_dinamico(texto, datos.get("validos", []), datos.get("excluir", []))
+            valor = extraer_patron_dinamico(texto, datos.get("validos", []), datos.get("excluir", []), presentes)
             resultados.append(f"{comp.capitalize()}: {valor if valor else 'no menciona'}")
         self.txt_resultado.config(state="normal")
         self.txt_resultado.delete("1.0", tk.END)
         self.txt_resultado.insert(tk.END, "\n".join(resultados))
         self.txt_resultado.config(state="disabled")
 
+    def _perfilar_patrones(self):
+        ruta = filedialog.askopenfilename(
+            title="Corpus para perfilar los patrones",
+            filetypes=[("Archivos JSON", "*.json"), ("Archivos JSON Lines", "*.jsonl")]
+        )
+        if not ruta:
+            return
+        try:
+            perfil, cantidad = perfilPatrones.perfilar_configuracion(leer_registros(ruta), self.patrones)
+        except re.error as e:
+            messagebox.showerror("Error", f"Hay un patrón inválido: {e}")
+            return
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"No se pudo leer el corpus:\n{e}")
+            return
+        origenes = perfilPatrones.origenes_configuracion({self.configuracion_actual.get(): self.patrones})
+        self._mostrar_perfil(perfil, origenes, cantidad)
+
+    def _mostrar_perfil(self, perfil, origenes, cantidad):
+        filas = perfil.filas(origenes)
+        ventana, scrollable_frame = crear_ventana_scrollable(
+            self.root,
+            titulo=f"Perfil de patrones ({cantidad} registros)",
+            ancho=1150,
+            alto=600
+        )
+
+        columnas = [
+            ("Patrón", "patron"), ("Origen", "origen"), ("Evaluado", "evaluaciones"),
+            ("Coincide", "coincidencias"), ("Rechazado", "rechazadas"), ("Omitido", "omitidas"),
+            ("ms", "tiempo_ms"), ("% tiempo", "porcentaje_tiempo"), ("Estado", "estado")
+        ]
+        # Patrones muertos en gris y costosos en rojo: candidatos a podar
+        colores = {"sin coincidencias": "gray", "siempre rechazado": "gray", "costoso": "red"}
+
+        for columna, (titulo, _) in enumerate(columnas):
+            tk.Label(scrollable_frame, text=titulo, font=("Arial", 10, "bold")).grid(row=0, column=columna, sticky="w", padx=5)
+        for numero, fila in enumerate(filas, start=1):
+            color = colores.get(fila["estado"], "black")
+            for columna, (_, clave) in enumerate(columnas):
+                fuente = ("Courier", 9) if clave == "patron" else ("Arial", 9)
+                tk.Label(scrollable_frame, text=str(fila[clave]), font=fuente, fg=color).grid(row=numero, column=columna, sticky="w", padx=5)
+
+        def exportar():
+            destino = filedialog.asksaveasfilename(
+                parent=ventana,
+                title="Exportar perfil",
+                defaultextension=".csv",
+                filetypes=[("Archivos CSV", "*.csv")]
+            )
+            if destino:
+                perfil.exportar_csv(destino, origenes)
+                messagebox.showinfo("Exportado", f"Perfil guardado en {destino}", parent=ventana)
+
+        tk.Button(ventana, text="Exportar CSV", command=exportar).pack(pady=5)
+
     def _cambiar_configuracion(self, *_):
         seleccion = self.configuracion_actual.get()
         if seleccion in self.todas_configuraciones:
@@ -289,6 +367,9 @@ class GestorPatronesApp:
         nombre = simpledialog.askstring("Guardar configuración", "Ingrese nombre para esta configuración:")
         if not nombre:
             return
+        if registroPatrones.es_clave_reservada(nombre):
+            messagebox.showerror("Error", f"Los nombres que empiezan con '{registroPatrones.PREFIJO_RESERVADO}' están reservados.")
+            return
         self.todas_configuraciones[nombre] = self.patrones
         guardar_configuracion_por_nombre(nombre, self.patrones)
         if nombre not in self.dropdown_config["menu"].entrycget(0, "label"):
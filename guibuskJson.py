@@ -5,6 +5,8 @@ from tkinter import messagebox, filedialog, simpledialog
 import json
 import re
 import os
+import analisisPatrones
+import registroPatrones
 
 # ======================
 # CARGA Y GUARDADO JSON
@@ -26,6 +28,8 @@ def cargar_patrones():
 def guardar_patrones(data):
     with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
+    # La configuración en disco cambió: descartar la versión compilada
+    registroPatrones.invalidar(CONFIG_FILE)
 
 # ======================
 # FUNCIÓN DE EXTRACCIÓN
@@ -34,13 +38,11 @@ def guardar_patrones(data):
 def extraer_chipset_dinamico(texto, patrones_validos, patrones_excluir):
     texto = texto.lower()
 
-    for patron in patrones_validos:
-        match = re.search(patron, texto, re.IGNORECASE)
-        if match:
-            valor = match.group(0).strip()
-            if any(re.search(p, valor, re.IGNORECASE) for p in patrones_excluir):
-                continue
-            return valor[0].upper() + valor[1:]
+    buscador = registroPatrones.compilar_buscador(patrones_validos, re.IGNORECASE)
+    excluir = registroPatrones.compilar_lista(patrones_excluir, re.IGNORECASE)
+    valor = buscador.buscar_valor(texto, excluir)
+    if valor:
+        return valor[0].upper() + valor[1:]
     return None
 
 # ======================
@@ -53,7 +55,7 @@ class App:
         self.root.title("Gestor de Patrones de Extracción")
 
         self.patrones = cargar_patrones()
-        self.componentes = list(self.patrones.keys())
+        self.componentes = [c for c in self.patrones if not registroPatrones.es_clave_reservada(c)]
         self.componente_actual = tk.StringVar(value=self.componentes[0])
 
         self._crear_widgets()
@@ -109,6 +111,18 @@ class App:
         def guardar_patron():
             nuevo_patron = entry.get().strip()
             if nuevo_patron:
+                try:
+                    re.compile(nuevo_patron, re.IGNORECASE)
+                except re.error as e:
+                    messagebox.showerror("Patrón inválido", f"El patrón no es una regex válida:\n{e}", parent=ventana)
+                    return
+                riesgos = analisisPatrones.riesgos_retroceso(nuevo_patron, re.IGNORECASE)
+                if riesgos and not messagebox.askyesno(
+                    "Riesgo de retroceso catastrófico",
+                    "\n\n".join(riesgos) + "\n\n¿Guardar el patrón de todos modos?",
+                    parent=ventana
+                ):
+                    return
                 componente = self.componente_actual.get()
                 self.patrones[componente][tipo].append(nuevo_patron)
                 listbox.insert(tk.END, nuevo_patron)
@@ -288,7 +302,7 @@ class App:
 
     def _agregar_componente(self):
         nuevo = simpledialog.askstring("Nuevo componente", "Nombre del nuevo componente:")
-        if nuevo and nuevo not in self.patrones:
+        if nuevo and nuevo not in self.patrones and not registroPatrones.es_clave_reservada(nuevo):
             self.patrones[nuevo] = {"validos": [], "excluir": []}
             self.componentes.append(nuevo)
             menu = self.dropdown["menu"]
@@ -1,8 +1,9 @@
 import json
-import re
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from flujoJson import EscritorJsonl, EscritorJsonStream, es_jsonl, leer_registros
+from registroPatrones import claves_corte, compilar, compilar_cortador, compilar_patrones
 
 # ================================
 # PATRONES CONFIGURABLES
@@ -29,17 +30,22 @@ PATRONES = {
     ]
 }
 
+# Patrones compilados una sola vez desde el registro compartido
+PATRONES_COMPILADOS = compilar_patrones(PATRONES)
+
+# Claves tras las cuales se descarta el texto (sección "_claves_corte" de patrones_config.json)
+CORTADOR_MEMORIA_RAM = compilar_cortador(claves_corte("memoria_ram", [r'memoria ram']))
+REGEX_WATT = compilar(r'(\d{3,4})\s*(w|watts)')
+REGEX_CERT = compilar(r'80\s*plus\s*(gold|silver|bronze|platinum|titanium)?')
+
 # Función para eliminar todo lo posterior a "memoria ram", para evitar confusión con otras características
 def cortar_en_memoria_ram(texto):
-    match = re.search(r'memoria ram', texto)
-    if match:
-        return texto[:match.start()]
-    return texto
+    return CORTADOR_MEMORIA_RAM.cortar(texto)
 
-# Función general para buscar coincidencias con una lista de patrones
+# Función general para buscar coincidencias con una lista de patrones compilados
 def buscar_patron(texto, patrones):
-    for patron in patrones:
-        match = re.search(patron, texto)
+    for regex in patrones:
+        match = regex.search(texto)
         if match:
             return match.group(0).strip()
     return None
@@ -48,8 +54,8 @@ def buscar_patron(texto, patrones):
 def extraer_video(texto):
     texto_preprocesado = cortar_en_memoria_ram(texto)
 
-    video_info = buscar_patron(texto_preprocesado, PATRONES["tarjeta_video"])
-    grafica_integrada = bool(buscar_patron(texto_preprocesado, PATRONES["grafica_integrada"]))
+    video_info = buscar_patron(texto_preprocesado, PATRONES_COMPILADOS["tarjeta_video"])
+    grafica_integrada = bool(buscar_patron(texto_preprocesado, PATRONES_COMPILADOS["grafica_integrada"]))
 
     tarjeta_mencionada = bool(video_info or grafica_integrada)
 
@@ -60,7 +66,7 @@ def extraer_video(texto):
 
 # Extrae tipo de gabinete
 def extraer_gabinete(texto):
-    frase = buscar_patron(texto, PATRONES["gabinete"])
+    frase = buscar_patron(texto, PATRONES_COMPILADOS["gabinete"])
     if frase:
         if "mid tower" in frase:
             return True, "Mid Tower"
@@ -76,17 +82,17 @@ def extraer_fuente(texto):
     watt = None
     cert = None
 
-    frases = re.findall(PATRONES["fuente_poder"][0], texto)
+    frases = PATRONES_COMPILADOS["fuente_poder"][0].findall(texto)
     for frase in frases:
         fuente_mencionada = True
 
         # Extrae wattaje
-        watt_match = re.search(r'(\d{3,4})\s*(w|watts)', frase)
+        watt_match = REGEX_WATT.search(frase)
         if watt_match:
             watt = watt_match.group(1) + "W"
 
         # Extrae certificación
-        cert_match = re.search(r'80\s*plus\s*(gold|silver|bronze|platinum|titanium)?', frase)
+        cert_match = REGEX_CERT.search(frase)
         if cert_match:
             cert = cert_match.group(0).strip().title()
 
@@ -120,7 +126,7 @@ def seleccionar_archivo():
     root.withdraw()
     return filedialog.askopenfilename(
         title="Selecciona un archivo JSON",
-        filetypes=[("Archivos JSON", "*.json")]
+        filetypes=[("Archivos JSON", "*.json"), ("Archivos JSON Lines", "*.jsonl")]
     )
 
 # Procesamiento general del archivo
@@ -134,15 +140,25 @@ def procesar_archivo_json(filepath):
 
     return resultados
 
-# Guardar archivo JSON en la misma carpeta con prefijo "det_"
+# Procesamiento incremental: genera (nombre, resultado) sin cargar el JSON completo en memoria
+# Acepta tanto JSON como JSON Lines (.jsonl, un registro por línea)
+def procesar_archivo_json_en_flujo(filepath):
+    for nombre_archivo, contenido in leer_registros(filepath):
+        yield nombre_archivo, procesar_registro(contenido)
+
+# Guardar archivo JSON en la misma carpeta con prefijo "det_" (JSON Lines si la entrada lo era)
+# `resultados` puede ser un diccionario o un iterable de pares (nombre, resultado)
 def guardar_resultado(original_path, resultados):
     carpeta = os.path.dirname(original_path)
     nombre_original = os.path.basename(original_path)
     nuevo_nombre = "det_" + nombre_original
     ruta_salida = os.path.join(carpeta, nuevo_nombre)
 
-    with open(ruta_salida, 'w', encoding='utf-8') as f:
-        json.dump(resultados, f, indent=4, ensure_ascii=False)
+    pares = resultados.items() if isinstance(resultados, dict) else resultados
+    escritor_salida = EscritorJsonl(ruta_salida) if es_jsonl(ruta_salida) else EscritorJsonStream(ruta_salida)
+    with escritor_salida as escritor:
+        for nombre_archivo, resultado in pares:
+            escritor.escribir(nombre_archivo, resultado)
 
     return ruta_salida
 
@@ -154,8 +170,7 @@ def main():
         return
 
     try:
-        resultados = procesar_archivo_json(archivo)
-        salida = guardar_resultado(archivo, resultados)
+        salida = guardar_resultado(archivo, procesar_archivo_json_en_flujo(archivo))
         messagebox.showinfo("Éxito", f"Archivo procesado exitosamente:\n{salida}")
     except Exception as e:
         messagebox.showerror("Error", f"Ocurrió un error:\n{str(e)}")
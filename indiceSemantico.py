@@ -0,0 +1,423 @@
+# indice_semantico.py
+
+import hashlib
+import json
+import math
+import os
+
+from cargadorModelo import ModuloPerezoso
+
+# Se importan en el primer uso: abrir el diálogo de archivos no paga su carga
+faiss = ModuloPerezoso("faiss")
+np = ModuloPerezoso("numpy")
+
+# ==========================
+# ARCHIVOS DEL ÍNDICE
+# ==========================
+
+CARPETA_INDICE = "indice_semantico"
+ARCHIVO_EMBEDDINGS = "embeddings.f32"
+ARCHIVO_CLAVES = "claves.json"
+ARCHIVO_FAISS = "indice.faiss"
+
+
+def hash_texto(texto):
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def _guardar_json_atomico(ruta, data):
+    # Se escribe aparte y se reemplaza: una corrida interrumpida no deja el archivo a medias
+    temporal = ruta + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+# ==========================
+# EMBEDDINGS EN DISCO
+# ==========================
+
+class AlmacenEmbeddings:
+    """
+    Embeddings float32 guardados fila por fila en un archivo mapeado en memoria.
+    claves.json guarda el modelo, la dimensión y el hash del texto de cada fila, de modo
+    que un texto ya codificado en una corrida anterior no se vuelve a codificar.
+    Si cambia el modelo o la dimensión el almacén se descarta y empieza vacío; `reiniciado`
+    queda en True hasta que el índice FAISS se reconstruye sobre los vectores nuevos.
+    """
+
+    def __init__(self, carpeta, nombre_modelo, dimension):
+        os.makedirs(carpeta, exist_ok=True)
+        self.ruta_embeddings = os.path.join(carpeta, ARCHIVO_EMBEDDINGS)
+        self.ruta_claves = os.path.join(carpeta, ARCHIVO_CLAVES)
+        self.nombre_modelo = nombre_modelo
+        self.dimension = dimension
+        self.claves = []
+        self.filas = {}
+        self.reiniciado = False
+
+        meta = None
+        if os.path.exists(self.ruta_claves):
+            with open(self.ruta_claves, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        tam_esperado = len(meta["claves"]) * dimension * 4 if meta else 0
+        if (meta and meta.get("modelo") == nombre_modelo and meta.get("dimension") == dimension
+                and os.path.exists(self.ruta_embeddings)
+                and os.path.getsize(self.ruta_embeddings) >= tam_esperado):
+            self.claves = meta["claves"]
+            # Filas escritas después del último guardado de claves.json se descartan
+            with open(self.ruta_embeddings, 'r+b') as f:
+                f.truncate(tam_esperado)
+        else:
+            open(self.ruta_embeddings, 'wb').close()
+            self.reiniciado = True
+        self.filas = {clave: fila for fila, clave in enumerate(self.claves)}
+        self._mapear()
+
+    def _mapear(self):
+        # np.memmap no admite archivos vacíos
+        if self.claves:
+            self.vectores = np.memmap(self.ruta_embeddings, dtype=np.float32, mode='r',
+                                      shape=(len(self.claves), self.dimension))
+        else:
+            self.vectores = np.empty((0, self.dimension), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.claves)
+
+    def agregar(self, claves, vectores):
+        """Agrega al final las filas nuevas y devuelve sus números de fila."""
+        vectores = np.ascontiguousarray(vectores, dtype=np.float32).reshape(-1, self.dimension)
+        inicio = len(self.claves)
+        # Se suelta el mapeo antes de escribir (en Windows no se puede modificar un archivo mapeado)
+        self.vectores = None
+        with open(self.ruta_embeddings, 'ab') as f:
+            f.write(vectores.tobytes())
+        for clave in claves:
+            self.filas[clave] = len(self.claves)
+            self.claves.append(clave)
+        _guardar_json_atomico(self.ruta_claves, {
+            "modelo": self.nombre_modelo,
+            "dimension": self.dimension,
+            "claves": self.claves
+        })
+        self._mapear()
+        return list(range(inicio, len(self.claves)))
+
+
+# ==========================
+# FRAGMENTACIÓN EN PASAJES
+# ==========================
+
+# MiniLM trunca la entrada a 256 tokens: con pasajes de ~128 palabras (y solapamiento
+# para no cortar una especificación a la mitad) todo el documento queda representado
+TAM_FRAGMENTO = 128
+SOLAPAMIENTO = 32
+
+# Textos por lote enviados a modelo.encode
+TAM_LOTE = 64
+
+# Vecinos (pasajes) pedidos por cada documento buscado antes de ampliar la búsqueda
+FACTOR_PASAJES = 4
+
+
+def fragmentar_texto(texto, tam_fragmento=TAM_FRAGMENTO, solapamiento=SOLAPAMIENTO):
+    """
+    Divide el texto en pasajes de `tam_fragmento` palabras que se solapan en
+    `solapamiento` palabras. Un texto que entra en un solo pasaje se devuelve tal cual.
+    """
+    palabras = texto.split()
+    if len(palabras) <= tam_fragmento:
+        return [texto]
+    # El solapamiento siempre deja avanzar al menos una palabra
+    solapamiento = max(0, min(solapamiento, tam_fragmento - 1))
+    paso = tam_fragmento - solapamiento
+    return [
+        " ".join(palabras[inicio:inicio + tam_fragmento])
+        for inicio in range(0, len(palabras) - solapamiento, paso)
+    ]
+
+
+# ==========================
+# TIPOS DE ÍNDICE
+# ==========================
+
+# flat: búsqueda exacta (fuerza bruta). ivf / ivfpq: listas invertidas sobre k-means,
+# la segunda con vectores comprimidos por cuantización de producto. hnsw: grafo navegable.
+TIPOS_INDICE = ("flat", "ivf", "hnsw", "ivfpq")
+
+# l2: distancia euclídea sobre los vectores tal cual. ip: producto interno sobre vectores
+# normalizados (similitud coseno, la comparación para la que se entrena MiniLM)
+METRICAS = ("l2", "ip")
+
+# FAISS pide unas 39 muestras de entrenamiento por centroide de k-means
+MUESTRAS_POR_CENTROIDE = 39
+
+PARAMETROS_POR_DEFECTO = {
+    "nlist": None,       # listas del IVF; por defecto ~4·√n, acotado por los datos de entrenamiento
+    "nprobe": None,      # listas visitadas por consulta; por defecto nlist / 8
+    "hnsw_m": 32,        # vecinos por nodo del grafo HNSW
+    "ef_search": 64,     # amplitud de búsqueda HNSW (más = mejor recall, más lento)
+    "pq_m": None,        # subcuantizadores de IVF-PQ; por defecto el mayor divisor de la dimensión ≤ 48
+    "pq_bits": 8         # bits por subcuantizador
+}
+
+
+def _metrica_faiss(metrica):
+    return faiss.METRIC_INNER_PRODUCT if metrica == "ip" else faiss.METRIC_L2
+
+
+def preparar_vectores(vectores, metrica="l2"):
+    """float32 contiguo; con métrica 'ip' además normalizado (copia, no toca el almacén)."""
+    vectores = np.array(vectores, dtype=np.float32, order='C', copy=True)
+    if metrica == "ip":
+        faiss.normalize_L2(vectores)
+    return vectores
+
+
+def resolver_parametros(tipo, cantidad, dimension, **parametros):
+    """
+    Completa los parámetros del tipo de índice para `cantidad` vectores. Si no hay datos
+    suficientes para entrenar el tipo pedido se devuelve "flat" como tipo efectivo.
+    """
+    p = dict(PARAMETROS_POR_DEFECTO, **{k: v for k, v in parametros.items() if v is not None})
+    if tipo in ("ivf", "ivfpq"):
+        if p["nlist"] is None:
+            p["nlist"] = min(int(4 * math.sqrt(cantidad)), cantidad // MUESTRAS_POR_CENTROIDE)
+        if p["nlist"] < 1:
+            return "flat", p
+        if p["nprobe"] is None:
+            p["nprobe"] = max(1, p["nlist"] // 8)
+    if tipo == "ivfpq":
+        if p["pq_m"] is None:
+            p["pq_m"] = next(m for m in (48, 32, 24, 16, 12, 8, 4, 2, 1) if dimension % m == 0)
+        # El k-means de cada subcuantizador necesita al menos 2^bits vectores
+        while p["pq_bits"] > 4 and cantidad < MUESTRAS_POR_CENTROIDE * (1 << p["pq_bits"]):
+            p["pq_bits"] -= 1
+        if cantidad < (1 << p["pq_bits"]):
+            return "flat", p
+    return tipo, p
+
+
+def construir_indice(vectores, ids, tipo="flat", metrica="l2", **parametros):
+    """
+    Crea, entrena (ivf / ivfpq) y llena un índice FAISS envuelto en IndexIDMap, para que
+    las búsquedas devuelvan `ids` en lugar de posiciones. `vectores` ya debe venir
+    preparado con preparar_vectores. Devuelve (indice, tipo efectivo, parámetros).
+    """
+    if tipo not in TIPOS_INDICE:
+        raise ValueError(f"Tipo de índice desconocido: {tipo} (opciones: {', '.join(TIPOS_INDICE)})")
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconocida: {metrica} (opciones: {', '.join(METRICAS)})")
+
+    cantidad, dimension = vectores.shape
+    tipo, p = resolver_parametros(tipo, cantidad, dimension, **parametros)
+    metrica_faiss = _metrica_faiss(metrica)
+
+    if tipo == "flat":
+        base = faiss.IndexFlat(dimension, metrica_faiss)
+    elif tipo == "hnsw":
+        base = faiss.IndexHNSWFlat(dimension, p["hnsw_m"], metrica_faiss)
+    elif tipo == "ivf":
+        base = faiss.IndexIVFFlat(faiss.IndexFlat(dimension, metrica_faiss), dimension, p["nlist"], metrica_faiss)
+    else:
+        base = faiss.IndexIVFPQ(faiss.IndexFlat(dimension, metrica_faiss), dimension, p["nlist"],
+                                p["pq_m"], p["pq_bits"], metrica_faiss)
+
+    if not base.is_trained:
+        base.train(vectores)
+    indice = faiss.IndexIDMap(base)
+    if cantidad:
+        indice.add_with_ids(vectores, np.asarray(ids, dtype=np.int64))
+    ajustar_busqueda(indice, tipo, **p)
+    return indice, tipo, p
+
+
+def ajustar_busqueda(indice, tipo, nprobe=None, ef_search=None, **_):
+    """Fija los parámetros de búsqueda (nprobe del IVF, efSearch del HNSW)."""
+    base = faiss.downcast_index(indice.index) if isinstance(indice, faiss.IndexIDMap) else indice
+    if tipo in ("ivf", "ivfpq") and nprobe:
+        faiss.extract_index_ivf(base).nprobe = nprobe
+    elif tipo == "hnsw" and ef_search:
+        base.hnsw.efSearch = ef_search
+
+
+# ==========================
+# ÍNDICE PERSISTENTE
+# ==========================
+
+class IndiceSemantico:
+    """
+    Índice FAISS persistente sobre los textos de un corpus.
+
+        indice = IndiceSemantico(carpeta, modelo, "all-MiniLM-L6-v2")
+        indice.sincronizar(nombres, textos)      # codifica solo los textos nuevos
+        indice.buscar("gabinete o case", top_k=5)
+
+    `tipo` elige el índice (ver TIPOS_INDICE) y `metrica` la comparación: con "ip" se
+    busca por producto interno sobre vectores normalizados y "distancia" pasa a ser la
+    similitud coseno (mayor = más parecido). Los parámetros extra van a construir_indice.
+
+    Con `tam_fragmento` cada documento se divide en pasajes solapados (ver
+    fragmentar_texto) y se indexa un vector por pasaje; una búsqueda devuelve documentos,
+    cada uno con la puntuación de su mejor pasaje (max-pooling).
+
+    Los vectores del índice se identifican por su fila en el AlmacenEmbeddings, así que
+    el índice guardado se reutiliza mientras el corpus tenga los mismos textos y solo se
+    reconstruye (sin volver a codificar) cuando alguno cambia.
+    """
+
+    def __init__(self, carpeta, modelo, nombre_modelo, tipo="flat", metrica="l2",
+                 tam_fragmento=None, solapamiento=SOLAPAMIENTO, tam_lote=TAM_LOTE, **parametros):
+        self.carpeta = carpeta
+        self.modelo = modelo
+        self.tipo = tipo
+        self.metrica = metrica
+        self.tam_fragmento = tam_fragmento
+        self.solapamiento = solapamiento
+        self.tam_lote = tam_lote
+        self.parametros = parametros
+        self.tipo_efectivo = None
+        self.almacen = AlmacenEmbeddings(carpeta, nombre_modelo, modelo.get_sentence_embedding_dimension())
+        self.ruta_faiss = os.path.join(carpeta, ARCHIVO_FAISS)
+        self.indice = None
+        self.nombres = []
+        self.textos = []
+        # fila del almacén -> posiciones del corpus con ese texto (o pasaje)
+        self.documentos_por_fila = {}
+        # fila del almacén -> texto del pasaje (el documento completo si no se fragmenta)
+        self.pasaje_por_fila = {}
+
+    def unidades(self):
+        """Genera (posición del documento, texto a codificar): el documento o sus pasajes."""
+        for posicion, texto in enumerate(self.textos):
+            if self.tam_fragmento:
+                for pasaje in fragmentar_texto(texto, self.tam_fragmento, self.solapamiento):
+                    yield posicion, pasaje
+            else:
+                yield posicion, texto
+
+    def sincronizar(self, nombres, textos):
+        """
+        Deja el índice listo para el corpus dado. Devuelve cuántos textos (o pasajes) se
+        codificaron; los ya guardados en el almacén no se vuelven a codificar.
+        """
+        self.nombres = list(nombres)
+        self.textos = list(textos)
+        unidades = [(posicion, hash_texto(texto), texto) for posicion, texto in self.unidades()]
+
+        nuevos = {}
+        for _, clave, texto in unidades:
+            if clave not in self.almacen.filas and clave not in nuevos:
+                nuevos[clave] = texto
+        if nuevos:
+            self.almacen.agregar(list(nuevos), self.modelo.encode(list(nuevos.values()), batch_size=self.tam_lote))
+
+        self.documentos_por_fila = {}
+        self.pasaje_por_fila = {}
+        for posicion, clave, texto in unidades:
+            fila = self.almacen.filas[clave]
+            documentos = self.documentos_por_fila.setdefault(fila, [])
+            if posicion not in documentos:
+                documentos.append(posicion)
+            self.pasaje_por_fila[fila] = texto
+        self._cargar_o_construir(sorted(self.documentos_por_fila))
+        return len(nuevos)
+
+    def _cargar_o_construir(self, filas):
+        # La firma cubre la configuración, el modelo y las filas con el texto de cada una:
+        # cambiar de tipo, métrica o modelo reconstruye. Un almacén recién reiniciado numera
+        # desde 0 y podría repetir las filas, así que en ese caso se reconstruye siempre
+        configuracion = json.dumps([self.tipo, self.metrica, self.tam_fragmento, self.solapamiento,
+                                    sorted(self.parametros.items()),
+                                    self.almacen.nombre_modelo, self.almacen.dimension])
+        huella = hashlib.sha1(configuracion.encode('utf-8'))
+        huella.update(np.asarray(filas, dtype=np.int64).tobytes())
+        huella.update("\n".join(self.almacen.claves[fila] for fila in filas).encode('utf-8'))
+        firma = huella.hexdigest()
+        ruta_firma = self.ruta_faiss + ".firma"
+        if not self.almacen.reiniciado and os.path.exists(self.ruta_faiss) and os.path.exists(ruta_firma):
+            try:
+                with open(ruta_firma, 'r', encoding='utf-8') as f:
+                    guardada = json.load(f)
+            except ValueError:
+                guardada = {}
+            if isinstance(guardada, dict) and guardada.get("firma") == firma:
+                self.indice = faiss.read_index(self.ruta_faiss)
+                self.tipo_efectivo = guardada["tipo"]
+                ajustar_busqueda(self.indice, self.tipo_efectivo, **guardada["parametros"])
+                return
+
+        ids = np.asarray(filas, dtype=np.int64)
+        vectores = preparar_vectores(self.almacen.vectores[ids], self.metrica)
+        indice, self.tipo_efectivo, parametros = construir_indice(
+            vectores, ids, self.tipo, self.metrica, **self.parametros
+        )
+        faiss.write_index(indice, self.ruta_faiss)
+        with open(ruta_firma, 'w', encoding='utf-8') as f:
+            json.dump({"firma": firma, "tipo": self.tipo_efectivo, "parametros": parametros}, f)
+        self.indice = indice
+        self.almacen.reiniciado = False
+
+    def buscar(self, consulta, top_k=5):
+        """Devuelve hasta top_k pares (nombre, texto) ordenados por cercanía a la consulta."""
+        documentos = self.buscar_varias({"consulta": (consulta, top_k)})["consulta"]["documentos"]
+        return [(d["nombre"], d["texto"]) for d in documentos]
+
+    def buscar_varias(self, consultas, top_k=5):
+        """
+        Resuelve todas las consultas con un solo encode y una sola búsqueda FAISS.
+        `consultas` es categoria -> texto, o categoria -> (texto, top_k) para fijar un
+        top_k propio. Devuelve, en el mismo orden,
+        categoria -> {"consulta", "top_k", "documentos": [{"nombre", "texto", "pasaje", "distancia"}]}.
+        Cada documento aparece una vez, con la puntuación y el texto de su mejor pasaje.
+        """
+        pedidos = {
+            categoria: (consulta, top_k) if isinstance(consulta, str) else tuple(consulta)
+            for categoria, consulta in consultas.items()
+        }
+        resultados = {
+            categoria: {"consulta": consulta, "top_k": k, "documentos": []}
+            for categoria, (consulta, k) in pedidos.items()
+        }
+        if not pedidos or self.indice is None or self.indice.ntotal == 0:
+            return resultados
+
+        vectores_q = preparar_vectores(self.modelo.encode([c for c, _ in pedidos.values()]), self.metrica)
+        k_max = max(k for _, k in pedidos.values())
+        # Con pasajes hacen falta más vecinos que documentos pedidos: varios pasajes del mismo
+        # documento pueden ocupar los primeros puestos. Se amplía la búsqueda hasta completar.
+        k_busqueda = k_max * (FACTOR_PASAJES if self.tam_fragmento else 1)
+        while True:
+            k_busqueda = min(k_busqueda, self.indice.ntotal)
+            # Una sola búsqueda para todas las consultas; cada una se recorta a su top_k
+            distancias, filas = self.indice.search(vectores_q, k_busqueda)
+            for (categoria, (_, k)), distancias_q, filas_q in zip(pedidos.items(), distancias, filas):
+                resultados[categoria]["documentos"] = self._documentos_de(distancias_q, filas_q, k)
+            completos = all(len(r["documentos"]) >= r["top_k"] for r in resultados.values())
+            if completos or k_busqueda >= self.indice.ntotal:
+                return resultados
+            k_busqueda *= 2
+
+    def _documentos_de(self, distancias, filas, top_k):
+        # Los vecinos vienen del mejor al peor: la primera vez que aparece un documento es
+        # con su mejor pasaje, que es su puntuación (max-pooling)
+        documentos = []
+        vistos = set()
+        for distancia, fila in zip(distancias, filas):
+            if fila < 0:
+                continue
+            # Documentos con el mismo texto (o pasaje) comparten vector: se devuelven todos
+            for posicion in self.documentos_por_fila.get(int(fila), []):
+                if posicion in vistos:
+                    continue
+                vistos.add(posicion)
+                documentos.append({
+                    "nombre": self.nombres[posicion],
+                    "texto": self.textos[posicion],
+                    "pasaje": self.pasaje_por_fila.get(int(fila), self.textos[posicion]),
+                    "distancia": float(distancia)
+                })
+                if len(documentos) >= top_k:
+                    return documentos
+        return documentos
@@ -0,0 +1,276 @@
+# motor_pandas.py
+
+import argparse
+import os
+import time
+import warnings
+
+import pandas as pd
+
+from buscadorUnificado import literales_requeridos
+from cargaScripts import cargar_extractores
+from flujoJson import leer_registros
+from generaCorpus import generar_corpus
+
+# Columnas de salida, en el mismo orden que el diccionario de procesar_registro
+COLUMNAS = [
+    "id_extraccion",
+    "tarjeta_video_mencionada",
+    "descripcion_tarjeta_video",
+    "grafica_integrada",
+    "gabinete_mencionado",
+    "tipo_gabinete",
+    "fuente_poder_mencionada",
+    "wattaje_fuente",
+    "certificacion_fuente",
+    "chipset"
+]
+
+# ==========================
+# CARGA
+# ==========================
+
+def cargar_dataframe(registros):
+    """Una fila por registro (índice = nombre de archivo) con el id y el texto en minúsculas."""
+    nombres, ids, textos = [], [], []
+    for nombre, contenido in registros:
+        nombres.append(nombre)
+        ids.append(contenido.get("id_extraccion", ""))
+        textos.append(contenido.get("texto extraído y normalizado", ""))
+    indice = pd.Index(nombres, name="archivo")
+    # dtype explícito: con un corpus vacío la columna no tendría tipo y .str fallaría
+    textos = pd.Series(textos, index=indice, dtype=str).str.lower()
+    return pd.DataFrame({"id_extraccion": ids, "texto": textos}, index=indice)
+
+
+# ==========================
+# BÚSQUEDA POR COLUMNA
+# ==========================
+
+class MascarasLiterales:
+    """
+    Versión por columna del prefiltro de literales: para cada literal requerido se calcula
+    una sola vez (str.contains sin regex) en qué filas aparece, y cada patrón se evalúa
+    solo en las filas que contienen alguno de sus literales requeridos.
+    """
+
+    def __init__(self, textos):
+        self.textos = textos
+        self.mascaras = {}
+
+    def candidatas(self, regex):
+        requeridos = literales_requeridos(regex.pattern, regex.flags)
+        if not requeridos:
+            return None
+        mascara = pd.Series(False, index=self.textos.index)
+        for literal in requeridos:
+            if literal not in self.mascaras:
+                self.mascaras[literal] = self.textos.str.contains(literal, regex=False)
+            mascara |= self.mascaras[literal]
+        return mascara
+
+
+def _filas_a_evaluar(pendientes, mascaras, regex):
+    candidatas = mascaras.candidatas(regex) if mascaras is not None else None
+    return pendientes if candidatas is None else pendientes & candidatas
+
+
+def primera_coincidencia(textos, regexes, excluir=(), mascaras=None):
+    """
+    Equivalente por columna de BuscadorUnificado.buscar_valor: cada patrón, en orden, se
+    aplica con str.extract solo a las filas que todavía no tienen valor, así que el primer
+    patrón que coincide gana (coalesce enmascarado). Una coincidencia que cumple un patrón
+    de `excluir` se descarta y la fila sigue pendiente para el patrón siguiente.
+    """
+    valores = pd.Series(None, index=textos.index, dtype=object)
+    pendientes = pd.Series(True, index=textos.index)
+    for regex in regexes:
+        filas = _filas_a_evaluar(pendientes, mascaras, regex)
+        if not filas.any():
+            continue
+        # El grupo exterior captura la coincidencia completa (group(0))
+        extraido = textos[filas].str.extract(f"({regex.pattern})", flags=regex.flags, expand=True)[0]
+        extraido = extraido[extraido.notna()].str.strip()
+        for excl in excluir:
+            extraido = extraido[~extraido.str.contains(excl.pattern, flags=excl.flags, regex=True)]
+        valores[extraido.index] = extraido
+        pendientes[extraido.index] = False
+    return valores
+
+
+def contiene_alguno(textos, regexes, mascaras=None, filas=None):
+    """True en las filas (de `filas`, o todas) donde aparece alguno de los patrones."""
+    mascara = pd.Series(False, index=textos.index)
+    restantes = pd.Series(True, index=textos.index) if filas is None else filas.copy()
+    for regex in regexes:
+        evaluar = _filas_a_evaluar(restantes, mascaras, regex)
+        if not evaluar.any():
+            continue
+        with warnings.catch_warnings():
+            # Solo importa si hay coincidencia; los grupos de captura del patrón no se usan
+            warnings.filterwarnings("ignore", "This pattern is interpreted as a regular expression", UserWarning)
+            encontrados = textos[evaluar].str.contains(regex.pattern, flags=regex.flags, regex=True)
+        encontrados = encontrados[encontrados].index
+        mascara[encontrados] = True
+        restantes[encontrados] = False
+    return mascara
+
+
+def _con_valor(valores):
+    # Igual que `if valor:` en los extractores: None y "" cuentan como sin valor
+    return valores.fillna("").str.len() > 0
+
+
+def _nulos(valores):
+    # Las columnas de texto usan NaN para faltantes; la salida usa None como procesar_registro
+    return valores.astype(object).where(valores.notna(), None)
+
+
+# ==========================
+# COMPONENTES
+# ==========================
+
+def extraer_video(textos, nuevo, mascaras=None):
+    dedicado = primera_coincidencia(textos, nuevo.BUSCADORES["tarjeta_video"].regexes, mascaras=mascaras)
+    integrado = primera_coincidencia(textos, nuevo.BUSCADORES["grafica_integrada"].regexes, mascaras=mascaras)
+    hay_dedicado, hay_integrado = _con_valor(dedicado), _con_valor(integrado)
+
+    descripcion = dedicado.where(hay_dedicado, integrado.where(hay_integrado))
+    return pd.DataFrame({
+        "tarjeta_video_mencionada": hay_dedicado | hay_integrado,
+        "descripcion_tarjeta_video": _nulos(descripcion),
+        "grafica_integrada": ~hay_dedicado & hay_integrado
+    })
+
+
+def extraer_gabinete(textos, nuevo):
+    normalizados = textos.str.replace(nuevo.REGEX_ESPACIOS_GUIONES.pattern, " ", regex=True).str.strip()
+
+    # El texto normalizado es otro: sus literales no comparten máscaras con el original
+    mascaras = MascarasLiterales(normalizados)
+    tipo = pd.Series(None, index=textos.index, dtype=object)
+    for nombre_tipo in ["Mid Tower", "Formato reducido", "Full Tower"]:
+        pendientes = tipo.isna()
+        if not pendientes.any():
+            break
+        encontrados = contiene_alguno(normalizados, nuevo.PATRONES_GABINETE[nombre_tipo], mascaras, pendientes)
+        tipo[encontrados] = nombre_tipo
+
+    mencionado = (tipo.notna()
+                  | normalizados.str.contains("gabinete", regex=False)
+                  | normalizados.str.contains("torre", regex=False))
+    return pd.DataFrame({"gabinete_mencionado": mencionado, "tipo_gabinete": _nulos(tipo)})
+
+
+def extraer_fuente(textos, nuevo, mascaras=None):
+    mencionada = contiene_alguno(textos, nuevo.CLAVES_FUENTE, mascaras)
+
+    watts = textos.str.extract(nuevo.REGEX_WATT.pattern, flags=nuevo.REGEX_WATT.flags, expand=True)[0]
+    watts = watts + "W"
+
+    # Como en extraer_fuente: el último grupo con valor decide el texto de la certificación
+    grupos = textos.str.extract(nuevo.REGEX_CERT.pattern, flags=nuevo.REGEX_CERT.flags, expand=True)
+    nucleo = grupos[grupos.columns[-1]]
+    for columna in reversed(grupos.columns[:-1]):
+        nucleo = nucleo.where(_con_valor(nucleo), grupos[columna])
+    nucleo = nucleo.where(_con_valor(nucleo)).str.strip()
+    certificacion = nucleo.str.title().where(nucleo.str.lower().str.startswith("80"), "Plus " + nucleo.str.title())
+
+    return pd.DataFrame({
+        "fuente_poder_mencionada": mencionada | watts.notna() | certificacion.notna(),
+        "wattaje_fuente": _nulos(watts),
+        "certificacion_fuente": _nulos(certificacion)
+    })
+
+
+def extraer_chipset(textos, nuevo, mascaras=None):
+    valores = primera_coincidencia(textos, nuevo.PATRONES_CHIPSET, nuevo.EXCLUIR_CHIPSET, mascaras)
+    valores = valores.where(_con_valor(valores))
+    valores = valores.str[0].str.upper() + valores.str[1:]
+    return pd.DataFrame({"chipset": _nulos(valores)})
+
+
+def procesar_dataframe(df):
+    """
+    Aplica todos los componentes por columna y devuelve un DataFrame con los mismos
+    campos que procesar_registro (una fila por registro, listo para to_csv).
+    """
+    nuevo = cargar_extractores()
+    textos = df["texto"]
+    mascaras = MascarasLiterales(textos)
+    partes = [
+        df[["id_extraccion"]],
+        extraer_video(textos, nuevo, mascaras),
+        extraer_gabinete(textos, nuevo),
+        extraer_fuente(textos, nuevo, mascaras),
+        extraer_chipset(textos, nuevo, mascaras)
+    ]
+    return pd.concat(partes, axis=1)[COLUMNAS]
+
+
+def a_resultados(resultado):
+    """DataFrame de procesar_dataframe -> nombre -> dict, como lo espera guardar_resultado."""
+    filas = resultado.astype(object).where(resultado.notna(), None).to_dict("records")
+    return dict(zip(resultado.index, filas))
+
+
+# ==========================
+# COMPARACIÓN CON EL BUCLE POR REGISTRO
+# ==========================
+
+def comparar(registros, repeticiones=3):
+    """
+    Mide procesar_registro en bucle contra el motor por columnas sobre los mismos registros
+    y verifica que ambos den el mismo resultado.
+    """
+    nuevo = cargar_extractores()
+    registros = list(registros)
+
+    t_bucle = t_pandas = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        esperado = {nombre: nuevo.procesar_registro(contenido) for nombre, contenido in registros}
+        transcurrido = time.perf_counter() - inicio
+        t_bucle = transcurrido if t_bucle is None else min(t_bucle, transcurrido)
+
+        inicio = time.perf_counter()
+        obtenido = procesar_dataframe(cargar_dataframe(registros))
+        transcurrido = time.perf_counter() - inicio
+        t_pandas = transcurrido if t_pandas is None else min(t_pandas, transcurrido)
+
+    distintos = [nombre for nombre, fila in a_resultados(obtenido).items() if fila != esperado[nombre]]
+    if distintos:
+        raise AssertionError(f"El motor pandas difiere del bucle en {len(distintos)} registros, ej. {distintos[0]}")
+
+    cantidad = len(registros)
+    print(f"{'Motor':<10}{'Registros':>11}{'Tiempo (s)':>12}{'Registros/s':>14}")
+    print("-" * 47)
+    print(f"{'bucle':<10}{cantidad:>11}{t_bucle:>12.3f}{cantidad / t_bucle:>14.0f}")
+    print(f"{'pandas':<10}{cantidad:>11}{t_pandas:>12.3f}{cantidad / t_pandas:>14.0f}")
+    print(f"\nAceleración: {t_bucle / t_pandas:.2f}x (resultados idénticos)")
+
+
+def ruta_csv(ruta_original):
+    carpeta = os.path.dirname(ruta_original)
+    nombre = "det_" + os.path.splitext(os.path.basename(ruta_original))[0] + ".csv"
+    return os.path.join(carpeta, nombre)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extracción por columnas con pandas (str.extract / str.contains)")
+    parser.add_argument("archivo", nargs="?", help="JSON / JSON Lines de fichas (por defecto, corpus sintético)")
+    parser.add_argument("--cantidad", type=int, default=20000, help="registros del corpus sintético")
+    parser.add_argument("--comparar", action="store_true", help="medir contra procesar_registro y verificar resultados")
+    args = parser.parse_args()
+
+    registros = leer_registros(args.archivo) if args.archivo else generar_corpus(args.cantidad).items()
+    if args.comparar:
+        comparar(registros)
+    else:
+        inicio = time.perf_counter()
+        resultado = procesar_dataframe(cargar_dataframe(registros))
+        transcurrido = time.perf_counter() - inicio
+        salida = ruta_csv(args.archivo or "corpus_sintetico.json")
+        resultado.to_csv(salida, encoding='utf-8')
+        print(f"{len(resultado)} registros en {transcurrido:.2f}s ({len(resultado) / transcurrido:.0f} registros/s)")
+        print(f"CSV: {salida}")
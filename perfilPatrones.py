@@ -0,0 +1,194 @@
+# perfil_patrones.py
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import re
+from time import perf_counter
+
+import buscadorUnificado
+import registroPatrones
+from flujoJson import leer_registros
+
+COLUMNAS_CSV = [
+    "patron", "origen", "evaluaciones", "coincidencias", "rechazadas", "omitidas",
+    "tiempo_ms", "us_por_evaluacion", "porcentaje_tiempo", "estado"
+]
+
+# Un patrón que se lleva al menos esta fracción del tiempo total se marca como costoso
+FRACCION_COSTOSO = 0.2
+
+# ==========================
+# CONTADORES POR PATRÓN
+# ==========================
+
+class PerfilPatrones:
+    """
+    Contadores por patrón (texto + flags) que BuscadorUnificado.buscar actualiza mientras
+    el perfil está activo (ver perfilando):
+    - evaluaciones: veces que se ejecutó la regex
+    - coincidencias: evaluaciones con coincidencia
+    - rechazadas: coincidencias descartadas por un patrón de `excluir`
+    - omitidas: veces que no se ejecutó porque el prefiltro o el ancla descartaron el texto
+    - tiempo: segundos dentro de la regex (incluye sus patrones de exclusión)
+    """
+
+    def __init__(self):
+        self.estadisticas = {}
+
+    def _contadores(self, regex):
+        clave = (regex.pattern, regex.flags)
+        contadores = self.estadisticas.get(clave)
+        if contadores is None:
+            contadores = self.estadisticas[clave] = [0, 0, 0, 0, 0.0]
+        return contadores
+
+    def evaluado(self, regex, tiempo, coincidio):
+        contadores = self._contadores(regex)
+        contadores[0] += 1
+        contadores[1] += coincidio
+        contadores[4] += tiempo
+
+    def omitido(self, regex):
+        self._contadores(regex)[3] += 1
+
+    def evaluar_exclusiones(self, regex, excluir, valor):
+        """Mismo any() que buscar, midiendo cada patrón de exclusión por separado."""
+        for excl in excluir:
+            inicio = perf_counter()
+            coincide = excl.search(valor) is not None
+            transcurrido = perf_counter() - inicio
+            self.evaluado(excl, transcurrido, coincide)
+            self._contadores(regex)[4] += transcurrido
+            if coincide:
+                self._contadores(regex)[2] += 1
+                return True
+        return False
+
+    def limpiar(self):
+        self.estadisticas.clear()
+
+    def filas(self, origenes=None):
+        """Una fila por patrón, de la más costosa a la más barata."""
+        origenes = origenes or {}
+        total = sum(c[4] for c in self.estadisticas.values()) or 1.0
+        filas = []
+        for (patron, _), (evaluaciones, coincidencias, rechazadas, omitidas, tiempo) in self.estadisticas.items():
+            if coincidencias == 0:
+                estado = "sin coincidencias"
+            elif coincidencias == rechazadas:
+                estado = "siempre rechazado"
+            elif tiempo / total >= FRACCION_COSTOSO:
+                estado = "costoso"
+            else:
+                estado = ""
+            filas.append({
+                "patron": patron,
+                "origen": "; ".join(sorted(origenes.get(patron, ()))),
+                "evaluaciones": evaluaciones,
+                "coincidencias": coincidencias,
+                "rechazadas": rechazadas,
+                "omitidas": omitidas,
+                "tiempo_ms": round(1000 * tiempo, 3),
+                "us_por_evaluacion": round(1e6 * tiempo / evaluaciones, 2) if evaluaciones else 0.0,
+                "porcentaje_tiempo": round(100 * tiempo / total, 1),
+                "estado": estado
+            })
+        filas.sort(key=lambda f: f["tiempo_ms"], reverse=True)
+        return filas
+
+    def exportar_csv(self, ruta, origenes=None):
+        with open(ruta, 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.DictWriter(f, fieldnames=COLUMNAS_CSV)
+            escritor.writeheader()
+            escritor.writerows(self.filas(origenes))
+
+
+@contextlib.contextmanager
+def perfilando(perfil):
+    """Activa `perfil` en todos los BuscadorUnificado durante el bloque with."""
+    anterior = buscadorUnificado.activar_perfil(perfil)
+    try:
+        yield perfil
+    finally:
+        buscadorUnificado.activar_perfil(anterior)
+
+
+# ==========================
+# PERFIL DE UNA CONFIGURACIÓN
+# ==========================
+
+def origenes_configuracion(configuraciones):
+    """patrón -> {"marca.componente", "marca.componente (excluir)"} según la configuración."""
+    origenes = {}
+    for marca, componentes in configuraciones.items():
+        for componente, datos in componentes.items():
+            for patron in datos.get("validos", []):
+                origenes.setdefault(patron, set()).add(f"{marca}.{componente}")
+            for patron in datos.get("excluir", []):
+                origenes.setdefault(patron, set()).add(f"{marca}.{componente} (excluir)")
+    return origenes
+
+
+def perfilar_configuracion(registros, patrones, perfil=None):
+    """
+    Aplica los componentes `patrones` ({componente: {"validos", "excluir"}}) de una marca a
+    cada registro, como _probar_extraccion del gestor (prefiltro compartido y búsqueda
+    por componente), con el perfil activo. Devuelve (perfil, registros procesados).
+    """
+    perfil = perfil or PerfilPatrones()
+    componentes = [
+        (registroPatrones.compilar_buscador(datos.get("validos", []), re.IGNORECASE),
+         registroPatrones.compilar_lista(datos.get("excluir", []), re.IGNORECASE))
+        for datos in patrones.values()
+    ]
+    prefiltro = registroPatrones.compilar_prefiltro([buscador for buscador, _ in componentes])
+
+    cantidad = 0
+    with perfilando(perfil):
+        for _, contenido in registros:
+            texto = contenido.get("texto extraído y normalizado", "").lower()
+            presentes = prefiltro.detectar(texto)
+            for buscador, excluir in componentes:
+                buscador.buscar_valor(texto, excluir, presentes)
+            cantidad += 1
+    return perfil, cantidad
+
+
+def imprimir_perfil(filas, limite=None):
+    print(f"{'Patrón':<50}{'Eval.':>9}{'Coinc.':>8}{'Rech.':>7}{'Omit.':>9}{'ms':>10}{'%':>7}  Estado")
+    print("-" * 110)
+    for fila in filas[:limite]:
+        patron = fila["patron"] if len(fila["patron"]) <= 48 else fila["patron"][:45] + "..."
+        print(f"{patron:<50}{fila['evaluaciones']:>9}{fila['coincidencias']:>8}{fila['rechazadas']:>7}"
+              f"{fila['omitidas']:>9}{fila['tiempo_ms']:>10.2f}{fila['porcentaje_tiempo']:>7.1f}  {fila['estado']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluaciones, coincidencias y costo de cada patrón de extracción")
+    parser.add_argument("archivo", help="JSON / JSON Lines de fichas técnicas")
+    parser.add_argument("--marca", default=None, help="configuración de patrones_config.json (por defecto, todas)")
+    parser.add_argument("--csv", default=None, help="exportar el perfil a este CSV")
+    args = parser.parse_args()
+
+    with open(registroPatrones.CONFIG_FILE, 'r', encoding='utf-8') as f:
+        configuraciones = {
+            marca: componentes for marca, componentes in json.load(f).items()
+            if not registroPatrones.es_clave_reservada(marca) and (args.marca is None or marca == args.marca)
+        }
+    if args.marca is not None and not configuraciones:
+        parser.error(f"la marca {args.marca!r} no está en {registroPatrones.CONFIG_FILE}")
+
+    perfil = PerfilPatrones()
+    cantidad = 0
+    for marca, patrones in configuraciones.items():
+        _, cantidad = perfilar_configuracion(leer_registros(args.archivo), patrones, perfil)
+    origenes = origenes_configuracion(configuraciones)
+
+    print(f"{cantidad} registros, configuraciones: {', '.join(configuraciones)}\n")
+    imprimir_perfil(perfil.filas(origenes))
+    if args.csv:
+        perfil.exportar_csv(os.path.abspath(args.csv), origenes)
+        print(f"\nCSV: {os.path.abspath(args.csv)}")
@@ -0,0 +1,46 @@
+# prefiltro_literales.py
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick es opcional: sin él se usa una búsqueda por literal
+    ahocorasick = None
+
+# ==========================
+# PREFILTRO DE LITERALES
+# ==========================
+
+class Prefiltro:
+    """
+    Reúne los literales requeridos de todos los patrones de varios componentes y los
+    busca en una sola pasada por registro (autómata Aho-Corasick si pyahocorasick está
+    instalado). El conjunto resultante se pasa a BuscadorUnificado.buscar(presentes=...)
+    para que solo se ejecuten las regex cuyos literales aparecen en el texto.
+    Los patrones sin literal extraíble no dependen del prefiltro y se evalúan siempre.
+    """
+
+    def __init__(self, buscadores):
+        literales = set()
+        for buscador in buscadores:
+            for requeridos in buscador.requeridos:
+                if requeridos:
+                    literales.update(requeridos)
+        self.literales = frozenset(literales)
+
+        self._automata = None
+        if ahocorasick is not None and self.literales:
+            self._automata = ahocorasick.Automaton()
+            for literal in self.literales:
+                self._automata.add_word(literal, literal)
+            self._automata.make_automaton()
+
+    def detectar(self, texto):
+        """
+        Devuelve el conjunto de literales presentes en el texto, o None si el texto no
+        se puede filtrar con seguridad (en ese caso todos los patrones deben evaluarse).
+        """
+        busqueda = texto.lower()
+        if len(busqueda) != len(texto):
+            return None
+        if self._automata is not None:
+            return {literal for _, literal in self._automata.iter(busqueda)}
+        return {literal for literal in self.literales if literal in busqueda}
@@ -0,0 +1,197 @@
+# registro_patrones.py
+
+import hashlib
+import json
+import os
+import re
+
+from buscadorUnificado import BuscadorUnificado
+from cortadorClaves import CortadorClaves
+from prefiltroLiterales import Prefiltro
+
+CONFIG_FILE = "patrones_config.json"
+
+# Las claves de nivel superior que empiezan así no son marcas sino ajustes generales
+# (ej. "_claves_corte"); las interfaces y el compilado de marcas las ignoran
+PREFIJO_RESERVADO = "_"
+CLAVE_CORTE = "_claves_corte"
+
+# ==========================
+# CACHÉ DE PATRONES COMPILADOS
+# ==========================
+
+# Cada patrón se compila una sola vez por combinación (patrón, flags) y se reutiliza
+# en todos los extractores, evitando pasar por la caché interna (pequeña) del módulo re
+_compilados = {}
+
+# (patrones, flags) -> BuscadorUnificado con la lista ordenada ya preparada
+_buscadores = {}
+
+# (claves, flags) -> CortadorClaves con todas las claves en una sola alternancia
+_cortadores = {}
+
+# buscadores -> Prefiltro con un único autómata sobre todos sus literales
+_prefiltros = {}
+
+# ruta absoluta -> (firma del archivo, configuración compilada)
+_configuraciones = {}
+
+# Entradas máximas de cada caché: cada lista que guarda la interfaz agrega una entrada
+# nueva, así que en una sesión larga las de ediciones viejas se descartan (las menos usadas)
+MAXIMO_COMPILADOS = 1024
+MAXIMO_COMPUESTOS = 128
+
+
+def _consultar(cache, clave):
+    # Un acierto pasa la entrada al final: el orden del dict queda de menos a más reciente
+    valor = cache.pop(clave, None)
+    if valor is not None:
+        cache[clave] = valor
+    return valor
+
+
+def _recordar(cache, clave, valor, maximo):
+    cache[clave] = valor
+    while len(cache) > maximo:
+        del cache[next(iter(cache))]
+    return valor
+
+
+def compilar(patron, flags=0):
+    """Devuelve el patrón compilado; si ya viene compilado se devuelve tal cual."""
+    if isinstance(patron, re.Pattern):
+        return patron
+    clave = (patron, flags)
+    regex = _consultar(_compilados, clave)
+    if regex is None:
+        regex = _recordar(_compilados, clave, re.compile(patron, flags), MAXIMO_COMPILADOS)
+    return regex
+
+
+def compilar_lista(patrones, flags=0):
+    """Compila una lista ordenada de patrones conservando su prioridad."""
+    return tuple(compilar(p, flags) for p in patrones)
+
+
+def compilar_patrones(patrones, flags=0):
+    """Compila un diccionario componente -> lista de patrones (formato de PATRONES)."""
+    return {componente: compilar_lista(lista, flags) for componente, lista in patrones.items()}
+
+
+def compilar_buscador(patrones, flags=0):
+    """Devuelve el BuscadorUnificado (una pasada por componente) de una lista de patrones."""
+    clave = (tuple(p.pattern if isinstance(p, re.Pattern) else p for p in patrones), flags)
+    buscador = _consultar(_buscadores, clave)
+    if buscador is None:
+        buscador = _recordar(_buscadores, clave, BuscadorUnificado(compilar_lista(patrones, flags)), MAXIMO_COMPUESTOS)
+    return buscador
+
+
+def compilar_buscadores(patrones, flags=0):
+    """Un BuscadorUnificado por componente de un diccionario con formato de PATRONES."""
+    return {componente: compilar_buscador(lista, flags) for componente, lista in patrones.items()}
+
+
+def compilar_prefiltro(buscadores):
+    """Devuelve el Prefiltro compartido por un grupo de buscadores (uno por componente)."""
+    clave = tuple(buscadores)
+    prefiltro = _consultar(_prefiltros, clave)
+    if prefiltro is None:
+        prefiltro = _recordar(_prefiltros, clave, Prefiltro(clave), MAXIMO_COMPUESTOS)
+    return prefiltro
+
+
+def compilar_cortador(claves, flags=0):
+    """Devuelve el CortadorClaves (una sola búsqueda) de una lista de claves de corte."""
+    clave = (tuple(c.pattern if isinstance(c, re.Pattern) else c for c in claves), flags)
+    cortador = _consultar(_cortadores, clave)
+    if cortador is None:
+        cortador = _recordar(_cortadores, clave, CortadorClaves(clave[0], flags), MAXIMO_COMPUESTOS)
+    return cortador
+
+
+def firma_patrones(patrones, version=""):
+    """
+    Huella estable de un conjunto ordenado de patrones (texto y flags de cada uno).
+    Cambia apenas se agrega, quita, reordena o edita un patrón del conjunto.
+    """
+    huella = hashlib.sha1(str(version).encode('utf-8'))
+    for patron in patrones:
+        regex = compilar(patron)
+        huella.update(f"{regex.pattern}\x00{regex.flags}\n".encode('utf-8'))
+    return huella.hexdigest()
+
+
+def compilar_componente(datos, flags=re.IGNORECASE):
+    """Compila un componente con formato {"validos": [...], "excluir": [...]}."""
+    return {
+        "validos": compilar_lista(datos.get("validos", []), flags),
+        "excluir": compilar_lista(datos.get("excluir", []), flags),
+        "buscador": compilar_buscador(datos.get("validos", []), flags)
+    }
+
+
+# ==========================
+# CONFIGURACIÓN POR MARCA
+# ==========================
+
+def es_clave_reservada(nombre):
+    return nombre.startswith(PREFIJO_RESERVADO)
+
+
+def _firma_archivo(ruta):
+    estado = os.stat(ruta)
+    return estado.st_mtime_ns, estado.st_size
+
+
+def cargar_configuracion_compilada(ruta=CONFIG_FILE, flags=re.IGNORECASE):
+    """
+    Devuelve marca -> componente -> {"validos", "excluir"} ya compilados.
+    La configuración solo se vuelve a leer y compilar si el archivo cambió en disco.
+    """
+    ruta = os.path.abspath(ruta)
+    if not os.path.exists(ruta):
+        return {}
+
+    firma = _firma_archivo(ruta) + (flags,)
+    guardado = _configuraciones.get(ruta)
+    if guardado and guardado[0] == firma:
+        return guardado[1]
+
+    with open(ruta, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    compilada = {
+        marca: {componente: compilar_componente(datos, flags) for componente, datos in componentes.items()}
+        for marca, componentes in data.items()
+        if not es_clave_reservada(marca)
+    }
+    _configuraciones[ruta] = (firma, compilada)
+    return compilada
+
+
+def claves_corte(nombre, por_defecto=(), ruta=CONFIG_FILE):
+    """
+    Lista de claves de corte `nombre` definida en la sección "_claves_corte" de la
+    configuración, o `por_defecto` si el archivo o la lista no existen.
+    """
+    if not os.path.exists(ruta):
+        return list(por_defecto)
+    with open(ruta, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return list(data.get(CLAVE_CORTE, {}).get(nombre, por_defecto))
+
+
+def invalidar(ruta=None):
+    """
+    Descarta la configuración compilada de `ruta` (o todo el registro si no se indica),
+    para que la próxima consulta vuelva a compilar desde el archivo.
+    """
+    if ruta is None:
+        _compilados.clear()
+        _buscadores.clear()
+        _prefiltros.clear()
+        _cortadores.clear()
+        _configuraciones.clear()
+    else:
+        _configuraciones.pop(os.path.abspath(ruta), None)
@@ -1,5 +1,6 @@
-import spacy
-nlp = spacy.load("es_core_news_md")
+from extraccionNer import cargar_nlp, entidades_de
+
+nlp, excluidos, _ = cargar_nlp()
 doc = nlp("Este equipo tiene una fuente de poder 1250W con certificación 80 Plus Platinum.")
-for ent in doc.ents:
-    print(ent.text, ent.label_)
+for ent in entidades_de(doc, excluidos):
+    print(ent["texto"], ent["etiqueta"])